@@ -0,0 +1,512 @@
+from typing import Dict, List, Any, Optional
+import datetime
+import json
+import os
+import threading
+import uuid
+from ..utils.json_repair import coerce_to_schema
+from ..utils.prompts import PromptTemplate
+from ..utils.projection import serialize_for_prompt
+from ..utils.structured_output import StructuredOutput, template_schema
+from .candidate_assessor import JOB_PROJECTION, PROFILE_PROJECTION, CODING_CHALLENGE_SCHEMA
+
+# Default location of the precomputed bank, next to job_listings.txt
+DEFAULT_BANK_PATH = os.getenv(
+    "ASSESSMENT_BANK_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assessment_bank.json")
+)
+
+# Questions generated per skill when the bank is built
+QUESTIONS_PER_SKILL = int(os.getenv("ASSESSMENT_BANK_QUESTIONS_PER_SKILL", "4"))
+
+# Candidate-specific questions added to a bank assessment
+PERSONALISED_QUESTIONS = int(os.getenv("ASSESSMENT_PERSONALISED_QUESTIONS", "2"))
+
+# Expected shape of one job's bank entry, with the defaults used for missing fields
+BANK_ENTRY_SCHEMA = {
+    "job_id": "",
+    "job_title": "Unknown Position",
+    "company": "Unknown Company",
+    "skills": {},
+    "behavioral_questions": [{
+        "question": "",
+        "rubric": [""]
+    }],
+    "evaluation_criteria": {},
+    "passing_threshold": 70
+}
+BANK_QUESTION_SCHEMA = {
+    "question": "",
+    "difficulty": "medium",
+    "reference_answer": "",
+    "rubric": [""]
+}
+
+
+def _coerce_entry(entry: Any) -> Dict[str, Any]:
+    entry = coerce_to_schema(entry, BANK_ENTRY_SCHEMA)
+    entry["skills"] = {
+        skill: coerce_to_schema(questions, [BANK_QUESTION_SCHEMA])
+        for skill, questions in entry["skills"].items()
+    }
+    return entry
+
+
+BANK_ENTRY_OUTPUT = StructuredOutput(
+    "assessment_bank_entry", BANK_ENTRY_SCHEMA,
+    properties={
+        "skills": {"type": "object", "additionalProperties": template_schema([BANK_QUESTION_SCHEMA])},
+        "coding_challenge": CODING_CHALLENGE_SCHEMA
+    },
+    coerce=_coerce_entry
+)
+
+PERSONALISATION_OUTPUT = StructuredOutput(
+    "assessment_personalisation", {"technical_questions": [{"skill": "", "question": ""}]}
+)
+
+
+def _question_key(question: str) -> str:
+    """Question text compared case-, whitespace- and punctuation-insensitively"""
+    return " ".join("".join(char if char.isalnum() else " " for char in question.lower()).split())
+
+
+DEFAULT_BEHAVIORAL_QUESTIONS = [
+    {"question": "Describe a challenging project you worked on and how you contributed to its success.", "rubric": []},
+    {"question": "Tell me about a time when you had to learn a new technology quickly.", "rubric": []},
+    {"question": "Describe how you handle tight deadlines and competing priorities.", "rubric": []}
+]
+
+DEFAULT_EVALUATION_CRITERIA = {
+    "technical_knowledge": "Assess depth and accuracy of technical knowledge",
+    "problem_solving": "Evaluate approach to solving complex problems",
+    "communication": "Assess clarity and effectiveness of communication",
+    "cultural_fit": "Evaluate alignment with company values and culture"
+}
+
+BANK_PROMPT = PromptTemplate(
+    name="assessment_bank",
+    prefix="""You are an expert technical recruiter building a reusable interview question bank for a job posting.
+
+The questions must depend only on the job, never on a particular candidate, because they will be reused for every applicant.
+
+INSTRUCTIONS:
+1. For every listed skill write the requested number of technical questions of mixed difficulty
+2. Give each question a short reference answer and the key points a good answer covers
+3. Write 5 behavioral questions relevant to the role and seniority
+4. Include a coding challenge if the role is technical
+5. Provide evaluation criteria for the role
+
+REQUIRED OUTPUT FORMAT:
+{
+    "skills": {
+        "skill name": [
+            {
+                "question": "Detailed technical question text",
+                "difficulty": "easy" or "medium" or "hard",
+                "reference_answer": "Concise model answer",
+                "rubric": ["key point 1", "key point 2", ...]
+            },
+            ...
+        ],
+        ...
+    },
+    "behavioral_questions": [
+        {
+            "question": "Detailed behavioral question text",
+            "rubric": ["key point 1", ...]
+        },
+        ...
+    ],
+    "coding_challenge": {  // Optional, include only if job is technical
+        "title": "Challenge title",
+        "description": "Detailed description of the coding task",
+        "requirements": ["Requirement 1", ...],
+        "time_limit": "Suggested time limit",
+        "language": "Suggested programming language",
+        "test_cases": [  // Include 3-5 when the language is Python; the program reads stdin and writes stdout
+            {"input": "stdin for the test", "expected_output": "expected stdout"}
+        ]
+    },
+    "evaluation_criteria": {
+        "technical_knowledge": "Criteria for evaluating technical knowledge",
+        ...
+    }
+}
+
+Ensure your response is valid JSON and do not include any text outside the JSON structure.
+
+""",
+    suffix="""QUESTIONS PER SKILL: {questions_per_skill}
+
+SKILLS:
+{skills}
+
+JOB INFORMATION:
+{job_info}
+"""
+)
+
+PERSONALISATION_PROMPT = PromptTemplate(
+    name="assessment_personalisation",
+    prefix="""You are an expert technical recruiter. An assessment has already been assembled from a job's question bank.
+
+Write at most the requested number of additional technical questions that probe the candidate's own experience as described below. Do not repeat the existing questions.
+
+REQUIRED OUTPUT FORMAT:
+{"technical_questions": [{"skill": "skill name", "question": "Detailed technical question text"}]}
+
+Return only the JSON object.
+
+""",
+    suffix="""QUESTIONS REQUESTED: {count}
+
+EXISTING QUESTIONS:
+{existing_questions}
+
+CANDIDATE EXPERIENCE:
+{experience}
+"""
+)
+
+
+class AssessmentBankTool:
+    """Precomputed per-job question banks and fast assessment assembly from them
+
+    A bank entry holds questions per skill for one job_id. Building entries is
+    a batch job (see create_assessment_bank.py); at runtime an assessment for
+    a candidate/job pair is assembled from the bank without an LLM call, with
+    an optional short personalisation request.
+    """
+
+    def __init__(self, bank_path: str = DEFAULT_BANK_PATH):
+        """Initialize the assessment bank tool
+
+        Args:
+            bank_path: Path to the bank JSON file
+        """
+        self.name = "assessment_bank"
+        self.description = "Assembles candidate assessments from precomputed per-job question banks"
+        self.bank_path = bank_path
+        self._bank: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def bank(self) -> Dict[str, Any]:
+        """The bank contents, loaded from disk on first use"""
+        if self._bank is None:
+            with self._lock:
+                if self._bank is None:
+                    self._bank = self._load()
+        return self._bank
+
+    @property
+    def entry_response_format(self) -> Dict[str, Any]:
+        """The response_format for bank entry prompts"""
+        return BANK_ENTRY_OUTPUT.response_format()
+
+    @property
+    def personalisation_response_format(self) -> Dict[str, Any]:
+        """The response_format for personalisation prompts"""
+        return PERSONALISATION_OUTPUT.response_format()
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.bank_path):
+            return {"version": 1, "generated_at": None, "jobs": {}}
+        try:
+            with open(self.bank_path, 'r', encoding='utf-8') as file:
+                bank = json.load(file)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: Could not load assessment bank from {self.bank_path}: {str(e)}")
+            return {"version": 1, "generated_at": None, "jobs": {}}
+        bank.setdefault("jobs", {})
+        return bank
+
+    def save(self) -> None:
+        """Write the bank to disk atomically"""
+        bank = self.bank
+        bank["generated_at"] = datetime.datetime.now().isoformat()
+        temp_path = f"{self.bank_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(bank, file, indent=2)
+        os.replace(temp_path, self.bank_path)
+
+    def has_job(self, job_id: Optional[str]) -> bool:
+        """Whether the bank has an entry for a job"""
+        return bool(job_id) and job_id in self.bank["jobs"]
+
+    @staticmethod
+    def job_skills(job_info: Dict[str, Any]) -> List[str]:
+        """The required then preferred skills of a job, without duplicates"""
+        skills = []
+        for skill in job_info.get("required_skills", []) + job_info.get("preferred_skills", []):
+            if isinstance(skill, str) and skill.lower() not in [s.lower() for s in skills]:
+                skills.append(skill)
+        return skills
+
+    def build_entry_prompt(self, job_info: Dict[str, Any],
+                           questions_per_skill: int = QUESTIONS_PER_SKILL) -> str:
+        """Generate the prompt that asks the LLM for one job's question bank
+
+        Args:
+            job_info: Information about the job
+            questions_per_skill: Number of questions to write per skill
+
+        Returns:
+            A prompt for Azure OpenAI to create the bank entry
+        """
+        return BANK_PROMPT.render(
+            questions_per_skill=questions_per_skill,
+            skills=json.dumps(self.job_skills(job_info)),
+            job_info=serialize_for_prompt("bank.job_info", job_info, JOB_PROJECTION)
+        )
+
+    def parse_entry(self, response: str, job_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convert the model's reply to a bank prompt into a bank entry
+
+        Args:
+            response: The raw model output
+            job_info: Information about the job the entry is for
+
+        Returns:
+            The bank entry, or None if the output contains no JSON object
+        """
+        entry = BANK_ENTRY_OUTPUT.load(response)
+        if not isinstance(entry, dict):
+            return None
+        entry.update({
+            "job_id": job_info.get("job_id", ""),
+            "job_title": job_info.get("title", "Unknown Position"),
+            "company": job_info.get("company", "Unknown Company")
+        })
+        return BANK_ENTRY_OUTPUT.conform(entry)
+
+    def build_template_entry(self, job_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a bank entry from question templates, without an LLM
+
+        Args:
+            job_info: Information about the job
+
+        Returns:
+            The bank entry
+        """
+        templates = [
+            ("easy", "Please explain your experience with {skill} and how you've applied it in your work."),
+            ("medium", "Describe a difficult problem you solved using {skill}. What trade-offs did you consider?"),
+            ("medium", "What are common pitfalls when working with {skill}, and how do you avoid them?"),
+            ("hard", "How would you design and scale a production system that relies heavily on {skill}?")
+        ]
+        return {
+            "job_id": job_info.get("job_id", ""),
+            "job_title": job_info.get("title", "Unknown Position"),
+            "company": job_info.get("company", "Unknown Company"),
+            "skills": {
+                skill: [
+                    {"question": text.format(skill=skill), "difficulty": difficulty,
+                     "reference_answer": "", "rubric": []}
+                    for difficulty, text in templates
+                ]
+                for skill in self.job_skills(job_info)
+            },
+            "behavioral_questions": list(DEFAULT_BEHAVIORAL_QUESTIONS),
+            "evaluation_criteria": dict(DEFAULT_EVALUATION_CRITERIA),
+            "passing_threshold": 70
+        }
+
+    def add_entry(self, entry: Dict[str, Any]) -> None:
+        """Store or replace one job's bank entry (call save() to persist)"""
+        with self._lock:
+            self.bank["jobs"][entry["job_id"]] = entry
+
+    def assemble_assessment(self, candidate_profile: Dict[str, Any], job_info: Dict[str, Any],
+                            max_technical: int = 8, max_behavioral: int = 5) -> Optional[Dict[str, Any]]:
+        """Assemble an assessment for a candidate from the job's bank entry
+
+        Skills the candidate shares with the job come first, then the rest of
+        the job's required and preferred skills. Questions are taken round
+        robin across skills so the assessment covers as many skills as fit.
+
+        Args:
+            candidate_profile: The parsed candidate profile
+            job_info: Information about the job
+            max_technical: Maximum number of technical questions
+            max_behavioral: Maximum number of behavioral questions
+
+        Returns:
+            The assessment, or None if the job has no bank entry
+        """
+        entry = self.bank["jobs"].get(job_info.get("job_id"))
+        if entry is None:
+            return None
+
+        bank_skills = {skill.lower(): skill for skill in entry["skills"]}
+        candidate_skills = {s.lower() for s in candidate_profile.get("skills", []) if isinstance(s, str)}
+        ordered = sorted(
+            (skill for skill in self.job_skills(job_info) if skill.lower() in bank_skills),
+            key=lambda skill: skill.lower() not in candidate_skills
+        )
+        ordered = [bank_skills[skill.lower()] for skill in ordered] or list(entry["skills"])
+
+        technical_questions = []
+        depth = 0
+        while len(technical_questions) < max_technical:
+            added = False
+            for skill in ordered:
+                questions = entry["skills"][skill]
+                if depth < len(questions) and len(technical_questions) < max_technical:
+                    question = questions[depth]
+                    technical_questions.append({
+                        "question_id": f"TQ-{len(technical_questions) + 1}",
+                        "skill": skill,
+                        "question": question["question"],
+                        "type": "technical",
+                        "reference_answer": question.get("reference_answer", ""),
+                        "rubric": question.get("rubric", [])
+                    })
+                    added = True
+            if not added:
+                break
+            depth += 1
+
+        behavioral_questions = [
+            {
+                "question_id": f"BQ-{index + 1}",
+                "question": question["question"],
+                "type": "behavioral",
+                "rubric": question.get("rubric", [])
+            }
+            for index, question in enumerate(entry["behavioral_questions"][:max_behavioral])
+        ]
+
+        assessment = {
+            "assessment_id": f"ASM-{uuid.uuid4().hex[:8].upper()}",
+            "candidate_name": candidate_profile.get("name", "Unknown Candidate"),
+            "job_title": job_info.get("title", entry["job_title"]),
+            "company": job_info.get("company", entry["company"]),
+            "skills_assessed": sorted({q["skill"] for q in technical_questions}, key=ordered.index),
+            "technical_questions": technical_questions,
+            "behavioral_questions": behavioral_questions,
+            "evaluation_criteria": entry["evaluation_criteria"] or dict(DEFAULT_EVALUATION_CRITERIA),
+            "passing_threshold": entry.get("passing_threshold", 70),
+            "created_at": datetime.datetime.now().isoformat(),
+            "generated_by": "bank"
+        }
+        if entry.get("coding_challenge"):
+            assessment["coding_challenge"] = entry["coding_challenge"]
+        return assessment
+
+    def questions_for_skill(self, skill: str, job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Bank questions for a skill, preferring the given job's entry
+        
+        Args:
+            skill: The skill name (case-insensitive)
+            job_id: Job whose entry is searched first
+            
+        Returns:
+            The questions for the skill, or an empty list
+        """
+        jobs = self.bank["jobs"]
+        entries = ([jobs[job_id]] if job_id in jobs else []) + [e for key, e in jobs.items() if key != job_id]
+        for entry in entries:
+            for name, questions in entry["skills"].items():
+                if name.lower() == skill.lower() and questions:
+                    return questions
+        return []
+
+    def upgrade_assessment(self, assessment: Dict[str, Any], job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Replace generic questions in a locally built assessment with bank questions
+        
+        Args:
+            assessment: An assessment with generic per-skill questions
+            job_id: Job whose bank entry is preferred
+            
+        Returns:
+            The assessment, with bank questions wherever the bank covers the skill
+        """
+        upgraded = False
+        for question in assessment.get("technical_questions", []):
+            banked = self.questions_for_skill(question.get("skill", ""), job_id)
+            if banked:
+                question.update({
+                    "question": banked[0]["question"],
+                    "reference_answer": banked[0].get("reference_answer", ""),
+                    "rubric": banked[0].get("rubric", [])
+                })
+                upgraded = True
+
+        entry = self.bank["jobs"].get(job_id)
+        if entry is not None:
+            if entry["behavioral_questions"]:
+                assessment["behavioral_questions"] = [
+                    {"question_id": f"BQ-{index + 1}", "question": q["question"],
+                     "type": "behavioral", "rubric": q.get("rubric", [])}
+                    for index, q in enumerate(entry["behavioral_questions"][:5])
+                ]
+            if entry.get("coding_challenge"):
+                assessment["coding_challenge"] = entry["coding_challenge"]
+            upgraded = True
+
+        if upgraded:
+            assessment["generated_by"] = f"{assessment.get('generated_by', 'fallback')}+bank"
+        return assessment
+
+    def personalisation_prompt(self, candidate_profile: Dict[str, Any], assessment: Dict[str, Any],
+                               count: int = PERSONALISED_QUESTIONS) -> Optional[str]:
+        """Generate a short prompt for candidate-specific follow-up questions
+
+        Args:
+            candidate_profile: The parsed candidate profile
+            assessment: The assessment assembled from the bank
+            count: Maximum number of questions to request
+
+        Returns:
+            The prompt, or None if the profile has no experience to personalise on
+        """
+        experience = candidate_profile.get("experience", [])
+        if not experience:
+            return None
+        return PERSONALISATION_PROMPT.render(
+            count=count,
+            existing_questions="\n".join(f"- {q['question']}" for q in assessment["technical_questions"]),
+            experience=serialize_for_prompt("personalisation.experience", experience,
+                                            PROFILE_PROJECTION["experience"])
+        )
+
+    def apply_personalisation(self, assessment: Dict[str, Any], response: str,
+                              count: int = PERSONALISED_QUESTIONS) -> Dict[str, Any]:
+        """Append the personalised questions from the model's reply to an assessment
+
+        Args:
+            assessment: The assessment assembled from the bank
+            response: The raw model output for the personalisation prompt
+            count: Maximum number of questions to add
+
+        Returns:
+            The assessment, with at most count new questions appended;
+            questions repeating one already in the assessment are skipped
+        """
+        delta = PERSONALISATION_OUTPUT.load(response)
+        if not isinstance(delta, dict):
+            return assessment
+        delta = PERSONALISATION_OUTPUT.conform(delta)
+        questions = assessment["technical_questions"]
+        seen = {_question_key(q.get("question", "")) for q in questions}
+        added = 0
+        for question in delta["technical_questions"]:
+            if added >= count:
+                break
+            key = _question_key(question["question"])
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            questions.append({
+                "question_id": f"TQ-{len(questions) + 1}",
+                "skill": question["skill"],
+                "question": question["question"],
+                "type": "technical"
+            })
+            added += 1
+        if added:
+            assessment["generated_by"] = "bank+personalised"
+        return assessment
+
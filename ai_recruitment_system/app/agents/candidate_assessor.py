@@ -6,62 +6,96 @@ import os
 from dotenv import load_dotenv
 from moya.agents.base_agent import Agent, AgentConfig
 from moya.tools.base_tool import BaseTool
+from ..utils.json_repair import coerce_to_schema
+from ..utils.prompts import PromptTemplate
+from ..utils.code_grader import CodeGrader, summarize_grading
+from ..utils.projection import serialize_for_prompt
+from ..utils.answer_scoring import AnswerScorer
+from ..utils.output_contracts import OutputContract, COMPACT_LLM_OUTPUT
+from ..utils.structured_output import StructuredOutput, template_schema
 
 # Load environment variables if .env exists
 ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env")
 if os.path.exists(ENV_PATH):
     load_dotenv(dotenv_path=ENV_PATH)
 
-class CandidateAssessorTool:
-    """Tool for assessing candidates and generating interview questions using Azure OpenAI through Moya."""
-    
-    def __init__(self):
-        self.name = "candidate_assessor"
-        self.description = "Assesses candidate qualifications and generates customized assessments using AI"
-        
-    def generate_assessment(self, data: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
-        """Generate a prompt for Azure OpenAI to create an assessment for a candidate
-        
-        Args:
-            data: Dictionary containing candidate_profile and job_info
-            **kwargs: Alternative way to pass candidate_profile and job_info directly
-                
-        Returns:
-            A prompt for Azure OpenAI to create an assessment
-        """
-        # Extract candidate_profile and job_info from either data dict or kwargs
-        candidate_profile = None
-        job_info = None
-        
-        if data and isinstance(data, dict):
-            candidate_profile = data.get("candidate_profile", {})
-            job_info = data.get("job_info", {})
-        else:
-            candidate_profile = kwargs.get("candidate_profile", {})
-            job_info = kwargs.get("job_info", {})
-        
-        # Validate required fields
-        if not candidate_profile:
-            return {"error": "Candidate profile is required"}
-        
-        if not job_info:
-            return {"error": "Job information is required"}
-            
-        # Create a unique assessment ID
-        assessment_id = f"ASM-{uuid.uuid4().hex[:8].upper()}"
-        
-        # Prepare the prompt for the AI model
-        prompt = f"""You are an expert technical recruiter specialized in creating candidate assessments.
+# Expected shape of a generated assessment, with the defaults used for missing fields
+ASSESSMENT_SCHEMA = {
+    "assessment_id": "",
+    "candidate_name": "Unknown Candidate",
+    "job_title": "Unknown Position",
+    "company": "Unknown Company",
+    "skills_assessed": [""],
+    "technical_questions": [{
+        "question_id": "",
+        "skill": "",
+        "question": "",
+        "type": "technical"
+    }],
+    "behavioral_questions": [{
+        "question_id": "",
+        "question": "",
+        "type": "behavioral"
+    }],
+    "evaluation_criteria": {},
+    "passing_threshold": 70,
+    "created_at": ""
+}
 
-Please create a comprehensive assessment for a candidate based on their profile and the job requirements.
+# Expected shape of a submission evaluation, with the defaults used for missing fields
+EVALUATION_SCHEMA = {
+    "assessment_id": "",
+    "scores": {
+        "technical_knowledge": 0,
+        "problem_solving": 0,
+        "communication": 0,
+        "cultural_fit": 0,
+        "experience": 0
+    },
+    "overall_score": 0,
+    "feedback": {},
+    "strengths": [""],
+    "areas_for_improvement": [""],
+    "evaluator_notes": {},
+    "status": "failed",
+    "recommendation": "",
+    "next_steps": [""],
+    "evaluated_at": ""
+}
 
-ASSESSMENT ID: {assessment_id}
+# Fields of each input that the prompts actually use. Everything else (contact
+# details, interview slots, match scores, timestamps) is left out of the prompt.
+PROFILE_PROJECTION = {
+    "name": None,
+    "summary": None,
+    "skills": None,
+    "experience": ("title", "company", "dates", "responsibilities"),
+    "education": ("degree", "institution"),
+    "certifications": None
+}
 
-CANDIDATE PROFILE:
-{json.dumps(candidate_profile, indent=2)}
+JOB_PROJECTION = (
+    "title", "company", "department", "experience_level",
+    "required_skills", "preferred_skills", "description"
+)
 
-JOB INFORMATION:
-{json.dumps(job_info, indent=2)}
+ASSESSMENT_PROJECTION = {
+    "job_title": None,
+    "skills_assessed": None,
+    "technical_questions": ("question_id", "skill", "question", "reference_answer", "rubric"),
+    "behavioral_questions": ("question_id", "question"),
+    "coding_challenge": ("title", "description", "requirements", "language"),
+    "evaluation_criteria": None,
+    "passing_threshold": None
+}
+
+# Static instructions and schemas come first so the prefix is byte-identical on
+# every call; ids, timestamps and per-request data are only in the suffix
+ASSESSMENT_PROMPT = PromptTemplate(
+    name="candidate_assessor",
+    prefix="""You are an expert technical recruiter specialized in creating candidate assessments.
+
+Please create a comprehensive assessment for a candidate based on their profile and the job requirements, which are given at the end of this prompt.
 
 INSTRUCTIONS:
 1. Analyze the candidate's skills and experience against the job requirements
@@ -70,30 +104,30 @@ INSTRUCTIONS:
 4. Provide detailed evaluation criteria
 
 REQUIRED OUTPUT FORMAT:
-{{
-    "assessment_id": "{assessment_id}",
-    "candidate_name": "{candidate_profile.get('name', 'Unknown Candidate')}",
-    "job_title": "{job_info.get('title', 'Unknown Position')}",
-    "company": "{job_info.get('company', 'Unknown Company')}",
+{
+    "assessment_id": "the ASSESSMENT ID given below",
+    "candidate_name": "the candidate's name from the profile",
+    "job_title": "the job title from the job information",
+    "company": "the company from the job information",
     "skills_assessed": [List of skills being assessed],
     "technical_questions": [
-        {{
+        {
             "question_id": "TQ-1",
             "skill": "skill name",
             "question": "Detailed technical question text",
             "type": "technical"
-        }},
+        },
         ... (5-8 questions total)
     ],
     "behavioral_questions": [
-        {{
+        {
             "question_id": "BQ-1",
             "question": "Detailed behavioral question text",
             "type": "behavioral"
-        }},
+        },
         ... (3-5 questions total)
     ],
-    "coding_challenge": {{  // Optional, include only if job is technical
+    "coding_challenge": {  // Optional, include only if job is technical
         "title": "Challenge title",
         "description": "Detailed description of the coding task",
         "requirements": [
@@ -102,24 +136,26 @@ REQUIRED OUTPUT FORMAT:
             ...
         ],
         "time_limit": "Suggested time limit",
-        "language": "Suggested programming language"
-    }},
-    "evaluation_criteria": {{
+        "language": "Suggested programming language",
+        "test_cases": [  // Include 3-5 when the language is Python; the program reads stdin and writes stdout
+            {"input": "stdin for the test", "expected_output": "expected stdout"}
+        ]
+    },
+    "evaluation_criteria": {
         "technical_knowledge": "Criteria for evaluating technical knowledge",
         "problem_solving": "Criteria for evaluating problem solving",
         "communication": "Criteria for evaluating communication",
         ...
-    }},
-    "scoring_guide": {{
+    },
+    "scoring_guide": {
         "1": "Does not meet expectations",
         "2": "Partially meets expectations",
         "3": "Meets expectations",
         "4": "Exceeds expectations",
         "5": "Significantly exceeds expectations"
-    }},
-    "passing_threshold": 70,
-    "created_at": "{datetime.datetime.now().isoformat()}"
-}}
+    },
+    "passing_threshold": 70
+}
 
 IMPORTANT GUIDELINES:
 1. Generate challenging but fair questions that match the candidate's skill level
@@ -130,87 +166,50 @@ IMPORTANT GUIDELINES:
 6. Do not include any explanation or text outside the JSON structure
 
 The output MUST be a valid JSON object with all the required fields.
-"""
-        
-        return prompt
-    
-    def evaluate_submission(self, data: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
-        """Generate a prompt for Azure OpenAI to evaluate a candidate's assessment submission
-        
-        Args:
-            data: Dictionary containing assessment_id, assessment_details, submission, and evaluator_notes
-            **kwargs: Alternative way to pass parameters directly
-                
-        Returns:
-            A prompt for Azure OpenAI to evaluate the submission
-        """
-        # Extract parameters from either data dict or kwargs
-        assessment_id = None
-        assessment_details = None
-        submission = None
-        evaluator_notes = None
-        
-        if data and isinstance(data, dict):
-            assessment_id = data.get("assessment_id")
-            assessment_details = data.get("assessment_details", {})
-            submission = data.get("submission", {})
-            evaluator_notes = data.get("evaluator_notes", {})
-        else:
-            assessment_id = kwargs.get("assessment_id")
-            assessment_details = kwargs.get("assessment_details", {})
-            submission = kwargs.get("submission", {})
-            evaluator_notes = kwargs.get("evaluator_notes", {})
-        
-        # Validate required fields
-        if not assessment_id:
-            return {"error": "Assessment ID is required"}
-        
-        if not submission:
-            return {"error": "Submission data is required"}
-        
-        if not assessment_details:
-            return {"error": "Assessment details are required"}
-        
-        # Prepare the prompt for the AI model
-        prompt = f"""You are an expert technical evaluator specialized in assessing candidate submissions.
 
-Please evaluate the candidate's assessment submission based on the original assessment and any evaluator notes.
+""",
+    suffix="""ASSESSMENT ID: {assessment_id}
 
-ASSESSMENT ID: {assessment_id}
+CANDIDATE PROFILE:
+{candidate_profile}
 
-ORIGINAL ASSESSMENT:
-{json.dumps(assessment_details, indent=2)}
+JOB INFORMATION:
+{job_info}
+"""
+)
 
-CANDIDATE SUBMISSION:
-{json.dumps(submission, indent=2)}
+EVALUATION_PROMPT = PromptTemplate(
+    name="submission_evaluator",
+    prefix="""You are an expert technical evaluator specialized in assessing candidate submissions.
 
-EVALUATOR NOTES (if any):
-{json.dumps(evaluator_notes or {}, indent=2)}
+Please evaluate the candidate's assessment submission based on the original assessment and any evaluator notes, which are given at the end of this prompt.
 
 INSTRUCTIONS:
 1. Analyze the candidate's answers against the assessment questions
 2. Evaluate technical accuracy, problem-solving approach, and communication
 3. Provide scores and detailed feedback for each area
 4. Make an overall recommendation based on the scores
+5. If the coding challenge is marked "graded_locally", the code was already run against its test cases; use the reported results instead of judging the code
+6. Answers listed under "locally_scored" were already scored (0-100) against the reference answers and rubrics; use those scores and only judge the answers that are given in full
 
 REQUIRED OUTPUT FORMAT:
-{{
-    "assessment_id": "{assessment_id}",
-    "scores": {{
+{
+    "assessment_id": "the ASSESSMENT ID given below",
+    "scores": {
         "technical_knowledge": score (0-100),
         "problem_solving": score (0-100),
         "communication": score (0-100),
         "cultural_fit": score (0-100),
         "experience": score (0-100)
-    }},
+    },
     "overall_score": calculated_overall_score,
-    "feedback": {{
+    "feedback": {
         "technical_knowledge": "Detailed feedback on technical knowledge",
         "problem_solving": "Detailed feedback on problem solving",
         "communication": "Detailed feedback on communication",
         "cultural_fit": "Detailed feedback on cultural fit",
         "experience": "Detailed feedback on experience"
-    }},
+    },
     "strengths": [
         "Key strength 1",
         "Key strength 2",
@@ -221,18 +220,17 @@ REQUIRED OUTPUT FORMAT:
         "Area for improvement 2",
         ...
     ],
-    "evaluator_notes": {{ // Include any provided notes here
+    "evaluator_notes": { // Include any provided notes here
         ...
-    }},
+    },
     "status": "passed" or "failed",
     "recommendation": "Your recommendation about this candidate",
     "next_steps": [
         "Suggested next step 1",
         "Suggested next step 2",
         ...
-    ],
-    "evaluated_at": "{datetime.datetime.now().isoformat()}"
-}}
+    ]
+}
 
 IMPORTANT GUIDELINES:
 1. Be objective and fair in your evaluation
@@ -244,9 +242,701 @@ IMPORTANT GUIDELINES:
 7. Do not include any explanation or text outside the JSON structure
 
 The output MUST be a valid JSON object with all the required fields.
+
+""",
+    suffix="""ASSESSMENT ID: {assessment_id}
+
+ORIGINAL ASSESSMENT:
+{assessment_details}
+
+CANDIDATE SUBMISSION:
+{submission}
+
+EVALUATOR NOTES (if any):
+{evaluator_notes}
 """
+)
+
+# Several submissions for one assessment in a single request; the assessment
+# is sent once and each evaluation is keyed by its submission id
+BATCH_EVALUATION_PROMPT = PromptTemplate(
+    name="batch_submission_evaluator",
+    prefix="""You are an expert technical evaluator specialized in assessing candidate submissions.
+
+Please evaluate several candidates' submissions for the same assessment. The original assessment is given once at the end of this prompt, followed by the submissions keyed by SUBMISSION ID.
+
+INSTRUCTIONS:
+1. Evaluate each submission independently against the assessment questions; do not compare candidates with each other
+2. Evaluate technical accuracy, problem-solving approach, and communication
+3. Provide scores and detailed feedback for each area
+4. Make an overall recommendation for each candidate based on their scores
+5. If a coding challenge is marked "graded_locally", the code was already run against its test cases; use the reported results instead of judging the code
+6. Answers listed under "locally_scored" were already scored (0-100) against the reference answers and rubrics; use those scores and only judge the answers that are given in full
+
+REQUIRED OUTPUT FORMAT:
+{
+    "evaluations": [
+        {
+            "submission_id": "the SUBMISSION ID of the submission",
+            "scores": {
+                "technical_knowledge": score (0-100),
+                "problem_solving": score (0-100),
+                "communication": score (0-100),
+                "cultural_fit": score (0-100),
+                "experience": score (0-100)
+            },
+            "overall_score": calculated_overall_score,
+            "feedback": {
+                "technical_knowledge": "Feedback on technical knowledge",
+                "problem_solving": "Feedback on problem solving",
+                "communication": "Feedback on communication",
+                "cultural_fit": "Feedback on cultural fit",
+                "experience": "Feedback on experience"
+            },
+            "strengths": ["Key strength 1", ...],
+            "areas_for_improvement": ["Area for improvement 1", ...],
+            "status": "passed" or "failed",
+            "recommendation": "Your recommendation about this candidate",
+            "next_steps": ["Suggested next step 1", ...]
+        },
+        ... (exactly one object per submission)
+    ]
+}
+
+IMPORTANT GUIDELINES:
+1. Be objective and fair in your evaluation
+2. Base scores on demonstrated skills, not assumptions
+3. Provide constructive feedback, even for high scores
+4. Use a 70% threshold for passing
+5. Ensure your response is valid JSON with proper formatting
+6. Do not include any explanation or text outside the JSON structure
+
+The output MUST be a valid JSON object with all the required fields.
+
+""",
+    suffix="""ASSESSMENT ID: {assessment_id}
+
+ORIGINAL ASSESSMENT:
+{assessment_details}
+
+SUBMISSIONS:
+{submissions}
+"""
+)
+
+# Fixed scoring guide, filled in locally instead of being generated each time
+SCORING_GUIDE = {
+    "1": "Does not meet expectations",
+    "2": "Partially meets expectations",
+    "3": "Meets expectations",
+    "4": "Exceeds expectations",
+    "5": "Significantly exceeds expectations"
+}
+
+# Short keys of the compact output formats. Ids, names, timestamps, question
+# types, the scoring guide and the pass/fail status are known locally and are
+# left out of the compact formats.
+ASSESSMENT_CONTRACT = OutputContract({
+    "skills_assessed": "sa",
+    "technical_questions": ("tq", [{"skill": "s", "question": "q"}]),
+    "behavioral_questions": ("bq", [{"question": "q"}]),
+    "coding_challenge": ("cc", {
+        "title": "t",
+        "description": "d",
+        "requirements": "r",
+        "time_limit": "tl",
+        "language": "l",
+        "test_cases": ("tc", [{"input": "i", "expected_output": "o"}])
+    }),
+    "evaluation_criteria": "ec"
+})
+
+SCORE_KEYS = {
+    "technical_knowledge": "tk",
+    "problem_solving": "ps",
+    "communication": "cm",
+    "cultural_fit": "cf",
+    "experience": "ex"
+}
+
+EVALUATION_CONTRACT = OutputContract({
+    "scores": ("sc", SCORE_KEYS),
+    "overall_score": "o",
+    "feedback": ("f", SCORE_KEYS),
+    "strengths": "st",
+    "areas_for_improvement": "ai",
+    "recommendation": "r",
+    "next_steps": "ns"
+})
+
+# JSON Schema of the optional coding challenge of an assessment or bank entry
+CODING_CHALLENGE_SCHEMA = {
+    **template_schema({
+        "title": "",
+        "description": "",
+        "requirements": [""],
+        "time_limit": "",
+        "language": "",
+        "test_cases": [{"input": "", "expected_output": ""}]
+    }),
+    "required": ["title", "description"]
+}
+
+ASSESSMENT_OUTPUT = StructuredOutput(
+    "assessment", ASSESSMENT_SCHEMA, ASSESSMENT_CONTRACT,
+    properties={"coding_challenge": CODING_CHALLENGE_SCHEMA, "scoring_guide": {"type": "object"}}
+)
+
+EVALUATION_OUTPUT = StructuredOutput("evaluation", EVALUATION_SCHEMA, EVALUATION_CONTRACT)
+
+# Only used for the response_format and for loading; every entry is conformed
+# with EVALUATION_OUTPUT
+BATCH_EVALUATION_OUTPUT = StructuredOutput(
+    "batch_evaluation", {"evaluations": [{"submission_id": "", **EVALUATION_SCHEMA}]}
+)
+
+ASSESSMENT_COMPACT_PROMPT = PromptTemplate(
+    name="candidate_assessor_compact",
+    prefix="""You are an expert technical recruiter specialized in creating candidate assessments.
+
+Please create a comprehensive assessment for a candidate based on their profile and the job requirements, which are given at the end of this prompt.
+
+INSTRUCTIONS:
+1. Analyze the candidate's skills and experience against the job requirements
+2. Create 5-8 technical questions specific to the technologies in their profile and 3-5 behavioral questions relevant to the role and seniority
+3. Include a coding challenge only if the role is technical; give it 3-5 stdin/stdout test cases when the language is Python
+4. Provide evaluation criteria
+5. Generate challenging but fair questions that match the candidate's skill level
+
+OUTPUT FORMAT:
+Reply with a single line of minified JSON using these short keys:
+{"sa":["skill assessed"],"tq":[{"s":"skill","q":"question"}],"bq":[{"q":"question"}],"cc":{"t":"title","d":"description","r":["requirement"],"tl":"time limit","l":"language","tc":[{"i":"stdin","o":"expected stdout"}]},"ec":{"criterion":"how to evaluate it"}}
+
+RULES:
+- Do not repeat the candidate's name, the job title or the company
+- No whitespace between tokens, no markdown, no text outside the JSON
+
+""",
+    suffix="""CANDIDATE PROFILE:
+{candidate_profile}
+
+JOB INFORMATION:
+{job_info}
+"""
+)
+
+EVALUATION_COMPACT_PROMPT = PromptTemplate(
+    name="submission_evaluator_compact",
+    prefix="""You are an expert technical evaluator specialized in assessing candidate submissions.
+
+Please evaluate the candidate's assessment submission based on the original assessment and any evaluator notes, which are given at the end of this prompt.
+
+INSTRUCTIONS:
+1. Analyze the candidate's answers against the assessment questions
+2. Evaluate technical accuracy, problem-solving approach, and communication
+3. Score each area from 0 to 100 and give short feedback for each
+4. Be objective and fair; base scores on demonstrated skills, not assumptions
+5. If the coding challenge is marked "graded_locally", the code was already run against its test cases; use the reported results instead of judging the code
+6. Answers listed under "locally_scored" were already scored (0-100) against the reference answers and rubrics; use those scores and only judge the answers that are given in full
+
+OUTPUT FORMAT:
+Reply with a single line of minified JSON using these short keys, where tk=technical_knowledge, ps=problem_solving, cm=communication, cf=cultural_fit, ex=experience:
+{"sc":{"tk":0,"ps":0,"cm":0,"cf":0,"ex":0},"o":overall_score,"f":{"tk":"feedback","ps":"feedback","cm":"feedback","cf":"feedback","ex":"feedback"},"st":["strength"],"ai":["area for improvement"],"r":"recommendation","ns":["next step"]}
+
+RULES:
+- No whitespace between tokens, no markdown, no text outside the JSON
+
+""",
+    suffix="""ORIGINAL ASSESSMENT:
+{assessment_details}
+
+CANDIDATE SUBMISSION:
+{submission}
+
+EVALUATOR NOTES (if any):
+{evaluator_notes}
+"""
+)
+
+# Submission keys that may hold coding-challenge source code
+CODE_KEYS = ("code", "solution", "source_code")
+
+
+def _submitted_code(submission: Dict[str, Any]):
+    """Find the coding-challenge code and its language in a submission"""
+    solution = submission.get("coding_challenge")
+    if isinstance(solution, str):
+        return solution, None
+    for container in (solution, submission):
+        if isinstance(container, dict):
+            for key in CODE_KEYS:
+                if isinstance(container.get(key), str) and container[key].strip():
+                    return container[key], container.get("language")
+    return None, None
+
+
+def _submitted_answers(submission: Dict[str, Any], question_ids) -> Dict[str, Any]:
+    """Find the answers in a submission, keyed by question id"""
+    answers = submission.get("answers")
+    if isinstance(answers, list):
+        answers = {item.get("question_id"): item.get("answer") for item in answers if isinstance(item, dict)}
+    if not isinstance(answers, dict):
+        answers = {key: value for key, value in submission.items() if key in question_ids}
+    return answers
+
+
+def _assessment_questions(assessment_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        question
+        for key in ("technical_questions", "behavioral_questions")
+        for question in assessment_details.get(key) or []
+        if isinstance(question, dict) and question.get("question_id")
+    ]
+
+
+class CandidateAssessorTool:
+    """Tool for assessing candidates and generating interview questions using Azure OpenAI through Moya."""
+    
+    def __init__(self, code_grader: Optional[CodeGrader] = None, answer_scorer: Optional[AnswerScorer] = None,
+                 compact_output: bool = COMPACT_LLM_OUTPUT):
+        self.name = "candidate_assessor"
+        self.description = "Assesses candidate qualifications and generates customized assessments using AI"
+        self.compact_output = compact_output
+        self.code_grader = code_grader or CodeGrader()
+        self.answer_scorer = answer_scorer or AnswerScorer()
+
+    @property
+    def assessment_response_format(self) -> Dict[str, Any]:
+        """The response_format for generate_assessment prompts"""
+        return ASSESSMENT_OUTPUT.response_format(self.compact_output)
+
+    @property
+    def evaluation_response_format(self) -> Dict[str, Any]:
+        """The response_format for evaluate_submission prompts"""
+        return EVALUATION_OUTPUT.response_format(self.compact_output)
+
+    @property
+    def batch_evaluation_response_format(self) -> Dict[str, Any]:
+        """The response_format for evaluate_submissions_batch prompts"""
+        return BATCH_EVALUATION_OUTPUT.response_format()
+
+    def generate_assessment(self, data: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
+        """Generate a prompt for Azure OpenAI to create an assessment for a candidate
+        
+        Args:
+            data: Dictionary containing candidate_profile and job_info
+            **kwargs: Alternative way to pass candidate_profile and job_info directly
+                
+        Returns:
+            A prompt for Azure OpenAI to create an assessment
+        """
+        # Extract candidate_profile and job_info from either data dict or kwargs
+        candidate_profile = None
+        job_info = None
+        
+        if data and isinstance(data, dict):
+            candidate_profile = data.get("candidate_profile", {})
+            job_info = data.get("job_info", {})
+        else:
+            candidate_profile = kwargs.get("candidate_profile", {})
+            job_info = kwargs.get("job_info", {})
+        
+        # Validate required fields
+        if not candidate_profile:
+            return {"error": "Candidate profile is required"}
         
-        return prompt
+        if not job_info:
+            return {"error": "Job information is required"}
+            
+        candidate_profile = serialize_for_prompt("assessment.candidate_profile", candidate_profile, PROFILE_PROJECTION)
+        job_info = serialize_for_prompt("assessment.job_info", job_info, JOB_PROJECTION)
+        if self.compact_output:
+            # The assessment id is assigned locally when the reply is parsed
+            return ASSESSMENT_COMPACT_PROMPT.render(candidate_profile=candidate_profile, job_info=job_info)
+        
+        # Create a unique assessment ID
+        assessment_id = f"ASM-{uuid.uuid4().hex[:8].upper()}"
+        
+        return ASSESSMENT_PROMPT.render(
+            assessment_id=assessment_id,
+            candidate_profile=candidate_profile,
+            job_info=job_info
+        )
+    
+    def parse_assessment(self, response: str, candidate_profile: Dict[str, Any] = None,
+                         job_info: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Convert the model's reply to a generate_assessment prompt into an assessment
+        
+        Short keys of the compact format are expanded, and the fields it
+        leaves out are filled in locally.
+        
+        Args:
+            response: The raw model output
+            candidate_profile: The profile the assessment was generated for
+            job_info: The job the assessment was generated for
+            
+        Returns:
+            The assessment with every field present, or None if the output
+            contains no recoverable JSON object
+        """
+        assessment = ASSESSMENT_OUTPUT.load(response)
+        if not isinstance(assessment, dict):
+            return None
+        candidate_profile = candidate_profile or {}
+        job_info = job_info or {}
+        assessment.setdefault("assessment_id", f"ASM-{uuid.uuid4().hex[:8].upper()}")
+        if candidate_profile.get("name") not in (None, "", "N/A"):
+            assessment.setdefault("candidate_name", candidate_profile["name"])
+        if job_info.get("title"):
+            assessment.setdefault("job_title", job_info["title"])
+        if job_info.get("company"):
+            assessment.setdefault("company", job_info["company"])
+        assessment.setdefault("scoring_guide", SCORING_GUIDE)
+        
+        assessment = ASSESSMENT_OUTPUT.conform(assessment)
+        for prefix, key, question_type in (("TQ", "technical_questions", "technical"),
+                                           ("BQ", "behavioral_questions", "behavioral")):
+            for index, question in enumerate(assessment[key], start=1):
+                question["question_id"] = question["question_id"] or f"{prefix}-{index}"
+                question["type"] = question["type"] or question_type
+        # Timestamps are kept out of the prompt so its prefix stays cacheable
+        if not assessment["created_at"]:
+            assessment["created_at"] = datetime.datetime.now().isoformat()
+        return assessment
+    
+    def evaluate_submission(self, data: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
+        """Generate a prompt for Azure OpenAI to evaluate a candidate's assessment submission
+        
+        Args:
+            data: Dictionary containing assessment_id, assessment_details, submission, and evaluator_notes,
+                plus an optional precomputed coding-challenge grading and local answer scoring.
+                The code is graded here only when there is no grading key; a grading of
+                None means there was nothing to grade
+            **kwargs: Alternative way to pass parameters directly
+                
+        Returns:
+            A prompt for Azure OpenAI to evaluate the submission
+        """
+        # Extract parameters from either data dict or kwargs
+        assessment_id = None
+        assessment_details = None
+        submission = None
+        evaluator_notes = None
+        grading = None
+        scoring = None
+        
+        if data and isinstance(data, dict):
+            assessment_id = data.get("assessment_id")
+            assessment_details = data.get("assessment_details", {})
+            submission = data.get("submission", {})
+            evaluator_notes = data.get("evaluator_notes", {})
+            grading = data.get("grading")
+            graded = "grading" in data
+            scoring = data.get("scoring")
+        else:
+            assessment_id = kwargs.get("assessment_id")
+            assessment_details = kwargs.get("assessment_details", {})
+            submission = kwargs.get("submission", {})
+            evaluator_notes = kwargs.get("evaluator_notes", {})
+            grading = kwargs.get("grading")
+            graded = "grading" in kwargs
+            scoring = kwargs.get("scoring")
+        
+        # Validate required fields
+        if not assessment_id:
+            return {"error": "Assessment ID is required"}
+        
+        if not submission:
+            return {"error": "Submission data is required"}
+        
+        if not assessment_details:
+            return {"error": "Assessment details are required"}
+        
+        # Code with test cases is graded locally; only the results reach the prompt
+        if not graded:
+            grading = self.grade_coding_challenge(assessment_details, submission)
+        if grading is not None:
+            assessment_details, submission = self._without_code(assessment_details, submission, grading)
+        if scoring is not None:
+            submission = self._with_local_scores(assessment_details, submission, scoring)
+        
+        variables = dict(
+            assessment_details=serialize_for_prompt("evaluation.assessment", assessment_details, ASSESSMENT_PROJECTION),
+            submission=serialize_for_prompt("evaluation.submission", submission),
+            evaluator_notes=serialize_for_prompt("evaluation.evaluator_notes", evaluator_notes or {})
+        )
+        if self.compact_output:
+            return EVALUATION_COMPACT_PROMPT.render(**variables)
+        return EVALUATION_PROMPT.render(assessment_id=assessment_id, **variables)
+    
+    def grade_coding_challenge(self, assessment_details: Dict[str, Any],
+                               submission: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run the submitted coding-challenge code against the challenge's test cases
+        
+        Args:
+            assessment_details: The original assessment
+            submission: Candidate's answers and solutions
+            
+        Returns:
+            The grading result, or None if the challenge has no test cases,
+            no code was submitted or the language cannot be graded locally
+        """
+        return self.grade_coding_challenges(assessment_details, [submission])[0]
+    
+    def grade_coding_challenges(self, assessment_details: Dict[str, Any],
+                                submissions: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Run the coding-challenge code of several submissions in parallel
+        
+        Args:
+            assessment_details: The assessment the submissions answer
+            submissions: Candidate submissions
+            
+        Returns:
+            One grading result per submission, None where it cannot be
+            graded, as for grade_coding_challenge
+        """
+        challenge = assessment_details.get("coding_challenge") or {}
+        test_cases = challenge.get("test_cases") if isinstance(challenge, dict) else None
+        jobs = []
+        for submission in submissions:
+            code, language = _submitted_code(submission)
+            if test_cases and code:
+                jobs.append({"code": code, "test_cases": test_cases,
+                             "language": language or challenge.get("language", "python")})
+            else:
+                jobs.append(None)
+        
+        results = iter(self.code_grader.grade_many([job for job in jobs if job is not None]))
+        gradings = []
+        for job in jobs:
+            grading = next(results) if job is not None else None
+            gradings.append(None if grading is None or grading.get("status") == "unsupported" else grading)
+        return gradings
+    
+    @staticmethod
+    def _without_code(assessment_details: Dict[str, Any], submission: Dict[str, Any],
+                      grading: Dict[str, Any]):
+        """Replace the code and test cases with the grading summary"""
+        challenge = assessment_details.get("coding_challenge")
+        if isinstance(challenge, dict):
+            challenge = {key: value for key, value in challenge.items() if key != "test_cases"}
+            assessment_details = {**assessment_details, "coding_challenge": challenge}
+        
+        solution = submission.get("coding_challenge")
+        # Keep whatever the candidate wrote about their solution, minus the code itself
+        solution = {key: value for key, value in solution.items() if key not in CODE_KEYS} if isinstance(solution, dict) else {}
+        solution.update(summarize_grading(grading))
+        submission = {key: value for key, value in submission.items() if key not in CODE_KEYS}
+        submission["coding_challenge"] = solution
+        return assessment_details, submission
+    
+    def score_answers(self, assessment_details: Dict[str, Any],
+                      submissions: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Score the free-text answers of submissions against the reference material
+        
+        Args:
+            assessment_details: The assessment the submissions answer
+            submissions: Candidate submissions for that assessment
+            
+        Returns:
+            One scoring per submission with per-question scores, confidences
+            and the ids of the answers to escalate to the LLM; all None if the
+            assessment has no reference answers or rubrics
+        """
+        questions = _assessment_questions(assessment_details)
+        if not any(question.get("reference_answer") or question.get("rubric") for question in questions):
+            return [None] * len(submissions)
+        question_ids = {question["question_id"] for question in questions}
+        return self.answer_scorer.score(
+            questions,
+            [_submitted_answers(submission, question_ids) for submission in submissions]
+        )
+    
+    @staticmethod
+    def _with_local_scores(assessment_details: Dict[str, Any], submission: Dict[str, Any],
+                           scoring: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace confidently scored answers with their local scores"""
+        question_ids = {question["question_id"] for question in _assessment_questions(assessment_details)}
+        answers = _submitted_answers(submission, question_ids)
+        question_scores = scoring["question_scores"]
+        local = {
+            question_id: result["score"]
+            for question_id, result in question_scores.items()
+            if not result["escalate"]
+        }
+        submission = {key: value for key, value in submission.items() if key != "answers" and key not in question_ids}
+        submission["answers"] = {question_id: answer for question_id, answer in answers.items() if question_id not in local}
+        submission["locally_scored"] = local
+        return submission
+    
+    def build_local_evaluation(self, assessment_details: Dict[str, Any], scoring: Dict[str, Any],
+                               grading: Dict[str, Any] = None,
+                               evaluator_notes: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build an evaluation from local answer scores, without the LLM
+        
+        Args:
+            assessment_details: The assessment the submission answers
+            scoring: Local answer scoring with no escalated answers
+            grading: Optional coding-challenge grading
+            evaluator_notes: Notes from the evaluator (optional)
+            
+        Returns:
+            An evaluation in the same shape as parse_evaluation returns
+        """
+        question_scores = scoring["question_scores"]
+        
+        def mean_score(key):
+            values = [
+                question_scores[question["question_id"]]["score"]
+                for question in assessment_details.get(key) or []
+                if question_scores.get(question.get("question_id"), {}).get("score") is not None
+            ]
+            return sum(values) / len(values) if values else None
+        
+        technical = mean_score("technical_questions")
+        behavioral = mean_score("behavioral_questions")
+        coding = grading["pass_rate"] * 100 if grading else None
+        parts = [value for value in (technical, behavioral, coding) if value is not None]
+        overall = round(sum(parts) / len(parts), 1) if parts else 0
+        
+        def area(*values):
+            values = [value for value in values if value is not None]
+            return round(sum(values) / len(values), 1) if values else overall
+        
+        passed = overall >= assessment_details.get("passing_threshold", 70)
+        skills = {
+            question.get("question_id"): question.get("skill") or question.get("question", "")[:60]
+            for question in assessment_details.get("technical_questions") or []
+        }
+        return coerce_to_schema({
+            "assessment_id": assessment_details.get("assessment_id", ""),
+            "scores": {
+                "technical_knowledge": area(technical),
+                "problem_solving": area(coding, technical),
+                "communication": area(behavioral),
+                "cultural_fit": area(behavioral),
+                "experience": area(technical)
+            },
+            "overall_score": overall,
+            "feedback": {"summary": "Scored locally against the assessment's reference answers and rubrics"},
+            "strengths": [skills[qid] for qid, result in question_scores.items()
+                          if qid in skills and (result["score"] or 0) >= 75],
+            "areas_for_improvement": [skills[qid] for qid, result in question_scores.items()
+                                      if qid in skills and (result["score"] or 0) < 40],
+            "evaluator_notes": evaluator_notes or {},
+            "status": "passed" if passed else "failed",
+            "recommendation": "Proceed to interview" if passed else "Do not proceed",
+            "next_steps": ["Schedule an interview"] if passed else [],
+            "evaluated_at": datetime.datetime.now().isoformat(),
+            "evaluated_by": "local"
+        }, EVALUATION_SCHEMA)
+    
+    def evaluate_submissions_batch(self, assessment_id: str, assessment_details: Dict[str, Any],
+                                   submissions: Dict[str, Dict[str, Any]],
+                                   evaluator_notes: Dict[str, Dict[str, Any]] = None,
+                                   gradings: Dict[str, Dict[str, Any]] = None,
+                                   scorings: Dict[str, Dict[str, Any]] = None) -> Any:
+        """Generate one prompt that evaluates several submissions for the same assessment
+        
+        Args:
+            assessment_id: ID of the assessment
+            assessment_details: The original assessment
+            submissions: Candidate submissions keyed by submission id
+            evaluator_notes: Optional evaluator notes keyed by submission id
+            gradings: Optional precomputed coding-challenge gradings keyed by submission id
+            scorings: Optional local answer scorings keyed by submission id
+                
+        Returns:
+            A prompt for Azure OpenAI to evaluate all the submissions
+        """
+        if not assessment_id:
+            return {"error": "Assessment ID is required"}
+        
+        if not submissions:
+            return {"error": "Submission data is required"}
+        
+        if not assessment_details:
+            return {"error": "Assessment details are required"}
+        
+        evaluator_notes = evaluator_notes or {}
+        gradings = gradings or {}
+        scorings = scorings or {}
+        items = {}
+        for submission_id, submission in submissions.items():
+            grading = gradings.get(submission_id)
+            if grading is not None:
+                _, submission = self._without_code(assessment_details, submission, grading)
+            if scorings.get(submission_id) is not None:
+                submission = self._with_local_scores(assessment_details, submission, scorings[submission_id])
+            item = {"submission": submission}
+            if evaluator_notes.get(submission_id):
+                item["evaluator_notes"] = evaluator_notes[submission_id]
+            items[submission_id] = item
+        
+        return BATCH_EVALUATION_PROMPT.render(
+            assessment_id=assessment_id,
+            assessment_details=serialize_for_prompt("batch_evaluation.assessment", assessment_details, ASSESSMENT_PROJECTION),
+            submissions=serialize_for_prompt("batch_evaluation.submissions", items)
+        )
+    
+    def parse_batch_evaluation(self, response: str, assessment_id: str) -> Dict[str, Dict[str, Any]]:
+        """Convert the model's reply to a batch evaluation prompt into evaluations
+        
+        Args:
+            response: The raw model output
+            assessment_id: ID of the assessment the submissions belong to
+            
+        Returns:
+            Evaluations keyed by submission id; submissions the model skipped
+            or whose entries could not be recovered are missing
+        """
+        data = BATCH_EVALUATION_OUTPUT.load(response)
+        if isinstance(data, dict):
+            data = data.get("evaluations", [])
+        if not isinstance(data, list):
+            return {}
+        
+        evaluations = {}
+        for item in data:
+            if not isinstance(item, dict) or not item.get("submission_id"):
+                continue
+            submission_id = str(item.pop("submission_id"))
+            item["assessment_id"] = assessment_id
+            item["evaluated_at"] = datetime.datetime.now().isoformat()
+            evaluations[submission_id] = EVALUATION_OUTPUT.conform(item)
+        return evaluations
+    
+    def parse_evaluation(self, response: str, assessment_details: Dict[str, Any] = None,
+                         evaluator_notes: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Convert the model's reply to an evaluate_submission prompt into an evaluation
+        
+        Short keys of the compact format are expanded, and the fields it
+        leaves out are filled in locally.
+        
+        Args:
+            response: The raw model output
+            assessment_details: The assessment that was evaluated
+            evaluator_notes: The evaluator notes sent with the submission
+            
+        Returns:
+            The evaluation with every field present, or None if the output
+            contains no recoverable JSON object
+        """
+        evaluation = EVALUATION_OUTPUT.load(response)
+        if not isinstance(evaluation, dict):
+            return None
+        assessment_details = assessment_details or {}
+        if assessment_details.get("assessment_id"):
+            evaluation.setdefault("assessment_id", assessment_details["assessment_id"])
+        if evaluator_notes:
+            evaluation.setdefault("evaluator_notes", evaluator_notes)
+        if "status" not in evaluation and "overall_score" in evaluation:
+            threshold = assessment_details.get("passing_threshold", 70)
+            evaluation["status"] = "passed" if coerce_to_schema(evaluation["overall_score"], 0) >= threshold else "failed"
+        evaluation = EVALUATION_OUTPUT.conform(evaluation)
+        if not evaluation["evaluated_at"]:
+            evaluation["evaluated_at"] = datetime.datetime.now().isoformat()
+        return evaluation
 
 
 class CandidateAssessorAgent(Agent):
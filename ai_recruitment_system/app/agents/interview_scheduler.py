@@ -1,8 +1,34 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import datetime
+import sqlite3
 from moya.agents.base_agent import Agent, AgentConfig
 from moya.tools.base_tool import BaseTool
 
+from app.utils.availability import AvailabilityEngine
+from app.utils.interview_assignment import assign_interviews
+from app.utils.interview_store import InterviewStore, get_interview_store, new_interview_id
+from app.utils.booking import SlotBooker
+from app.utils.panel_scheduling import find_panel_options
+from app.utils.recurrence import job_interview_slots, INTERVIEW_SLOT_WINDOW_DAYS
+from app.utils import slot_table
+from app.utils.slot_table import slot_epoch, format_epoch
+
+def _window(window: Any) -> Tuple[datetime.datetime, datetime.datetime]:
+    """Start and end of an availability window given as days from now or ISO times"""
+    if isinstance(window, dict):
+        start = datetime.datetime.fromisoformat(window["start"]) if window.get("start") else slot_table.now()
+        if window.get("end"):
+            end = datetime.datetime.fromisoformat(window["end"])
+        else:
+            end = start + datetime.timedelta(days=float(window.get("days") or INTERVIEW_SLOT_WINDOW_DAYS))
+    else:
+        start = slot_table.now()
+        end = start + datetime.timedelta(days=float(INTERVIEW_SLOT_WINDOW_DAYS if window is None else window))
+    if end <= start:
+        raise ValueError("window ends before it starts")
+    return start, end
+
+
 class InterviewSchedulerTool(BaseTool):
     """Tool for scheduling interviews and managing interview slots"""
     
@@ -10,10 +36,37 @@ class InterviewSchedulerTool(BaseTool):
     description = "Schedules interviews and manages available interview slots"
     function = "schedule_interview"
     
-    def __init__(self):
-        """Initialize the interview scheduler tool"""
+    def __init__(self, availability: Optional[AvailabilityEngine] = None,
+                 store: Optional[InterviewStore] = None,
+                 booker: Optional[SlotBooker] = None):
+        """Initialize the interview scheduler tool
+        
+        Args:
+            availability: Optional interviewer and room calendars
+            store: Optional interview store; defaults to the shared store of
+                the configured database
+            booker: Optional slot booker to share with other scheduler
+                tools; its calendars and store are used
+        """
         super().__init__(name=self.name, function=self.function)
-        self.scheduled_interviews = []
+        if booker is None:
+            booker = SlotBooker(availability or AvailabilityEngine(), store or get_interview_store())
+        self.booker = booker
+        self.availability = booker.availability
+        self.store = booker.store
+        
+        # Jobs by job_id, for availability requests that only name the job
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        
+        # Interviews booked by earlier runs keep their interviewers and rooms busy
+        today = datetime.date.today().isoformat()
+        for interview in self.store.find(status="scheduled", from_date=today):
+            self.availability.book(interview.get("schedule", {}))
+    
+    @property
+    def scheduled_interviews(self) -> List[Dict[str, Any]]:
+        """All stored interviews, ordered by date and time"""
+        return self.store.find()
     
     def schedule_interview(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Schedule an interview based on candidate and job information
@@ -42,17 +95,16 @@ class InterviewSchedulerTool(BaseTool):
             return {"error": "Valid interview slot is required"}
         
         # Create interview record
-        interview_id = f"INT-{len(self.scheduled_interviews) + 1:03d}"
+        interview_id = new_interview_id()
         
         # Format date for display
         interview_date = selected_slot.get("date", "")
         interview_time = selected_slot.get("time", "")
+        starts_at = slot_epoch(selected_slot)
         
-        try:
-            date_obj = datetime.datetime.strptime(f"{interview_date} {interview_time}", "%Y-%m-%d %H:%M")
-            formatted_date = date_obj.strftime("%A, %B %d, %Y")
-            formatted_time = date_obj.strftime("%I:%M %p")
-        except ValueError:
+        if starts_at is not None:
+            formatted_date, formatted_time = format_epoch(starts_at)
+        else:
             formatted_date = interview_date
             formatted_time = interview_time
         
@@ -72,6 +124,7 @@ class InterviewSchedulerTool(BaseTool):
             "schedule": {
                 "date": interview_date,
                 "time": interview_time,
+                "starts_at": starts_at,
                 "formatted_date": formatted_date,
                 "formatted_time": formatted_time,
                 "interviewer": selected_slot.get("interviewer"),
@@ -81,8 +134,22 @@ class InterviewSchedulerTool(BaseTool):
             "created_at": datetime.datetime.now().isoformat()
         }
         
-        # Add interview to scheduled list
-        self.scheduled_interviews.append(interview)
+        # Kept so the calendars are rebuilt with the whole panel and length
+        for key in ("panel", "duration_minutes"):
+            if selected_slot.get(key):
+                interview["schedule"][key] = selected_slot[key]
+        
+        # Book the interviewer and room, unless either is already taken at that
+        # time; the interview is saved in the same transaction
+        try:
+            conflicts = self.booker.book(selected_slot, interview_id, interview)
+        except sqlite3.OperationalError as e:
+            return {"error": f"Interview slot could not be booked, please retry: {str(e)}"}
+        if conflicts:
+            return {
+                "error": f"Interview slot is no longer available: {', '.join(conflicts)} already booked",
+                "conflicts": conflicts
+            }
         
         # Create confirmation message for output
         confirmation = {
@@ -107,12 +174,35 @@ class InterviewSchedulerTool(BaseTool):
         
         return confirmation
     
+    def booking_metrics(self) -> Dict[str, Any]:
+        """Booking attempts, conflicts, lock waits and database retries"""
+        return self.booker.metrics.snapshot()
+    
+    def register_jobs(self, job_listings: List[Dict[str, Any]]) -> List[str]:
+        """Add jobs to the index used to answer availability by job_id
+        
+        Args:
+            job_listings: Jobs with job_id and interview_availability rules
+                or interview_slots
+                
+        Returns:
+            The job_ids, in order
+        """
+        job_ids = []
+        for index, job in enumerate(job_listings or []):
+            if isinstance(job, dict):
+                job_id = str(job.get("job_id") or job.get("title") or f"job-{index}")
+                self.jobs[job_id] = job
+                job_ids.append(job_id)
+        return job_ids
+    
     def get_available_slots(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get available interview slots for a job
         
         Args:
             data: Dictionary containing:
                 - job_id: ID of the job to get slots for
+                - job_info: The job, unless it was registered before
                 
         Returns:
             List of available interview slots
@@ -122,12 +212,136 @@ class InterviewSchedulerTool(BaseTool):
         if not job_id:
             return {"error": "Job ID is required"}
         
-        # In a real system, this would fetch slots from a database
-        # For this demo, we'll just return mock data
+        if data.get("job_info"):
+            self.jobs[str(job_id)] = data["job_info"]
+        
+        result = self.get_available_slots_bulk([job_id])
         return {
             "job_id": job_id,
-            "available_slots": data.get("job_info", {}).get("interview_slots", [])
+            "available_slots": result["available_slots"].get(str(job_id), [])
         }
+    
+    def get_available_slots_bulk(self, job_ids: List[str], window: Any = None) -> Dict[str, Any]:
+        """Get available interview slots for many registered jobs at once
+        
+        The jobs' availability rules are expanded for the window only, and
+        the slots of all jobs are checked against the interviewer and room
+        calendars in one vectorised pass, leaving out booked ones.
+        
+        Args:
+            job_ids: IDs of jobs added with register_jobs
+            window: Number of days from now (default
+                INTERVIEW_SLOT_WINDOW_DAYS), or a dictionary with ISO start
+                and end times
+                
+        Returns:
+            Dictionary with the window, the free slots of each job keyed by
+            job_id and the job_ids that are not registered
+        """
+        try:
+            start, end = _window(window)
+        except (TypeError, ValueError) as e:
+            return {"error": f"Invalid availability window: {str(e)}"}
+        
+        days = (end - start) / datetime.timedelta(days=1)
+        jobs, unknown = [], []
+        for job_id in dict.fromkeys(str(job_id) for job_id in job_ids or []):
+            job = self.jobs.get(job_id)
+            if job is None:
+                unknown.append(job_id)
+                continue
+            slots = job_interview_slots(job, start, days)
+            self.availability.register_slots(slots)
+            jobs.append({"job_id": job_id, "interview_slots": slots})
+        
+        return {
+            "window": {"start": start.isoformat(), "end": end.isoformat()},
+            "available_slots": self.availability.available_slots_bulk(jobs),
+            "unknown_job_ids": unknown
+        }
+    
+    def get_available_slots_for_jobs(self, job_listings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Get available interview slots for many jobs at once
+        
+        Args:
+            job_listings: Jobs with job_id and interview_availability rules
+                or interview_slots
+                
+        Returns:
+            Dictionary with the free slots of each job in the coming days,
+            keyed by job_id
+        """
+        return self.get_available_slots_bulk(self.register_jobs(job_listings))
+    
+    def get_panel_options(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Find times when a job's whole interview panel can meet
+        
+        The panel members' availability comes from the job's
+        interview_availability rules for the coming days. Each option is a
+        slot that can be passed to schedule_interview, which books every
+        panel member and the room.
+        
+        Args:
+            data: Dictionary containing:
+                - job_info: The job, with an interview_panel (see
+                  find_panel_options)
+                - max_options: Optional number of options to return
+                - time_budget: Optional search time limit in seconds
+                
+        Returns:
+            Dictionary with the ranked options, whether the search was
+            complete and search stats
+        """
+        job_info = data.get("job_info", {})
+        panel = job_info.get("interview_panel")
+        
+        if not panel:
+            return {"error": "Job has no interview panel"}
+        
+        start = slot_table.now()
+        self.availability.register_slots(job_interview_slots(job_info, start))
+        options = {}
+        for name in ("max_options", "time_budget"):
+            if data.get(name) is not None:
+                options[name] = data[name]
+        result = find_panel_options(self.availability, panel, start,
+                                    start + datetime.timedelta(days=INTERVIEW_SLOT_WINDOW_DAYS), **options)
+        if "error" not in result:
+            result["job_id"] = job_info.get("job_id")
+        return result
+    
+    def assign_interviews(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign free interview slots to many candidates at once
+        
+        Only slots whose interviewer and room are still free are used. The
+        assignment is a plan; each interview is booked when it is scheduled.
+        
+        Args:
+            data: Dictionary containing:
+                - candidates: Candidates with candidate_id, job_id, priority
+                  and optional availability windows
+                - job_listings: Jobs with job_id and interview_availability
+                  rules or interview_slots
+                
+        Returns:
+            Dictionary with the assignments, the unassigned candidate_ids
+            and solver stats
+        """
+        candidates = data.get("candidates", [])
+        job_listings = data.get("job_listings", [])
+        
+        if not candidates:
+            return {"error": "Candidates are required"}
+        
+        if not job_listings:
+            return {"error": "Job listings are required"}
+        
+        free_slots = self.get_available_slots_for_jobs(job_listings)["available_slots"]
+        jobs = [
+            {**job, "interview_slots": free_slots.get(str(job.get("job_id") or job.get("title") or f"job-{index}"), [])}
+            for index, job in enumerate(job_listings)
+        ]
+        return assign_interviews(candidates, jobs, self.availability.duration_minutes)
 
 
 class InterviewSchedulerAgent(Agent):
@@ -181,6 +395,28 @@ class InterviewSchedulerAgent(Agent):
                 
                 return self.scheduler_tool.get_available_slots(message)
                 
+            elif action == "get_slots_bulk":
+                # Get available slots for many jobs at once
+                if "job_ids" not in message:
+                    return {"error": "Message must contain job_ids"}
+                
+                self.scheduler_tool.register_jobs(message.get("job_listings", []))
+                return self.scheduler_tool.get_available_slots_bulk(message["job_ids"], message.get("window"))
+                
+            elif action == "panel_options":
+                # Find times for a panel interview
+                if "job_info" not in message:
+                    return {"error": "Message must contain job_info"}
+                
+                return self.scheduler_tool.get_panel_options(message)
+                
+            elif action == "assign":
+                # Assign slots to many candidates at once
+                if "candidates" not in message or "job_listings" not in message:
+                    return {"error": "Message must contain candidates and job_listings"}
+                
+                return self.scheduler_tool.assign_interviews(message)
+                
             else:
                 return {"error": f"Unknown action: {action}"}
                 
@@ -1,35 +1,63 @@
 from typing import Dict, Any, Optional, List, Callable
+import json
 import os
 import re
-import spacy
 from dotenv import load_dotenv
 from moya.agents.base_agent import Agent, AgentConfig
 from moya.tools.base_tool import BaseTool
+from ..utils.json_repair import is_truncated_json
+from ..utils.structured_output import StructuredOutput
+from ..utils.prompts import PromptTemplate, estimate_tokens
+from ..utils.output_contracts import OutputContract, COMPACT_LLM_OUTPUT
+from ..utils.nlp import extract_entities, DEFAULT_BATCH_SIZE, DEFAULT_N_PROCESS
 
 # Load environment variables if .env exists
 ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env")
 if os.path.exists(ENV_PATH):
     load_dotenv(dotenv_path=ENV_PATH)
 
-class ResumeParserTool:
-    """Tool for parsing resumes using Azure OpenAI through Moya."""
-    
-    def __init__(self):
-        self.name = "resume_parser"
-        self.description = "Parses resume text to extract structured information using AI"
-        
-    def parse_resume(self, resume_text: str) -> Dict[str, Any]:
-        """
-        Parse resume text using Azure OpenAI through Moya.
-        
-        Args:
-            resume_text: The text content of the resume
-            
-        Returns:
-            Dict containing parsed resume information
-        """
-        # Prepare the prompt for the AI model
-        prompt = f"""You are an expert resume parser. Your task is to extract structured information from the given resume.
+# Estimated prompt tokens allowed in one packed parse request
+RESUME_PACK_TOKEN_BUDGET = int(os.getenv("RESUME_PACK_TOKEN_BUDGET", "4000"))
+
+# Estimated completion tokens allowed in one packed reply, kept below the
+# model's output limit so replies are not cut off
+RESUME_PACK_OUTPUT_BUDGET = int(os.getenv("RESUME_PACK_OUTPUT_BUDGET", "3000"))
+
+# Resumes per packed request, which bounds the length of the reply
+RESUME_PACK_MAX_RESUMES = int(os.getenv("RESUME_PACK_MAX_RESUMES", "6"))
+
+# Estimated reply tokens per resume token; a parsed profile repeats most of the resume
+RESUME_REPLY_TOKEN_RATIO = 0.6
+
+# Expected shape of a parsed resume, with the defaults used for missing fields
+RESUME_SCHEMA = {
+    "name": "N/A",
+    "contact_info": {
+        "email": "N/A",
+        "phone": "N/A",
+        "location": "N/A"
+    },
+    "summary": "N/A",
+    "skills": [""],
+    "experience": [{
+        "company": "N/A",
+        "title": "N/A",
+        "dates": "N/A",
+        "responsibilities": [""]
+    }],
+    "education": [{
+        "degree": "N/A",
+        "institution": "N/A",
+        "dates": "N/A"
+    }],
+    "certifications": [""]
+}
+
+# Static instructions and schema first, so the prefix is byte-identical on
+# every call and provider-side prompt caching can reuse it
+RESUME_PARSER_PROMPT = PromptTemplate(
+    name="resume_parser",
+    prefix="""You are an expert resume parser. Your task is to extract structured information from the resume given at the end of this prompt.
 
 INSTRUCTIONS:
 1. Carefully analyze the resume text
@@ -39,17 +67,14 @@ INSTRUCTIONS:
 5. Use "N/A" for missing information
 6. Keep the response concise and accurate
 
-RESUME TEXT:
-{resume_text}
-
 REQUIRED OUTPUT FORMAT:
-{{
+{
     "name": "full name of the candidate",
-    "contact_info": {{
+    "contact_info": {
         "email": "email address (if found)",
         "phone": "phone number (if found)",
         "location": "location (if found)"
-    }},
+    },
     "summary": "brief professional summary",
     "skills": [
         "skill1",
@@ -57,7 +82,7 @@ REQUIRED OUTPUT FORMAT:
         ...
     ],
     "experience": [
-        {{
+        {
             "company": "company name",
             "title": "job title",
             "dates": "employment period",
@@ -66,15 +91,15 @@ REQUIRED OUTPUT FORMAT:
                 "key responsibility 2",
                 ...
             ]
-        }},
+        },
         ...
     ],
     "education": [
-        {{
+        {
             "degree": "degree name",
             "institution": "school name",
             "dates": "education period"
-        }},
+        },
         ...
     ],
     "certifications": [
@@ -82,7 +107,7 @@ REQUIRED OUTPUT FORMAT:
         "certification2",
         ...
     ]
-}}
+}
 
 IMPORTANT:
 - The response must be a valid JSON object
@@ -91,9 +116,267 @@ IMPORTANT:
 - Include all sections even if empty (use empty arrays [] or "N/A")
 - Ensure proper JSON formatting with quotes around keys and string values
 
+""",
+    suffix="""RESUME TEXT:
+{resume_text}
+
 Please process the resume and return the structured JSON data:"""
+)
+
+# Short keys of the compact output format
+RESUME_CONTRACT = OutputContract({
+    "name": "n",
+    "contact_info": ("c", {"email": "e", "phone": "p", "location": "l"}),
+    "summary": "s",
+    "skills": "k",
+    "experience": ("x", [{"company": "co", "title": "t", "dates": "d", "responsibilities": "r"}]),
+    "education": ("ed", [{"degree": "dg", "institution": "i", "dates": "d"}]),
+    "certifications": "ct"
+})
+
+RESUME_OUTPUT = StructuredOutput("resume", RESUME_SCHEMA, RESUME_CONTRACT)
+
+RESUME_PARSER_COMPACT_PROMPT = PromptTemplate(
+    name="resume_parser_compact",
+    prefix="""You are an expert resume parser. Your task is to extract structured information from the resume given at the end of this prompt.
+
+OUTPUT FORMAT:
+Reply with a single line of minified JSON using these short keys:
+{"n":"full name","c":{"e":"email","p":"phone","l":"location"},"s":"brief professional summary","k":["skill"],"x":[{"co":"company","t":"job title","d":"employment period","r":["key responsibility"]}],"ed":[{"dg":"degree","i":"school","d":"education period"}],"ct":["certification"]}
+
+RULES:
+- Omit keys whose information is not in the resume; never write "N/A" or empty values
+- No whitespace between tokens, no markdown, no text outside the JSON
+
+""",
+    suffix="""RESUME TEXT:
+{resume_text}"""
+)
+
+# Several resumes in one request, each delimited and keyed by a short id
+RESUME_BATCH_PROMPT = PromptTemplate(
+    name="resume_parser_batch",
+    prefix="""You are an expert resume parser. Your task is to extract structured information from each of the resumes given at the end of this prompt.
+
+Each resume starts with a line "=== RESUME <id> ===" and ends with a line "=== END RESUME <id> ===". Parse every resume independently; never mix information between resumes.
+
+INSTRUCTIONS:
+1. Return exactly one entry per resume, with its id in "resume_id"
+2. Use "N/A" for missing information
+3. Keep the response concise and accurate
+
+REQUIRED OUTPUT FORMAT:
+{
+    "resumes": [
+        {
+            "resume_id": "the id of the resume",
+            "name": "full name of the candidate",
+            "contact_info": {"email": "email address", "phone": "phone number", "location": "location"},
+            "summary": "brief professional summary",
+            "skills": ["skill1", ...],
+            "experience": [
+                {"company": "company name", "title": "job title", "dates": "employment period", "responsibilities": ["key responsibility 1", ...]},
+                ...
+            ],
+            "education": [
+                {"degree": "degree name", "institution": "school name", "dates": "education period"},
+                ...
+            ],
+            "certifications": ["certification1", ...]
+        },
+        ...
+    ]
+}
+
+The response must be a valid JSON object. Do not include any explanatory text outside the JSON structure.
+
+""",
+    suffix="""RESUMES:
+{resumes}"""
+)
+
+RESUME_BATCH_CONTRACT = OutputContract({
+    "resumes": ("r", [{"resume_id": "id", **RESUME_CONTRACT.keys}])
+})
+
+# Only used for the response_format and for loading; every entry is conformed
+# with RESUME_OUTPUT
+RESUME_BATCH_OUTPUT = StructuredOutput(
+    "resume_batch", {"resumes": [{"resume_id": "", **RESUME_SCHEMA}]}, RESUME_BATCH_CONTRACT
+)
+
+RESUME_BATCH_COMPACT_PROMPT = PromptTemplate(
+    name="resume_parser_batch_compact",
+    prefix="""You are an expert resume parser. Your task is to extract structured information from each of the resumes given at the end of this prompt.
+
+Each resume starts with a line "=== RESUME <id> ===" and ends with a line "=== END RESUME <id> ===". Parse every resume independently; never mix information between resumes.
+
+OUTPUT FORMAT:
+Reply with a single line of minified JSON holding exactly one entry per resume, using these short keys:
+{"r":[{"id":"resume id","n":"full name","c":{"e":"email","p":"phone","l":"location"},"s":"brief professional summary","k":["skill"],"x":[{"co":"company","t":"job title","d":"employment period","r":["key responsibility"]}],"ed":[{"dg":"degree","i":"school","d":"education period"}],"ct":["certification"]}]}
+
+RULES:
+- Omit keys whose information is not in the resume; never write "N/A" or empty values
+- No whitespace between tokens, no markdown, no text outside the JSON
+
+""",
+    suffix="""RESUMES:
+{resumes}"""
+)
+
+class ResumeParserTool:
+    """Tool for parsing resumes using Azure OpenAI through Moya."""
+    
+    def __init__(self, compact_output: bool = COMPACT_LLM_OUTPUT):
+        self.name = "resume_parser"
+        self.description = "Parses resume text to extract structured information using AI"
+        self.compact_output = compact_output
+        
+    def parse_resume(self, resume_text: str) -> Dict[str, Any]:
+        """
+        Parse resume text using Azure OpenAI through Moya.
+        
+        Args:
+            resume_text: The text content of the resume
+            
+        Returns:
+            Dict containing parsed resume information
+        """
+        template = RESUME_PARSER_COMPACT_PROMPT if self.compact_output else RESUME_PARSER_PROMPT
+        return template.render(resume_text=resume_text)
+
+    @property
+    def response_format(self) -> Dict[str, Any]:
+        """The response_format for parse_resume prompts"""
+        return RESUME_OUTPUT.response_format(self.compact_output)
+
+    def parse_response(self, response: str) -> Optional[Dict[str, Any]]:
+        """Convert the model's reply to a parse_resume prompt into resume data
         
-        return prompt
+        Args:
+            response: The raw model output
+            
+        Returns:
+            The parsed resume data with every field present, or None if the
+            output contains no recoverable JSON object
+        """
+        parsed_data = RESUME_OUTPUT.load(response)
+        if not isinstance(parsed_data, dict):
+            return None
+        return RESUME_OUTPUT.conform(parsed_data)
+
+    def pack_resumes(self, resume_texts: Dict[str, str], token_budget: int = RESUME_PACK_TOKEN_BUDGET,
+                     max_resumes: int = RESUME_PACK_MAX_RESUMES,
+                     output_budget: int = RESUME_PACK_OUTPUT_BUDGET) -> List[List[str]]:
+        """Group resumes into packed parse requests
+        
+        Resumes are packed in order until the next one would take the
+        estimated prompt past the token budget, the estimated reply past the
+        output budget, or the pack is full. A resume that does not fit in a
+        pack on its own gets a pack of its own.
+        
+        Args:
+            resume_texts: Resume texts keyed by id
+            token_budget: Estimated prompt tokens allowed per request
+            max_resumes: Resumes allowed per request
+            output_budget: Estimated completion tokens allowed per reply
+            
+        Returns:
+            The ids of the resumes in each pack
+        """
+        template = RESUME_BATCH_COMPACT_PROMPT if self.compact_output else RESUME_BATCH_PROMPT
+        base_tokens = estimate_tokens(template.prefix)
+        # Every entry of the reply has all the schema's keys, even when empty
+        reply_base_tokens = estimate_tokens(json.dumps(RESUME_SCHEMA, separators=(",", ":")))
+        packs: List[List[str]] = []
+        pack: List[str] = []
+        tokens = base_tokens
+        reply_tokens = 0
+        for resume_id, resume_text in resume_texts.items():
+            # The delimiter lines add roughly 15 tokens per resume
+            text_tokens = estimate_tokens(resume_text)
+            resume_tokens = text_tokens + 15
+            resume_reply_tokens = reply_base_tokens + int(text_tokens * RESUME_REPLY_TOKEN_RATIO)
+            if pack and (tokens + resume_tokens > token_budget
+                         or reply_tokens + resume_reply_tokens > output_budget
+                         or len(pack) >= max_resumes):
+                packs.append(pack)
+                pack, tokens, reply_tokens = [], base_tokens, 0
+            pack.append(resume_id)
+            tokens += resume_tokens
+            reply_tokens += resume_reply_tokens
+        if pack:
+            packs.append(pack)
+        return packs
+
+    def parse_resumes_batch(self, resume_texts: Dict[str, str]) -> str:
+        """Generate one prompt that parses several resumes
+        
+        Args:
+            resume_texts: Resume texts keyed by the ids the model should echo
+            
+        Returns:
+            The prompt for the packed request
+        """
+        template = RESUME_BATCH_COMPACT_PROMPT if self.compact_output else RESUME_BATCH_PROMPT
+        resumes = "\n\n".join(
+            f"=== RESUME {resume_id} ===\n{resume_text.strip()}\n=== END RESUME {resume_id} ==="
+            for resume_id, resume_text in resume_texts.items()
+        )
+        return template.render(resumes=resumes)
+
+    @property
+    def batch_response_format(self) -> Dict[str, Any]:
+        """The response_format for parse_resumes_batch prompts"""
+        return RESUME_BATCH_OUTPUT.response_format(self.compact_output)
+
+    def parse_batch_response(self, response: str, resume_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Split the model's reply to a packed prompt into resume data per id
+        
+        Args:
+            response: The raw model output
+            resume_ids: The ids of the resumes in the request
+            
+        Returns:
+            Resume data keyed by id; resumes the model skipped, or whose
+            entries could not be recovered, are missing. When the reply was
+            cut off, its last entry is missing too: it is incomplete, and
+            conforming it would fill the rest with defaults
+        """
+        data = RESUME_BATCH_OUTPUT.load(response)
+        if isinstance(data, dict):
+            data = data.get("resumes", [])
+        if not isinstance(data, list):
+            return {}
+        
+        entries = [item for item in data if isinstance(item, dict)]
+        if entries and is_truncated_json(response):
+            entries.pop()
+        
+        wanted = set(resume_ids)
+        results = {}
+        for item in entries:
+            resume_id = str(item.pop("resume_id", ""))
+            if resume_id not in wanted or resume_id in results:
+                continue
+            results[resume_id] = RESUME_OUTPUT.conform(item)
+        return results
+
+    def extract_entities(self, resume_texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                         n_process: int = DEFAULT_N_PROCESS) -> List[Dict[str, Any]]:
+        """Extract named entities and skills from many resumes without the LLM
+        
+        Uses the shared spaCy pipeline, which is loaded on first call.
+        
+        Args:
+            resume_texts: The text content of each resume
+            batch_size: Number of resumes per spaCy batch
+            n_process: Number of spaCy worker processes
+            
+        Returns:
+            One dictionary per resume with "entities" and "skills"
+        """
+        return extract_entities(resume_texts, batch_size=batch_size, n_process=n_process)
 
 
 class ResumeParserAgent(Agent):
@@ -0,0 +1,247 @@
+import os
+import json
+import asyncio
+import datetime
+import hashlib
+from typing import Dict, List, Any, Optional
+
+from app.orchestrator import LOCAL_ANSWER_EVALUATION
+
+# Submissions sent to the LLM together in one request
+BATCH_EVALUATION_CHUNK_SIZE = int(os.getenv("BATCH_EVALUATION_CHUNK_SIZE", "5"))
+
+# LLM requests in flight at the same time
+BATCH_EVALUATION_CONCURRENCY = int(os.getenv("BATCH_EVALUATION_CONCURRENCY", "4"))
+
+
+def submission_key(item: Dict[str, Any]) -> str:
+    """Stable id of a submission, derived from its content when none is given"""
+    if item.get("submission_id"):
+        return str(item["submission_id"])
+    content = json.dumps([item.get("assessment_id"), item.get("submission")], sort_keys=True, default=str)
+    return f"SUB-{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12].upper()}"
+
+
+class BatchEvaluator:
+    """Evaluates large numbers of assessment submissions
+
+    Submissions are grouped by assessment_id and sent in chunks, so the shared
+    assessment is included once per request rather than once per submission.
+    Submissions whose answers the local scorer is confident about are
+    evaluated without the LLM. Chunks run concurrently up to a limit. Every
+    finished evaluation is appended to a JSONL checkpoint file, and a rerun
+    with the same file skips the submissions that are already in it.
+    """
+
+    def __init__(self, orchestrator, checkpoint_path: str,
+                 chunk_size: int = BATCH_EVALUATION_CHUNK_SIZE,
+                 max_concurrency: int = BATCH_EVALUATION_CONCURRENCY):
+        """Initialize the batch evaluator
+
+        Args:
+            orchestrator: The RecruitmentOrchestrator used for LLM calls
+            checkpoint_path: JSONL file that evaluations are appended to
+            chunk_size: Submissions per LLM request
+            max_concurrency: LLM requests in flight at the same time
+        """
+        self.orchestrator = orchestrator
+        self.checkpoint_path = checkpoint_path
+        self.chunk_size = max(1, chunk_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self._write_lock = asyncio.Lock()
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        """Read the evaluations already in the checkpoint file
+
+        Returns:
+            Checkpoint records keyed by submission id. A partially written last
+            line, as left by a crash, is ignored.
+        """
+        records = {}
+        if not os.path.exists(self.checkpoint_path):
+            return records
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and record.get("submission_id"):
+                    records[record["submission_id"]] = record
+        return records
+
+    async def _write_records(self, records: List[Dict[str, Any]]) -> None:
+        # The write and fsync run in a worker thread, off the event loop
+        async with self._write_lock:
+            await asyncio.to_thread(self._append_records, records)
+    
+    def _append_records(self, records: List[Dict[str, Any]]) -> None:
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def evaluate(self, submissions: List[Dict[str, Any]],
+                       assessments: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Evaluate every submission that is not yet in the checkpoint
+
+        Args:
+            submissions: Dictionaries with assessment_id and submission, plus
+                optional submission_id, candidate_id and evaluator_notes
+            assessments: The assessments keyed by assessment_id
+
+        Returns:
+            Summary with the checkpoint records of all evaluated submissions
+            (including earlier runs), the ids resumed from the checkpoint and
+            the submissions that could not be evaluated
+        """
+        completed = self.load_checkpoint()
+        resumed = [key for key in map(submission_key, submissions) if key in completed]
+        failed = []
+
+        # Group the remaining submissions by assessment
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for item in submissions:
+            key = submission_key(item)
+            if key in completed:
+                continue
+            assessment_id = item.get("assessment_id")
+            if assessment_id not in assessments:
+                failed.append({"submission_id": key, "error": f"Unknown assessment: {assessment_id}"})
+                continue
+            groups.setdefault(assessment_id, []).append({**item, "submission_id": key})
+
+        # Answers are scored locally once per assessment, over all its submissions
+        assessor = self.orchestrator.candidate_assessor
+        scorings: Dict[str, Dict[str, Any]] = {}
+        for assessment_id, items in groups.items():
+            results = await asyncio.to_thread(
+                assessor.score_answers, assessments[assessment_id], [item["submission"] for item in items]
+            )
+            for item, scoring in zip(items, results):
+                if scoring is not None:
+                    scorings[item["submission_id"]] = scoring
+            # Keep submissions that need the LLM together so their chunks stay full
+            items.sort(key=lambda item: self._needs_llm(scorings.get(item["submission_id"])))
+
+        chunks = [
+            (assessment_id, items[start:start + self.chunk_size])
+            for assessment_id, items in groups.items()
+            for start in range(0, len(items), self.chunk_size)
+        ]
+        print(f"Evaluating {sum(len(items) for items in groups.values())} submissions in {len(chunks)} requests "
+              f"({len(resumed)} already in checkpoint)")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_chunk(assessment_id, items):
+            async with semaphore:
+                return await self._evaluate_chunk(assessments[assessment_id], items, scorings)
+
+        for records, errors in await asyncio.gather(*(run_chunk(*chunk) for chunk in chunks)):
+            for record in records:
+                completed[record["submission_id"]] = record
+            failed.extend(errors)
+
+        return {"evaluations": completed, "resumed": resumed, "failed": failed}
+
+    @staticmethod
+    def _needs_llm(scoring: Optional[Dict[str, Any]]) -> bool:
+        return not (LOCAL_ANSWER_EVALUATION and scoring is not None and not scoring["escalate"])
+
+    async def _evaluate_chunk(self, assessment: Dict[str, Any], items: List[Dict[str, Any]],
+                              scorings: Dict[str, Dict[str, Any]]):
+        """Evaluate one chunk of submissions for the same assessment
+
+        Submissions whose answers were all scored confidently are evaluated
+        locally, the rest in one LLM request. Submissions missing from the
+        batch response are evaluated one at a time. Returns the checkpoint
+        records and the errors.
+        """
+        assessor = self.orchestrator.candidate_assessor
+        assessment_id = assessment.get("assessment_id") or items[0]["assessment_id"]
+
+        # Coding challenges are graded locally, all of the chunk's together,
+        # before the LLM request
+        results = await asyncio.to_thread(
+            assessor.grade_coding_challenges, assessment, [item["submission"] for item in items]
+        )
+        gradings = {item["submission_id"]: grading for item, grading in zip(items, results) if grading is not None}
+
+        evaluations = {}
+        llm_items = [item for item in items if self._needs_llm(scorings.get(item["submission_id"]))]
+        if llm_items:
+            try:
+                evaluations = await self.orchestrator.evaluate_submissions_batch(
+                    {**assessment, "assessment_id": assessment_id},
+                    {item["submission_id"]: item["submission"] for item in llm_items},
+                    evaluator_notes={item["submission_id"]: item.get("evaluator_notes") for item in llm_items},
+                    gradings=gradings,
+                    scorings=scorings
+                )
+            except Exception as e:
+                print(f"Warning: Batch evaluation failed for {assessment_id}: {str(e)}")
+
+        records, errors = [], []
+        for item in items:
+            submission_id = item["submission_id"]
+            scoring = scorings.get(submission_id)
+            evaluation = evaluations.get(submission_id)
+            mode = "batch"
+            if not self._needs_llm(scoring):
+                mode = "local"
+                evaluation = assessor.build_local_evaluation(
+                    assessment, scoring, gradings.get(submission_id), item.get("evaluator_notes")
+                )
+                evaluation["local_answer_scores"] = scoring
+                if submission_id in gradings:
+                    evaluation["coding_challenge_results"] = gradings[submission_id]
+            elif evaluation is None:
+                # Per-item fallback for submissions the batch response did not cover
+                mode = "single"
+                evaluation = await self.orchestrator.evaluate_submission(
+                    assessment, item["submission"], item.get("evaluator_notes"), gradings.get(submission_id)
+                )
+                if "error" in evaluation:
+                    errors.append({"submission_id": submission_id, "error": evaluation["error"]})
+                    continue
+            else:
+                evaluation["evaluator_notes"] = item.get("evaluator_notes") or {}
+                if submission_id in gradings:
+                    evaluation["coding_challenge_results"] = gradings[submission_id]
+                if scoring is not None:
+                    evaluation["local_answer_scores"] = scoring
+
+            records.append({
+                "submission_id": submission_id,
+                "candidate_id": item.get("candidate_id"),
+                "assessment_id": assessment_id,
+                "mode": mode,
+                "evaluation": evaluation,
+                "completed_at": datetime.datetime.now().isoformat()
+            })
+
+        await self._write_records(records)
+        return records, errors
+
+
+async def evaluate_submissions(orchestrator, submissions: List[Dict[str, Any]],
+                               assessments: Dict[str, Dict[str, Any]], checkpoint_path: str,
+                               chunk_size: int = BATCH_EVALUATION_CHUNK_SIZE,
+                               max_concurrency: int = BATCH_EVALUATION_CONCURRENCY) -> Dict[str, Any]:
+    """Evaluate a batch of submissions, resuming from the checkpoint file if it exists
+
+    Args:
+        orchestrator: The RecruitmentOrchestrator used for LLM calls
+        submissions: Dictionaries with assessment_id and submission
+        assessments: The assessments keyed by assessment_id
+        checkpoint_path: JSONL file that evaluations are appended to
+        chunk_size: Submissions per LLM request
+        max_concurrency: LLM requests in flight at the same time
+
+    Returns:
+        Summary of the evaluated, resumed and failed submissions
+    """
+    evaluator = BatchEvaluator(orchestrator, checkpoint_path, chunk_size, max_concurrency)
+    return await evaluator.evaluate(submissions, assessments)
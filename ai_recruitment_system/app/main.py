@@ -4,10 +4,21 @@ from .agents.resume_parser import ResumeParserAgent
 from .agents.job_matcher import JobMatchingAgent
 from .agents.interview_scheduler import InterviewSchedulerAgent
 from .agents.candidate_assessor import CandidateAssessorAgent
+from .utils.prescreen import JobSkillIndex
 from moya.agents.base_agent import AgentConfig
 import asyncio
+import json
 import os
 
+# Match score a job needs before an assessment is generated
+MATCH_THRESHOLD = 0.6
+
+# What happens to applications that fail the pre-screen: "queue" keeps them
+# in a low-priority queue for later processing, "reject" declines them. The
+# pre-screen is a skill-coverage heuristic, not the match score, so rejecting
+# is opt-in.
+PRESCREEN_ACTION = os.getenv("PRESCREEN_ACTION", "queue")
+
 class RecruitmentError(Exception):
     """Base exception for recruitment system errors"""
     pass
@@ -18,14 +29,34 @@ class RecruitmentSystem:
         self.job_matcher = JobMatchingAgent()
         self.interview_scheduler = InterviewSchedulerAgent()
         self.candidate_assessor = CandidateAssessorAgent()
+        self._skill_index = None
+        self._skill_index_key = None
+        self.low_priority_queue: List[Dict[str, Any]] = []
     
-    async def process_application(self, resume_text: str, job_listings: list) -> Dict[str, Any]:
+    def _job_skill_index(self, job_listings: list) -> JobSkillIndex:
+        """Return the skill index of the job listings, rebuilt only when their skills change"""
+        key = json.dumps([(job.get("job_id") or job.get("title"), job.get("required_skills"), job.get("preferred_skills"))
+                          for job in job_listings], default=str)
+        if key != self._skill_index_key:
+            self._skill_index = JobSkillIndex(job_listings)
+            self._skill_index_key = key
+        return self._skill_index
+    
+    async def process_application(self, resume_text: str, job_listings: list,
+                                  prescreen: bool = True) -> Dict[str, Any]:
         """
         Process a complete job application.
         
+        Before the resume is parsed, its raw text is pre-screened against the
+        skills of the open postings. Resumes that mention too few of every
+        posting's required skills are queued at low priority (or rejected,
+        with PRESCREEN_ACTION=reject) without an LLM call. The skill
+        extraction runs in a worker thread, off the event loop.
+        
         Args:
             resume_text (str): The text content of the resume
             job_listings (list): Available job positions
+            prescreen (bool): Whether to apply the pre-screen gate
             
         Returns:
             Dict[str, Any]: Processing results including matches and next steps
@@ -37,6 +68,28 @@ class RecruitmentSystem:
             if not resume_text or not job_listings:
                 raise RecruitmentError("Resume text and job listings cannot be empty")
             
+            # Step 0: Pre-screen the raw text
+            screening = None
+            if prescreen:
+                screening = await asyncio.to_thread(self._job_skill_index(job_listings).screen, resume_text)
+                if not screening["passed"]:
+                    if PRESCREEN_ACTION == "reject":
+                        return {
+                            "prescreen": screening,
+                            "status": "prescreen_rejected",
+                            "message": "The resume does not match the skills of any open position"
+                        }
+                    self.low_priority_queue.append({
+                        "resume_text": resume_text,
+                        "prescreen": screening,
+                        "queued_at": datetime.now().isoformat()
+                    })
+                    return {
+                        "prescreen": screening,
+                        "status": "low_priority",
+                        "message": "The resume was queued for later review"
+                    }
+            
             # Step 1: Parse resume
             candidate_profile = await self.resume_parser.extract_resume_data(resume_text)
             if not candidate_profile.get("skills"):
@@ -51,11 +104,12 @@ class RecruitmentSystem:
             
             # Step 3: Generate assessment if there are good matches
             assessment = None
-            if job_matches and job_matches[0]["match_score"] > 0.6:  # Threshold for good match
+            if job_matches and job_matches[0]["match_score"] > MATCH_THRESHOLD:
                 assessment = await self.candidate_assessor.generate_assessment(candidate_profile)
             
             return {
                 "candidate_profile": candidate_profile,
+                "prescreen": screening,
                 "job_matches": job_matches,
                 "assessment": assessment,
                 "status": "pending_assessment" if assessment else "no_suitable_matches"
@@ -64,6 +118,24 @@ class RecruitmentSystem:
         except Exception as e:
             raise RecruitmentError(f"Error processing application: {str(e)}")
     
+    async def process_low_priority_queue(self, job_listings: list, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fully process applications that were queued by the pre-screen.
+        
+        Args:
+            job_listings (list): Available job positions
+            limit (Optional[int]): Maximum number of queued applications to process
+            
+        Returns:
+            List[Dict[str, Any]]: The processing result of each application, in queue order
+        """
+        count = len(self.low_priority_queue) if limit is None else min(limit, len(self.low_priority_queue))
+        batch, self.low_priority_queue = self.low_priority_queue[:count], self.low_priority_queue[count:]
+        results = []
+        for item in batch:
+            results.append(await self.process_application(item["resume_text"], job_listings, prescreen=False))
+        return results
+    
     async def evaluate_candidate(self, candidate_id: str, assessment_id: str, 
                                submission: Dict[str, Any]) -> Dict[str, Any]:
         """
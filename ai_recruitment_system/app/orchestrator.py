@@ -5,6 +5,11 @@ import traceback
 from typing import Dict, List, Any, Optional
 import uuid
 import datetime
+import asyncio
+import copy
+import hashlib
+import threading
+from collections import OrderedDict, deque
 
 from moya.tools.base_tool import BaseTool
 from moya.tools.ephemeral_memory import EphemeralMemory
@@ -13,16 +18,89 @@ from moya.registry.agent_registry import AgentRegistry
 from moya.orchestrators.simple_orchestrator import SimpleOrchestrator
 from moya.agents.azure_openai_agent import AzureOpenAIAgent, AzureOpenAIAgentConfig
 
-from app.agents.resume_parser import extract_resume_data, ResumeParserTool
+from app.agents.resume_parser import (extract_resume_data, ResumeParserTool, RESUME_SCHEMA,
+                                      RESUME_PACK_TOKEN_BUDGET, RESUME_PACK_MAX_RESUMES,
+                                      RESUME_PACK_OUTPUT_BUDGET)
 from app.agents.job_matcher import match_jobs, JobMatchingTool
 from app.agents.candidate_assessor import generate_assessment, CandidateAssessorTool
 from app.agents.interview_scheduler import schedule_interview, InterviewSchedulerTool
+from app.agents.assessment_bank import AssessmentBankTool
+from app.utils.document_extraction import DocumentExtractor
+from app.utils.simhash import ResumeFingerprintIndex, SECTION_FIELDS, split_sections
+from app.utils.json_repair import coerce_to_schema
+from app.utils.prompts import get_prompt_metrics
+from app.utils.projection import get_projection_metrics
+from app.utils.structured_output import get_structured_output_metrics, STRUCTURED_LLM_OUTPUT
+from app.utils.availability import AvailabilityEngine
+from app.utils.booking import SlotBooker
+from app.utils.interview_store import get_interview_store
+from app.utils.llm_client import AsyncLLMClient, LLMRequestError
+
+RESUME_SYSTEM_MESSAGE = """You are an expert resume parser AI. Your task is to extract structured information from resumes and return it in valid JSON format. 
+            Focus only on extracting and structuring the information. Do not include any additional text or explanations in your response."""
+
+ASSESSMENT_SYSTEM_MESSAGE = """You are an expert technical recruiter specialized in creating candidate assessments.
+                Please create a comprehensive assessment for a candidate based on their profile and the job requirements. Do not include any additional text or explanations in your response."""
+
+EVALUATION_SYSTEM_MESSAGE = """You are an expert technical evaluator specialized in assessing candidate submissions.
+                Please evaluate the candidate's submission against the original assessment. Do not include any additional text or explanations in your response."""
+
+# Whether submissions whose answers were all scored confidently by the local
+# answer scorer are evaluated without the LLM
+LOCAL_ANSWER_EVALUATION = os.getenv("LOCAL_ANSWER_EVALUATION", "true").lower() == "true"
+
+# Whether bank assessments get a short LLM personalisation delta by default
+PERSONALISE_BANK_ASSESSMENTS = os.getenv("ASSESSMENT_BANK_PERSONALISE", "true").lower() == "true"
+
+# Default of evaluate_submission's grading: the submission has not been graded
+# yet. None means it was graded and there was nothing to grade.
+NOT_GRADED = object()
+
+# Latency budget for hedged assessment generation
+ASSESSMENT_DEADLINE_SECONDS = float(os.getenv("ASSESSMENT_DEADLINE_SECONDS", "8"))
+
+# Number of generated assessments kept for repeat requests
+ASSESSMENT_CACHE_SIZE = int(os.getenv("ASSESSMENT_CACHE_SIZE", "256"))
+
+# Whether extraction calls (resume parsing, assessment and question bank
+# generation, batch evaluation) are sent without any conversation history
+STATELESS_LLM_EXTRACTION = os.getenv("STATELESS_LLM_EXTRACTION", "true").lower() == "true"
+
+# Messages of a thread's history sent along with each call that needs context
+LLM_HISTORY_WINDOW = int(os.getenv("LLM_HISTORY_WINDOW", "6"))
+
+# Candidate threads kept in memory; the least recently used are dropped
+LLM_MAX_THREADS = int(os.getenv("LLM_MAX_THREADS", "1024"))
+
+
+def _with_response_format(agent, response_format: Dict[str, Any]):
+    """Shallow copy of an agent whose llm_config requests a response_format
+    
+    The copy shares the agent's client, but concurrent calls asking for
+    different formats do not share one llm_config.
+    """
+    call_agent = copy.copy(agent)
+    llm_config = {**(getattr(agent, "llm_config", None) or {}), "response_format": response_format}
+    call_agent.llm_config = llm_config
+    if getattr(agent, "config", None) is not None:
+        call_agent.config = copy.copy(agent.config)
+        call_agent.config.llm_config = llm_config
+    return call_agent
 
 class RecruitmentOrchestrator:
     """Orchestrator for the AI recruitment system that coordinates between different agents"""
     
     def __init__(self):
         """Initialize the recruitment orchestrator"""
+        # Per-thread options of the LLM call in progress, read by the agent
+        self._llm_call = threading.local()
+        self.structured_output = STRUCTURED_LLM_OUTPUT
+        # Recent LLM messages of each conversation thread, bounded by LLM_HISTORY_WINDOW
+        self._threads = OrderedDict()
+        self._threads_lock = threading.Lock()
+        # Interviewer and room calendars and the interview store, shared by
+        # every interview scheduler tool
+        self.booker = SlotBooker(AvailabilityEngine(), get_interview_store())
         self.orchestrator, self.agent_registry = self.setup_orchestration()
         self.thread_id = "recruitment_flow_001"
         try:
@@ -38,7 +116,152 @@ class RecruitmentOrchestrator:
         self.resume_parser = ResumeParserTool()
         self.job_matcher = JobMatchingTool()
         self.candidate_assessor = CandidateAssessorTool()
-        self.interview_scheduler = InterviewSchedulerTool()
+        self.interview_scheduler = InterviewSchedulerTool(booker=self.booker)
+        
+        # PDF/DOCX text extraction runs in a process pool, started on first use
+        self.document_extractor = DocumentExtractor()
+        
+        # Fingerprints of parsed resumes, checked before any LLM call
+        self.resume_index = ResumeFingerprintIndex()
+        
+        # Precomputed per-job question banks
+        self.assessment_bank = AssessmentBankTool()
+        
+        # Assessments completed by the LLM, including ones that missed their deadline
+        self._assessment_cache = OrderedDict()
+        # Assessment generations in flight, so repeat requests wait on the same one
+        self._assessment_tasks = {}
+        
+    @staticmethod
+    def assessment_thread_id(assessment: Dict[str, Any]) -> Optional[str]:
+        """Conversation thread of one candidate's assessment, keyed on its assessment_id
+        
+        Personalising an assessment and evaluating the submission for it run
+        in this thread, so the evaluation sees the personalised questions.
+        
+        Args:
+            assessment: An assessment with assessment_id
+            
+        Returns:
+            The thread ID, or None (no history) if the assessment has no ID
+        """
+        assessment_id = str(assessment.get("assessment_id") or "").strip()
+        return f"assessment-{assessment_id}" if assessment_id else None
+    
+    def _thread(self, thread_id: Optional[str]) -> Optional[str]:
+        """Thread of an LLM call; None sends and keeps no history"""
+        if thread_id is None and not STATELESS_LLM_EXTRACTION:
+            return self.thread_id
+        return thread_id
+    
+    def _conversation(self, prompt: str, system_message: str, thread_id: Optional[str]) -> List[Dict[str, str]]:
+        """Messages of an LLM call: the system message, the thread's recent history and the prompt"""
+        messages = [{"role": "system", "content": system_message}]
+        if thread_id is not None:
+            with self._threads_lock:
+                messages.extend(self._threads.get(thread_id, ()))
+        messages.append({"role": "user", "content": prompt if isinstance(prompt, str) else json.dumps(prompt)})
+        return messages
+    
+    def _remember(self, thread_id: Optional[str], prompt: str, response: str) -> None:
+        """Add an exchange to a thread's history window and to the Moya memory
+        
+        Threads dropped from the window are deleted from the Moya memory as
+        well, so it holds at most LLM_MAX_THREADS candidate threads.
+        """
+        if thread_id is None:
+            return
+        evicted = []
+        with self._threads_lock:
+            window = self._threads.get(thread_id)
+            if window is None:
+                window = self._threads[thread_id] = deque(maxlen=max(LLM_HISTORY_WINDOW, 0))
+            self._threads.move_to_end(thread_id)
+            window.append({"role": "user", "content": prompt if isinstance(prompt, str) else json.dumps(prompt)})
+            window.append({"role": "assistant", "content": response})
+            while len(self._threads) > LLM_MAX_THREADS:
+                evicted.append(self._threads.popitem(last=False)[0])
+        for sender, content in (("user", prompt), ("assistant", response)):
+            EphemeralMemory.store_message(thread_id=thread_id, sender=sender, content=content)
+        self._forget(evicted)
+    
+    @staticmethod
+    def _forget(thread_ids: List[str]) -> None:
+        """Delete threads from the Moya memory"""
+        for thread_id in thread_ids:
+            try:
+                EphemeralMemory.memory_repository.delete_thread(thread_id)
+            except:
+                pass
+    
+    def _call_llm(self, prompt: str, system_message: str,
+                  response_format: Optional[Dict[str, Any]] = None,
+                  thread_id: Optional[str] = None) -> str:
+        """Send one prompt to Azure OpenAI through the Moya agent
+        
+        Args:
+            prompt: The user message
+            system_message: The system message for this call
+            response_format: Optional JSON Schema response_format for the reply
+            thread_id: Conversation thread, e.g. assessment_thread_id, whose
+                last LLM_HISTORY_WINDOW messages are sent along; None for a
+                stateless extraction call
+            
+        Returns:
+            The raw model response
+        """
+        thread_id = self._thread(thread_id)
+        messages = self._conversation(prompt, system_message, thread_id)
+        
+        self._llm_call.response_format = response_format if self.structured_output else None
+        try:
+            response = self.llm_agent.get_response(messages)
+        finally:
+            self._llm_call.response_format = None
+        
+        self._remember(thread_id, prompt, response)
+        return response
+    
+    async def _acall_llm(self, prompt: str, system_message: str,
+                         response_format: Optional[Dict[str, Any]] = None,
+                         thread_id: Optional[str] = None) -> str:
+        """Send one prompt to Azure OpenAI without blocking the event loop
+        
+        The request goes over the shared keep-alive connection pool of the
+        async LLM client, so many calls can be in flight at once. Without a
+        configured endpoint the call goes through the Moya agent in a worker
+        thread instead.
+        
+        Args:
+            prompt: The user message
+            system_message: The system message for this call
+            response_format: Optional JSON Schema response_format for the reply
+            thread_id: Conversation thread, as for _call_llm
+            
+        Returns:
+            The raw model response
+        """
+        if not self.llm_client.configured:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._call_llm, prompt, system_message, response_format, thread_id)
+        
+        thread_id = self._thread(thread_id)
+        messages = self._conversation(prompt, system_message, thread_id)
+        response = None
+        if response_format is not None and self.structured_output:
+            try:
+                response = await self.llm_client.chat(messages, response_format)
+            except LLMRequestError as e:
+                if "response_format" not in e.body:
+                    raise
+                # The deployment cannot constrain output; rely on local validation
+                print(f"Warning: Structured output is not supported, disabling it: {str(e)}")
+                self.structured_output = False
+        if response is None:
+            response = await self.llm_client.chat(messages)
+        
+        self._remember(thread_id, prompt, response)
+        return response
         
     def setup_orchestration(self):
         """Set up the orchestrator with all the necessary tools and agents"""
@@ -50,7 +273,7 @@ class RecruitmentOrchestrator:
         resume_parser_tool = ResumeParserTool()
         job_matching_tool = JobMatchingTool()
         candidate_assessor_tool = CandidateAssessorTool()
-        interview_scheduler_tool = InterviewSchedulerTool()
+        interview_scheduler_tool = InterviewSchedulerTool(booker=self.booker)
         
         # Add tools to registry with proper parameter definitions
         tool_registry.register_tool(BaseTool(
@@ -129,12 +352,44 @@ class RecruitmentOrchestrator:
             """,
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
             api_base=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+            # json_schema response formats need 2024-08-01-preview or later
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-08-01-preview")
         )
         
         # Create agent
         agent = AzureOpenAIAgent(config=agent_config)
         
+        # Async calls go straight to the same deployment over a shared connection pool
+        self.llm_client = AsyncLLMClient(
+            api_base=agent_config.api_base,
+            api_key=agent_config.api_key,
+            api_version=agent_config.api_version,
+            deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT", agent_config.model_name)
+        )
+        
+        original_get_response = agent.get_response
+        def patched_get_response(conversation):
+            # Ensure all message contents are strings
+            for msg in conversation:
+                if isinstance(msg.get('content'), (dict, list)):
+                    msg['content'] = json.dumps(msg.get('content'))
+            
+            response_format = getattr(self._llm_call, "response_format", None)
+            if response_format is not None:
+                try:
+                    return type(agent).get_response(_with_response_format(agent, response_format), conversation)
+                except Exception as e:
+                    if "response_format" not in str(e):
+                        raise
+                    # The deployment cannot constrain output; rely on local validation
+                    print(f"Warning: Structured output is not supported, disabling it: {str(e)}")
+                    self.structured_output = False
+            return original_get_response(conversation)
+        
+        # Apply the patch
+        agent.get_response = patched_get_response
+        self.llm_agent = agent
+        
         # Register agent
         agent_registry = AgentRegistry()
         agent_registry.register_agent(agent)
@@ -147,6 +402,10 @@ class RecruitmentOrchestrator:
     async def process_resume(self, resume_text: str):
         """Process a resume using Azure OpenAI through Moya
         
+        Near-duplicates of an already parsed resume are detected by SimHash
+        before any LLM call; their stored profile is reused and only the
+        sections that changed are sent to the model.
+        
         Args:
             resume_text: The text content of the resume
             
@@ -155,72 +414,210 @@ class RecruitmentOrchestrator:
         """
         print("Processing resume with Azure OpenAI...")
         try:
-            # Store the resume in memory
-            EphemeralMemory.store_message(
-                thread_id=self.thread_id,
-                sender="user",
-                content=resume_text
-            )
-            
-            # Get the prompt from the resume parser tool
-            prompt = self.resume_parser.parse_resume(resume_text)
+            duplicate = self.resume_index.lookup(resume_text)
+            if duplicate is not None:
+                parsed_data = await self._reparse_changed_sections(resume_text, duplicate)
+            else:
+                parsed_data = await self._parse_resume_text(resume_text)
             
-            # Use the orchestrator to process the resume with Azure OpenAI
-            response = self.orchestrator.orchestrate(
-                thread_id=self.thread_id,
-                user_message=prompt,
-                system_message="""You are an expert resume parser AI. Your task is to extract structured information from resumes and return it in valid JSON format. 
-                Focus only on extracting and structuring the information. Do not include any additional text or explanations in your response."""
-            )
+            if "error" in parsed_data:
+                return parsed_data
             
-            # Clean the response to ensure we only have JSON
-            response = response.strip()
-            # Remove any markdown code block indicators if present
-            response = response.replace('```json', '').replace('```', '').strip()
+            if duplicate is None or duplicate["changed_sections"]:
+                self.resume_index.add(resume_text, parsed_data)
             
-            # Store the parsed result
-            EphemeralMemory.store_message(
-                thread_id=self.thread_id,
-                sender="assistant",
-                content=response
-            )
+            print(f"Successfully parsed resume for: {parsed_data.get('name', 'Unknown')}")
+            print(f"Found {len(parsed_data.get('skills', []))} skills")
+            print(f"Found {len(parsed_data.get('experience', []))} experience entries")
+            print(f"Found {len(parsed_data.get('education', []))} education entries")
             
-            # Convert response to structured data
-            try:
-                parsed_data = json.loads(response)
-                
-                # Validate the parsed data has required fields
-                required_fields = ["name", "contact_info", "skills", "experience", "education"]
-                missing_fields = [field for field in required_fields if field not in parsed_data]
-                
-                if missing_fields:
-                    print(f"Warning: Missing required fields: {', '.join(missing_fields)}")
-                    # Add empty structures for missing fields
-                    for field in missing_fields:
-                        if field == "contact_info":
-                            parsed_data[field] = {"email": "N/A", "phone": "N/A", "location": "N/A"}
-                        elif field in ["skills", "experience", "education"]:
-                            parsed_data[field] = []
-                        else:
-                            parsed_data[field] = "N/A"
-                
-                print(f"Successfully parsed resume for: {parsed_data.get('name', 'Unknown')}")
-                print(f"Found {len(parsed_data.get('skills', []))} skills")
-                print(f"Found {len(parsed_data.get('experience', []))} experience entries")
-                print(f"Found {len(parsed_data.get('education', []))} education entries")
-                
-                return parsed_data
-                
-            except json.JSONDecodeError as e:
-                print(f"Error: Could not parse JSON response: {str(e)}")
-                print("Raw response:", response)
-                return {"error": "Failed to parse resume data", "raw_response": response}
+            return parsed_data
                 
         except Exception as e:
             print(f"Error in resume processing: {str(e)}")
             traceback.print_exc()
             return {"error": str(e)}
     
+    async def _parse_resume_text(self, resume_text: str) -> Dict[str, Any]:
+        """Send resume text to the model and parse the reply
+        
+        Args:
+            resume_text: The resume text (or part of it) to parse
+            
+        Returns:
+            The parsed resume data, or an error dictionary with the raw response
+        """
+        # Get the prompt from the resume parser tool
+        prompt = self.resume_parser.parse_resume(resume_text)
+        
+        # Process the resume with Azure OpenAI
+        response = await self._acall_llm(
+            prompt,
+            system_message=RESUME_SYSTEM_MESSAGE,
+            response_format=self.resume_parser.response_format
+        )
+        
+        # Convert response to structured data, repairing fences, prose,
+        # truncation and missing fields locally instead of re-asking the model
+        parsed_data = self.resume_parser.parse_response(response)
+        if parsed_data is None:
+            print("Error: Could not parse JSON response")
+            print("Raw response:", response)
+            return {"error": "Failed to parse resume data", "raw_response": response}
+        return parsed_data
+    
+    async def process_resumes(self, resume_texts: Dict[str, str],
+                              token_budget: int = RESUME_PACK_TOKEN_BUDGET,
+                              max_resumes: int = RESUME_PACK_MAX_RESUMES,
+                              output_budget: int = RESUME_PACK_OUTPUT_BUDGET) -> Dict[str, Dict[str, Any]]:
+        """Parse many resumes, packing several into each LLM request
+        
+        Bulk ingestion mode: resumes are packed into requests under a token
+        budget so the instructions and schema are sent once per pack rather
+        than once per resume. Packs are also kept under an estimated reply
+        budget, so replies are not cut off at the model's output limit.
+        Resumes missing from a pack's reply, or whose entry was cut off, are
+        parsed one at a time. Near-duplicates of already parsed resumes go through
+        process_resume instead.
+        
+        Args:
+            resume_texts: Resume texts keyed by id, e.g. the file path
+            token_budget: Estimated prompt tokens allowed per request
+            max_resumes: Resumes allowed per request
+            output_budget: Estimated completion tokens allowed per reply
+            
+        Returns:
+            The parsed resume data (or an error dictionary) keyed by id
+        """
+        results = {}
+        new_texts = {}
+        for resume_id, resume_text in resume_texts.items():
+            if self.resume_index.lookup(resume_text) is not None:
+                results[resume_id] = await self.process_resume(resume_text)
+            else:
+                new_texts[resume_id] = resume_text
+        
+        packs = self.resume_parser.pack_resumes(new_texts, token_budget, max_resumes, output_budget)
+        print(f"Parsing {len(new_texts)} resumes in {len(packs)} requests "
+              f"({len(results)} near-duplicates of parsed resumes)")
+        # The packs are sent concurrently over the shared connection pool
+        pack_results = await asyncio.gather(*(
+            self._parse_resume_pack({resume_id: new_texts[resume_id] for resume_id in pack}) for pack in packs
+        ))
+        for pack, parsed in zip(packs, pack_results):
+            for resume_id in pack:
+                parsed_data = parsed[resume_id]
+                if "error" not in parsed_data:
+                    self.resume_index.add(new_texts[resume_id], parsed_data)
+                results[resume_id] = parsed_data
+        return results
+    
+    async def _parse_resume_pack(self, resume_texts: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Parse one pack of resumes in a single request, falling back per resume
+        
+        Args:
+            resume_texts: Resume texts keyed by id
+            
+        Returns:
+            The parsed resume data (or an error dictionary) keyed by id
+        """
+        if len(resume_texts) == 1:
+            resume_id, resume_text = next(iter(resume_texts.items()))
+            return {resume_id: await self._parse_resume_text(resume_text)}
+        
+        # Short ids in the prompt, so the model never has to echo file paths
+        local_ids = {f"R{index}": resume_id for index, resume_id in enumerate(resume_texts, start=1)}
+        parsed = {}
+        try:
+            response = await self._acall_llm(
+                self.resume_parser.parse_resumes_batch(
+                    {local_id: resume_texts[resume_id] for local_id, resume_id in local_ids.items()}
+                ),
+                system_message=RESUME_SYSTEM_MESSAGE,
+                response_format=self.resume_parser.batch_response_format
+            )
+            parsed = self.resume_parser.parse_batch_response(response, list(local_ids))
+        except Exception as e:
+            print(f"Warning: Packed resume parse failed: {str(e)}")
+        
+        results = {}
+        missing = []
+        for local_id, resume_id in local_ids.items():
+            if local_id in parsed:
+                results[resume_id] = parsed[local_id]
+            else:
+                print(f"Parsing {resume_id} on its own, it was missing or cut off in the packed reply")
+                missing.append(resume_id)
+        reparsed = await asyncio.gather(*(self._parse_resume_text(resume_texts[resume_id]) for resume_id in missing))
+        results.update(zip(missing, reparsed))
+        return {resume_id: results[resume_id] for resume_id in resume_texts}
+    
+    async def _reparse_changed_sections(self, resume_text: str, duplicate: Dict[str, Any]) -> Dict[str, Any]:
+        """Update a near-duplicate's stored profile from the sections that changed
+        
+        Args:
+            resume_text: The new resume text
+            duplicate: The index lookup result for the resume
+            
+        Returns:
+            The updated resume data
+        """
+        profile = duplicate["profile"]
+        changed = [name for name in duplicate["changed_sections"] if name in SECTION_FIELDS]
+        print(f"Near-duplicate of a parsed resume (distance {duplicate['distance']}), "
+              f"changed sections: {', '.join(duplicate['changed_sections']) or 'none'}")
+        if not changed:
+            return profile
+        
+        sections = split_sections(resume_text)
+        partial_text = "\n\n".join(
+            sections[name] if name == "header" else f"{name.upper()}\n{sections[name]}"
+            for name in changed if sections.get(name)
+        )
+        if partial_text:
+            partial = await self._parse_resume_text(partial_text)
+        else:
+            partial = coerce_to_schema({}, RESUME_SCHEMA)
+        if "error" in partial:
+            # Fall back to a full parse rather than mixing in a failed section
+            return await self._parse_resume_text(resume_text)
+        
+        # Sections that were removed take the parser's empty defaults
+        for name in changed:
+            for field in SECTION_FIELDS[name]:
+                profile[field] = partial[field]
+        return profile
+    
+    async def read_resume_file(self, file_path: str) -> Dict[str, Any]:
+        """Extract the text of a resume file (PDF, DOCX or plain text)
+        
+        Args:
+            file_path: Path to the resume file
+            
+        Returns:
+            Dictionary with the extracted text and page statistics, or an error
+        """
+        extraction = await self.document_extractor.extract(file_path)
+        if extraction.get("truncated"):
+            print(f"Warning: Only the first {extraction.get('pages')} pages of {file_path} were read")
+        if extraction.get("timed_out"):
+            print(f"Warning: Text extraction for {file_path} timed out, using the pages read so far")
+        return extraction
+    
+    async def process_resume_file(self, file_path: str):
+        """Extract the text of a resume file and parse it
+        
+        Args:
+            file_path: Path to the resume file
+            
+        Returns:
+            The parsed resume data
+        """
+        extraction = await self.read_resume_file(file_path)
+        if "error" in extraction:
+            return {"error": extraction["error"]}
+        return await self.process_resume(extraction["text"])
+    
     # Update the match_with_jobs method in RecruitmentOrchestrator class
     async def match_with_jobs(self, candidate_profile: Dict[str, Any], job_listings: List[Dict[str, Any]]):
         """Match a candidate with job listings using direct tool call
@@ -270,68 +667,312 @@ class RecruitmentOrchestrator:
                 }
             ]          
    
-    async def generate_assessment(self, candidate_profile: Dict[str, Any], job_info: Dict[str, Any]):
+    async def generate_assessment(self, candidate_profile: Dict[str, Any], job_info: Dict[str, Any],
+                                  personalise: bool = PERSONALISE_BANK_ASSESSMENTS):
         """Generate an assessment using Azure OpenAI through Moya
         
+        Jobs with an entry in the precomputed assessment bank are served from
+        the bank; the LLM is then only asked for a short personalisation delta
+        (or not at all when personalise is False).
+        
         Args:
             candidate_profile: The parsed candidate profile
             job_info: Information about the job
+            personalise: Whether to add candidate-specific questions to bank assessments
             
         Returns:
             Assessment details
         """
+        try:
+            return await self._generate_assessment(candidate_profile, job_info, personalise)
+        except Exception as e:
+            print(f"Error in assessment generation: {str(e)}")
+            traceback.print_exc()
+            return self._build_local_assessment(candidate_profile, job_info)
+    
+    async def _generate_assessment(self, candidate_profile: Dict[str, Any], job_info: Dict[str, Any],
+                                   personalise: bool) -> Dict[str, Any]:
+        """Implementation of generate_assessment, without the local fallback"""
+        assessment = self.assessment_bank.assemble_assessment(candidate_profile, job_info)
+        if assessment is not None:
+            print("Assembling assessment from the precomputed question bank...")
+            if personalise:
+                assessment = await self._personalise_assessment(candidate_profile, assessment)
+            return assessment
+        
         print("Processing assessment generation with Azure OpenAI...")
+        
+        # Get the prompt from the candidate assessor tool
+        prompt = self.candidate_assessor.generate_assessment({"candidate_profile":candidate_profile, "job_info" : job_info})
+        
+        # Generate the assessment with Azure OpenAI
+        response = await self._acall_llm(
+            prompt,
+            system_message=ASSESSMENT_SYSTEM_MESSAGE,
+            response_format=self.candidate_assessor.assessment_response_format
+        )
+        
+        assessment = self.candidate_assessor.parse_assessment(response, candidate_profile, job_info)
+        if assessment is None:
+            print("Error: Could not parse JSON response")
+            print("Raw response:", response)
+            return {"error": "Failed to parse assessment data", "raw_response": response}
+        
+        return assessment
+    
+    async def generate_assessment_hedged(self, candidate_profile: Dict[str, Any], job_info: Dict[str, Any],
+                                         deadline: float = ASSESSMENT_DEADLINE_SECONDS,
+                                         personalise: bool = PERSONALISE_BANK_ASSESSMENTS):
+        """Generate an assessment within a latency budget
+        
+        The LLM request runs as a separate task. If no valid assessment
+        arrives before the deadline, a locally built assessment is returned
+        instead; the LLM request keeps running and its result fills the
+        assessment cache for the next request for the same candidate and job.
+        Requests for the same candidate and job that arrive while it runs wait
+        on that request rather than starting another one.
+        
+        Args:
+            candidate_profile: The parsed candidate profile
+            job_info: Information about the job
+            deadline: Seconds to wait for the LLM before answering locally
+            personalise: Whether to add candidate-specific questions to bank assessments
+            
+        Returns:
+            Assessment details
+        """
+        cache_key = self._assessment_cache_key(candidate_profile, job_info)
+        cached = self._assessment_cache.get(cache_key)
+        if cached is not None:
+            self._assessment_cache.move_to_end(cache_key)
+            return copy.deepcopy(cached)
+        
+        future = self._assessment_tasks.get(cache_key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(self._generate_assessment(candidate_profile, job_info, personalise))
+            self._assessment_tasks[cache_key] = future
+            
+            def fill_cache(done):
+                if self._assessment_tasks.get(cache_key) is done:
+                    del self._assessment_tasks[cache_key]
+                if done.cancelled() or done.exception() is not None:
+                    return
+                if self._is_valid_assessment(done.result()):
+                    self._cache_assessment(cache_key, done.result())
+            future.add_done_callback(fill_cache)
+        
         try:
+            assessment = await asyncio.wait_for(asyncio.shield(future), timeout=deadline)
+            if self._is_valid_assessment(assessment):
+                return copy.deepcopy(assessment)
+            print("Warning: Assessment generation returned no usable assessment, building one locally")
+        except asyncio.TimeoutError:
+            print(f"No assessment within {deadline}s, returning a locally built assessment")
+        except Exception as e:
+            print(f"Error in assessment generation: {str(e)}")
+        
+        return self._build_local_assessment(candidate_profile, job_info)
+    
+    @staticmethod
+    def _assessment_cache_key(candidate_profile: Dict[str, Any], job_info: Dict[str, Any]) -> str:
+        profile = json.dumps(candidate_profile, sort_keys=True, default=str)
+        job_id = job_info.get("job_id") or job_info.get("title", "")
+        return f"{job_id}:{hashlib.sha1(profile.encode('utf-8')).hexdigest()}"
+    
+    def _cache_assessment(self, cache_key: str, assessment: Dict[str, Any]) -> None:
+        self._assessment_cache[cache_key] = copy.deepcopy(assessment)
+        self._assessment_cache.move_to_end(cache_key)
+        while len(self._assessment_cache) > ASSESSMENT_CACHE_SIZE:
+            self._assessment_cache.popitem(last=False)
+    
+    @staticmethod
+    def _is_valid_assessment(assessment: Any) -> bool:
+        return (
+            isinstance(assessment, dict)
+            and "error" not in assessment
+            and bool(assessment.get("technical_questions"))
+        )
+    
+    def _build_local_assessment(self, candidate_profile: Dict[str, Any], job_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an assessment without the LLM
+        
+        Uses the job's bank entry if there is one, otherwise the fallback
+        assessment with its generic questions replaced by bank questions for
+        the same skills where the bank has them.
+        """
+        assessment = self.assessment_bank.assemble_assessment(candidate_profile, job_info)
+        if assessment is not None:
+            return assessment
+        fallback = self._create_fallback_assessment(candidate_profile, job_info)
+        return self.assessment_bank.upgrade_assessment(fallback, job_info.get("job_id"))
+    
+    async def _personalise_assessment(self, candidate_profile: Dict[str, Any], assessment: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a few candidate-specific questions to a bank assessment
+        
+        Failures leave the bank assessment unchanged.
+        """
+        prompt = self.assessment_bank.personalisation_prompt(candidate_profile, assessment)
+        if not prompt:
+            return assessment
+        try:
+            response = await self._acall_llm(prompt, system_message=ASSESSMENT_SYSTEM_MESSAGE,
+                                             response_format=self.assessment_bank.personalisation_response_format,
+                                             thread_id=self.assessment_thread_id(assessment))
+            return self.assessment_bank.apply_personalisation(assessment, response)
+        except Exception as e:
+            print(f"Warning: Could not personalise assessment: {str(e)}")
+            return assessment
+    
+    async def evaluate_submission(self, assessment: Dict[str, Any], submission: Dict[str, Any],
+                                  evaluator_notes: Dict[str, Any] = None, grading: Optional[Dict[str, Any]] = NOT_GRADED):
+        """Evaluate a candidate's assessment submission
+        
+        Coding-challenge code is run locally against the challenge's test
+        cases, and written answers are scored locally against the reference
+        answers and rubrics. The LLM only receives the answers the local
+        scorer is unsure about, and is skipped when there are none.
+        
+        Args:
+            assessment: The assessment the candidate answered
+            submission: Candidate's answers and solutions
+            evaluator_notes: Notes from the evaluator (optional)
+            grading: Coding-challenge grading, if the submission was already
+                graded; None if it was and there was nothing to grade
             
-            # Get the prompt from the resume parser tool
-            prompt = self.candidate_assessor.generate_assessment({"candidate_profile":candidate_profile, "job_info" : job_info})
-            # Store the prompt in memory
-            EphemeralMemory.store_message(
-                thread_id=self.thread_id,
-                sender="user",
-                content=prompt
-            )
+        Returns:
+            Evaluation details, including the local coding-challenge results
+        """
+        try:
+            if grading is NOT_GRADED:
+                grading = await asyncio.to_thread(
+                    self.candidate_assessor.grade_coding_challenge, assessment, submission
+                )
+            scoring = (await asyncio.to_thread(self.candidate_assessor.score_answers, assessment, [submission]))[0]
+            if scoring is not None and not scoring["escalate"] and LOCAL_ANSWER_EVALUATION:
+                print("All answers scored locally, skipping the LLM evaluation")
+                evaluation = self.candidate_assessor.build_local_evaluation(assessment, scoring, grading, evaluator_notes)
+                evaluation["local_answer_scores"] = scoring
+                if grading is not None:
+                    evaluation["coding_challenge_results"] = grading
+                return evaluation
             
-            agent = self.agent_registry.get_agent("recruitment_agent") 
+            prompt = self.candidate_assessor.evaluate_submission({
+                "assessment_id": assessment.get("assessment_id"),
+                "assessment_details": assessment,
+                "submission": submission,
+                "evaluator_notes": evaluator_notes,
+                "grading": grading,
+                "scoring": scoring
+            })
+            if isinstance(prompt, dict):
+                return prompt
             
-            original_get_response = agent.get_response
-            def patched_get_response(conversation):
-                # Ensure all message contents are strings
-                for msg in conversation:
-                    if isinstance(msg.get('content'), (dict, list)):
-                        msg['content'] = json.dumps(msg.get('content'))
-                return original_get_response(conversation)
+            print("Processing submission evaluation with Azure OpenAI...")
+            response = await self._acall_llm(prompt, system_message=EVALUATION_SYSTEM_MESSAGE,
+                                             response_format=self.candidate_assessor.evaluation_response_format,
+                                             thread_id=self.assessment_thread_id(assessment))
             
-            # Apply the patch
-            agent.get_response = patched_get_response
+            evaluation = self.candidate_assessor.parse_evaluation(response, assessment, evaluator_notes)
+            if evaluation is None:
+                print("Error: Could not parse JSON response")
+                print("Raw response:", response)
+                return {"error": "Failed to parse evaluation data", "raw_response": response}
+            if grading is not None:
+                evaluation["coding_challenge_results"] = grading
+            if scoring is not None:
+                evaluation["local_answer_scores"] = scoring
+            return evaluation
+        except Exception as e:
+            print(f"Error in submission evaluation: {str(e)}")
+            traceback.print_exc()
+            return {"error": f"Failed to evaluate submission: {str(e)}"}
+    
+    async def evaluate_submissions_batch(self, assessment: Dict[str, Any], submissions: Dict[str, Dict[str, Any]],
+                                         evaluator_notes: Optional[Dict[str, Dict[str, Any]]] = None,
+                                         gradings: Optional[Dict[str, Dict[str, Any]]] = None,
+                                         scorings: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Evaluate several submissions for the same assessment in one LLM request
+        
+        Args:
+            assessment: The assessment the candidates answered
+            submissions: Candidate submissions keyed by submission id
+            evaluator_notes: Optional evaluator notes keyed by submission id
+            gradings: Optional coding-challenge gradings keyed by submission id
+            scorings: Optional local answer scorings keyed by submission id
             
-            # Use the orchestrator to process the resume with Azure OpenAI
-            response = self.orchestrator.orchestrate(
-                thread_id=self.thread_id,
-                user_message=prompt,
-                system_message="""You are an expert technical recruiter specialized in creating candidate assessments.
-                Please create a comprehensive assessment for a candidate based on their profile and the job requirements. Do not include any additional text or explanations in your response."""
-            )
+        Returns:
+            Evaluations keyed by submission id; submissions the model skipped
+            are missing
             
-            # Clean the response to ensure we only have JSON
-            response = response.strip()
-            # Remove any markdown code block indicators if present
-            response = response.replace('```json', '').replace('```', '').strip()
+        Raises:
+            ValueError: If the request could not be built
+        """
+        assessment_id = assessment.get("assessment_id")
+        prompt = self.candidate_assessor.evaluate_submissions_batch(
+            assessment_id, assessment, submissions,
+            evaluator_notes=evaluator_notes, gradings=gradings, scorings=scorings
+        )
+        if isinstance(prompt, dict):
+            raise ValueError(prompt["error"])
+        response = await self._acall_llm(prompt, EVALUATION_SYSTEM_MESSAGE,
+                                         self.candidate_assessor.batch_evaluation_response_format)
+        return self.candidate_assessor.parse_batch_evaluation(response, assessment_id)
+    
+    async def grade_coding_submissions(self, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Grade many coding-challenge submissions in parallel without the LLM
+        
+        Args:
+            submissions: Dictionaries with "code", "test_cases" and optional "language"
             
-            # Store the parsed result
-            EphemeralMemory.store_message(
-                thread_id=self.thread_id,
-                sender="assistant",
-                content=response
-            )
+        Returns:
+            One grading result per submission, in the same order
+        """
+        return await asyncio.to_thread(self.candidate_assessor.code_grader.grade_many, submissions)
+    
+    async def build_assessment_bank(self, job_listings: List[Dict[str, Any]], use_llm: bool = True,
+                                    overwrite: bool = False) -> Dict[str, Any]:
+        """Precompute the assessment question bank for a set of jobs
+        
+        Args:
+            job_listings: The jobs to build bank entries for
+            use_llm: Generate questions with Azure OpenAI; when False (or when
+                generation fails) entries are built from question templates
+            overwrite: Rebuild entries that already exist in the bank
             
-
-            return response
-        except Exception as e:
-            print(f"Error in assessment generation: {str(e)}")
-            traceback.print_exc()
+        Returns:
+            Summary with the job ids that were built, skipped and templated
+        """
+        summary = {"built": [], "skipped": [], "templated": []}
+        for job_info in job_listings:
+            job_id = job_info.get("job_id")
+            if not job_id:
+                continue
+            if self.assessment_bank.has_job(job_id) and not overwrite:
+                summary["skipped"].append(job_id)
+                continue
             
+            entry = None
+            if use_llm:
+                print(f"Generating question bank for {job_id} with Azure OpenAI...")
+                try:
+                    response = await self._acall_llm(
+                        self.assessment_bank.build_entry_prompt(job_info),
+                        system_message=ASSESSMENT_SYSTEM_MESSAGE,
+                        response_format=self.assessment_bank.entry_response_format
+                    )
+                    entry = self.assessment_bank.parse_entry(response, job_info)
+                except Exception as e:
+                    print(f"Warning: Question bank generation failed for {job_id}: {str(e)}")
             
+            if entry is None or not entry["skills"]:
+                entry = self.assessment_bank.build_template_entry(job_info)
+                summary["templated"].append(job_id)
+            else:
+                summary["built"].append(job_id)
+            self.assessment_bank.add_entry(entry)
+        
+        self.assessment_bank.save()
+        return summary
         
     def _create_fallback_assessment(self, candidate_profile, job_info):
         """Create a fallback assessment when AI generation fails"""
@@ -428,7 +1069,9 @@ class RecruitmentOrchestrator:
                 "job_info": job_info,
                 "selected_slot": selected_slot
             }
-            result = self.interview_scheduler.schedule_interview(data)
+            # Booking may wait for a lock or the database, so it runs off the event loop
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self.interview_scheduler.schedule_interview, data)
             print(f"Interview scheduling complete. Created interview ID: {result.get('interview_id')}")
             return result
         except Exception as e:
@@ -450,10 +1093,118 @@ class RecruitmentOrchestrator:
                 },
                 "status": "scheduled"
             }
+
+    async def assign_interviews(self, candidates: List[Dict[str, Any]],
+                                job_listings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Assign free interview slots to many candidates at once
+
+        Args:
+            candidates: Candidates with candidate_id, job_id, priority (e.g.
+                the match score) and optional availability windows
+            job_listings: Jobs with job_id and interview_availability rules or interview_slots
+
+        Returns:
+            Dictionary with the assignments (candidate_id, job_id, slot), the
+            unassigned candidate_ids and solver stats
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.interview_scheduler.assign_interviews, {
+            "candidates": candidates,
+            "job_listings": job_listings
+        })
+
+    async def get_available_slots_bulk(self, job_ids: List[str], window: Any = None,
+                                       job_listings: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Get the free interview slots of many jobs in one pass
+
+        Args:
+            job_ids: IDs of the jobs
+            window: Number of days from now, or a dictionary with ISO start and end times
+            job_listings: Optional jobs to add to the scheduler's job index first
+
+        Returns:
+            Dictionary with the window, the free slots keyed by job_id and
+            the job_ids that are not known
+        """
+        if job_listings:
+            self.interview_scheduler.register_jobs(job_listings)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.interview_scheduler.get_available_slots_bulk, job_ids, window)
+
+    async def find_panel_options(self, job_info: Dict[str, Any], max_options: Optional[int] = None) -> Dict[str, Any]:
+        """Find times when a job's whole interview panel and a room are free
+
+        Args:
+            job_info: The job, with interview_availability rules and an interview_panel
+            max_options: Optional number of options to return
+
+        Returns:
+            Dictionary with the ranked options, each a slot for
+            schedule_interview, whether the search was complete and search stats
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.interview_scheduler.get_panel_options, {
+            "job_info": job_info,
+            "max_options": max_options
+        })
+
+    def prompt_cache_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Cacheable-prefix statistics for every LLM prompt template
+        
+        Returns:
+            Mapping of template name to call count, prefix length in
+            characters and estimated tokens, prefix share of the prompt and
+            whether the prefix is stable and long enough to be cached
+        """
+        return get_prompt_metrics()
+    
+    def projection_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Token savings from projecting and minifying the data embedded in prompts
+        
+        Returns:
+            Mapping of prompt field to estimated tokens before and after
+            projection, tokens saved and the fraction saved
+        """
+        return get_projection_metrics()
+    
+    def structured_output_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Schema conformance of the LLM responses for every structured output
+        
+        Returns:
+            Mapping of output name to the number of responses that were valid,
+            only missing fields, had to be repaired or held no JSON
+        """
+        return get_structured_output_metrics()
+    
+    def booking_metrics(self) -> Dict[str, Any]:
+        """Interview slot booking statistics
+        
+        Returns:
+            Booking attempts, successful bookings, conflicts (including those
+            only caught by the shared database), stripe lock waits and
+            database retries
+        """
+        return self.booker.metrics.snapshot()
+    
+    def llm_pool_metrics(self) -> Dict[str, Any]:
+        """Async LLM request statistics
+        
+        Returns:
+            Requests, retries, failures, requests in flight now and at peak,
+            waits for a per-host slot, total request time and the pool limits
+        """
+        return self.llm_client.metrics()
+    
+    async def aclose(self):
+        """Close the pooled LLM connections, then clean up like cleanup"""
+        await self.llm_client.aclose()
+        self.cleanup()
     
     def cleanup(self):
         """Clean up resources used by the orchestrator"""
-        try:
-            EphemeralMemory.memory_repository.delete_thread(self.thread_id)
-        except:
-            pass
\ No newline at end of file
+        self.document_extractor.shutdown()
+        self.interview_scheduler.store.flush()
+        with self._threads_lock:
+            thread_ids = [self.thread_id, *self._threads]
+            self._threads.clear()
+        self._forget(thread_ids)
\ No newline at end of file
@@ -0,0 +1,12 @@
+"""
+AI Recruitment System Utilities
+"""
+
+from .json_repair import extract_json, repair_json, is_truncated_json, coerce_to_schema
+
+__all__ = [
+    "extract_json",
+    "repair_json",
+    "is_truncated_json",
+    "coerce_to_schema"
+]
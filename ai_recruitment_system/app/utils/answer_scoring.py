@@ -0,0 +1,200 @@
+from typing import Dict, List, Any, Optional
+import os
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+# Size of the LSA space; LSA is only used once the corpus has enough documents
+LSA_COMPONENTS = int(os.getenv("ANSWER_SCORER_LSA_COMPONENTS", "100"))
+MIN_LSA_DOCUMENTS = 20
+
+# Answers below this confidence are escalated to the LLM
+MIN_CONFIDENCE = float(os.getenv("ANSWER_SCORER_MIN_CONFIDENCE", "0.5"))
+
+# Cosine similarity at which a rubric point, or the reference answer, counts as fully covered
+RUBRIC_HIT_SIMILARITY = 0.35
+REFERENCE_FULL_SIMILARITY = 0.6
+
+# Weight of rubric coverage against reference similarity when both are available
+RUBRIC_WEIGHT = 0.6
+
+# Scores below this are confident fails; a correct answer can use different
+# words than the reference, so low overlap alone is weak evidence
+LOW_SCORE_CUTOFF = 20
+
+# Answers shorter than this are scored zero without escalation
+MIN_ANSWER_WORDS = 3
+
+# Rows per NumPy batch when computing pair similarities
+BATCH_SIZE = 4096
+
+
+class AnswerScorer:
+    """Scores free-text answers against reference answers and rubric points
+
+    All answers to one assessment are embedded together with its reference
+    answers and rubric points using TF-IDF, plus an LSA projection once the
+    corpus is large enough. Each answer is scored by its cosine similarity to
+    its question's reference answer and by how many rubric points it covers.
+    Scores between a clear fail and a clear pass, or backed by little
+    reference material, get a low confidence and are marked for escalation
+    to the LLM.
+    """
+
+    def __init__(self, n_components: int = LSA_COMPONENTS, min_confidence: float = MIN_CONFIDENCE):
+        """Initialize the answer scorer
+
+        Args:
+            n_components: Dimensions of the LSA space
+            min_confidence: Confidence below which an answer is escalated
+        """
+        self.n_components = n_components
+        self.min_confidence = min_confidence
+
+    def _embed(self, texts: List[str]) -> List[Any]:
+        """Embed texts as L2-normalised TF-IDF rows, plus LSA rows for larger corpora"""
+        vectorizer = TfidfVectorizer(lowercase=True, stop_words='english', sublinear_tf=True,
+                                     ngram_range=(1, 2), token_pattern=r'(?u)\b[a-zA-Z0-9][a-zA-Z0-9.+#\-]*\b')
+        tfidf = vectorizer.fit_transform(texts)
+        spaces = [tfidf]
+        components = min(self.n_components, tfidf.shape[1] - 1, len(texts) - 1)
+        if len(texts) >= MIN_LSA_DOCUMENTS and components >= 2:
+            lsa = TruncatedSVD(n_components=components, random_state=0).fit_transform(tfidf)
+            spaces.append(normalize(lsa))
+        return spaces
+
+    @staticmethod
+    def _pair_similarities(spaces: List[Any], left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each (left[i], right[i]) row pair, averaged over the spaces"""
+        total = np.zeros(len(left))
+        for space in spaces:
+            for start in range(0, len(left), BATCH_SIZE):
+                rows = slice(start, start + BATCH_SIZE)
+                product = space[left[rows]].multiply(space[right[rows]]) if hasattr(space, "multiply") \
+                    else space[left[rows]] * space[right[rows]]
+                total[rows] += np.asarray(product.sum(axis=1)).ravel()
+        return np.clip(total / len(spaces), 0.0, 1.0)
+
+    def score(self, questions: List[Dict[str, Any]],
+              answer_sets: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Score the answers of one or more submissions to the same assessment
+
+        Args:
+            questions: Assessment questions with question_id and optional
+                reference_answer and rubric
+            answer_sets: One mapping of question_id to answer text per submission
+
+        Returns:
+            One result per submission with per-question scores (0-100),
+            confidences and escalation flags, the preliminary overall score
+            and the ids of the questions to escalate
+        """
+        texts: List[str] = []
+        references: Dict[str, Optional[int]] = {}
+        rubrics: Dict[str, List[int]] = {}
+        for question in questions:
+            question_id = question.get("question_id")
+            reference = question.get("reference_answer") or ""
+            references[question_id] = None
+            if reference.strip():
+                references[question_id] = len(texts)
+                texts.append(reference)
+            rubrics[question_id] = []
+            for point in question.get("rubric") or []:
+                if isinstance(point, str) and point.strip():
+                    rubrics[question_id].append(len(texts))
+                    texts.append(point)
+
+        # Answers that can be scored, as (submission, question_id, text row)
+        scored_answers = []
+        for index, answers in enumerate(answer_sets):
+            for question_id, answer in answers.items():
+                if question_id not in references or not isinstance(answer, str):
+                    continue
+                if len(answer.split()) < MIN_ANSWER_WORDS:
+                    continue
+                if references[question_id] is None and not rubrics[question_id]:
+                    continue
+                scored_answers.append((index, question_id, len(texts)))
+                texts.append(answer)
+
+        # Every (answer, target) pair, scored in one vectorised pass
+        pair_answers, pair_targets = [], []
+        for _, question_id, row in scored_answers:
+            targets = ([references[question_id]] if references[question_id] is not None else []) + rubrics[question_id]
+            pair_answers.extend([row] * len(targets))
+            pair_targets.extend(targets)
+        similarities = {}
+        if pair_answers:
+            try:
+                spaces = self._embed(texts)
+                values = self._pair_similarities(spaces, np.array(pair_answers), np.array(pair_targets))
+            except ValueError:
+                # Every text was stop words only
+                values = np.zeros(len(pair_answers))
+            for answer_row, target_row, value in zip(pair_answers, pair_targets, values):
+                similarities[(answer_row, target_row)] = float(value)
+
+        rows = {(index, question_id): row for index, question_id, row in scored_answers}
+        results = []
+        for index, answers in enumerate(answer_sets):
+            question_scores = {}
+            for question in questions:
+                question_id = question.get("question_id")
+                answer = answers.get(question_id)
+                if (index, question_id) in rows:
+                    question_scores[question_id] = self._score_answer(
+                        rows[(index, question_id)], references[question_id], rubrics[question_id], similarities
+                    )
+                elif not isinstance(answer, str) or len(answer.split()) < MIN_ANSWER_WORDS:
+                    # Missing or near-empty answers need no judgement
+                    question_scores[question_id] = {"score": 0, "confidence": 0.95, "escalate": False}
+                else:
+                    # Nothing to compare against
+                    question_scores[question_id] = {"score": None, "confidence": 0.0, "escalate": True}
+            results.append(self._summarise(question_scores))
+        return results
+
+    def _score_answer(self, row: int, reference: Optional[int], rubric: List[int],
+                      similarities: Dict[Any, float]) -> Dict[str, Any]:
+        result = {}
+        components, weights = [], []
+        if reference is not None:
+            similarity = similarities.get((row, reference), 0.0)
+            result["reference_similarity"] = round(similarity, 3)
+            components.append(min(1.0, similarity / REFERENCE_FULL_SIMILARITY))
+            weights.append(1 - RUBRIC_WEIGHT)
+        if rubric:
+            coverage = float(np.mean([min(1.0, similarities.get((row, point), 0.0) / RUBRIC_HIT_SIMILARITY)
+                                      for point in rubric]))
+            result["rubric_coverage"] = round(coverage, 3)
+            components.append(coverage)
+            weights.append(RUBRIC_WEIGHT)
+        score = 100 * float(np.average(components, weights=weights))
+
+        # Confidence grows with the amount of reference material and with the
+        # distance of the score from the undecided range
+        evidence = min(1.0, ((reference is not None) + len(rubric)) / 4)
+        if score >= 50:
+            decisiveness = (score - 50) / 50
+        else:
+            decisiveness = max(0.0, (LOW_SCORE_CUTOFF - score) / LOW_SCORE_CUTOFF)
+        confidence = evidence * decisiveness
+        result.update({
+            "score": round(score, 1),
+            "confidence": round(confidence, 3),
+            "escalate": confidence < self.min_confidence
+        })
+        return result
+
+    @staticmethod
+    def _summarise(question_scores: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        scored = [result for result in question_scores.values() if result["score"] is not None]
+        return {
+            "question_scores": question_scores,
+            "preliminary_score": round(float(np.mean([r["score"] for r in scored])), 1) if scored else None,
+            "confidence": round(float(np.mean([r["confidence"] for r in question_scores.values()])), 3)
+            if question_scores else 0.0,
+            "escalate": [question_id for question_id, result in question_scores.items() if result["escalate"]]
+        }
@@ -0,0 +1,396 @@
+from typing import Dict, List, Any, Optional, Tuple
+import datetime
+import threading
+
+import numpy as np
+
+from .slot_table import SlotTable, slot_epoch, to_epoch, format_iso, INTERVIEW_DURATION_MINUTES
+
+# Calendars are kept at this granularity; interviews are rounded out to whole buckets
+BUCKET_MINUTES = 15
+BUCKET_SECONDS = BUCKET_MINUTES * 60
+BUCKETS_PER_WORD = 64
+
+# Locations containing any of these words are calls, not rooms, and never conflict
+VIRTUAL_LOCATION_KEYWORDS = ("virtual", "video", "zoom", "teams", "meet", "remote", "phone")
+
+_WORD_BITS = np.uint64(BUCKETS_PER_WORD)
+_ONE = np.uint64(1)
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# A calendar is identified by its kind ("interviewer" or "room") and name
+Resource = Tuple[str, str]
+
+
+def is_virtual_location(location: Any) -> bool:
+    """Whether a slot location is a call rather than a room"""
+    if not isinstance(location, str) or not location.strip():
+        return True
+    location = location.lower()
+    return any(keyword in location for keyword in VIRTUAL_LOCATION_KEYWORDS)
+
+
+def slot_resources(slot: Dict[str, Any]) -> List[Resource]:
+    """The interviewer, panel and room calendars an interview slot occupies"""
+    resources = []
+    for interviewer in [slot.get("interviewer")] + list(slot.get("panel") or []):
+        if isinstance(interviewer, str) and interviewer.strip() and ("interviewer", interviewer.strip()) not in resources:
+            resources.append(("interviewer", interviewer.strip()))
+    location = slot.get("location")
+    if not is_virtual_location(location):
+        resources.append(("room", location.strip()))
+    return resources
+
+
+def _span(start: int, minutes: int) -> Tuple[int, int]:
+    """First bucket and number of buckets covering minutes from an epoch"""
+    first = start // BUCKET_SECONDS
+    end = start + 60 * max(int(minutes), 1)
+    return first, -(-end // BUCKET_SECONDS) - first
+
+
+def _word_masks(first: int, count: int) -> List[Tuple[int, int]]:
+    """Absolute word index and bit mask of every word a bucket span touches
+
+    A span of up to 64 buckets (16 hours) touches at most two words.
+    """
+    masks = []
+    while count > 0:
+        word, offset = divmod(first, BUCKETS_PER_WORD)
+        width = min(count, BUCKETS_PER_WORD - offset)
+        masks.append((word, ((1 << width) - 1) << offset))
+        first += width
+        count -= width
+    return masks
+
+
+class AvailabilityEngine:
+    """Interviewer and room calendars kept as bitsets over 15-minute buckets
+
+    Each calendar is a row of 64-bit words in a shared numpy matrix, bit i
+    of word w standing for bucket w * 64 + i counted from the Unix epoch, so
+    an interview touches at most two words and a conflict check is a couple
+    of AND operations. Two matrices are kept: busy holds the booked
+    interviews and offered holds the times interviewers made available
+    (rooms are available whenever they are not booked). The matrices grow
+    on demand in both directions as new dates come in.
+    """
+
+    def __init__(self, duration_minutes: int = INTERVIEW_DURATION_MINUTES):
+        """Initialize an empty set of calendars
+
+        Args:
+            duration_minutes: Length of an interview when the slot does not
+                give a duration_minutes
+        """
+        self.duration_minutes = duration_minutes
+        self._rows: Dict[Resource, int] = {}
+        self._busy = np.zeros((0, 0), dtype=np.uint64)
+        self._offered = np.zeros((0, 0), dtype=np.uint64)
+        # Absolute index of the word in column 0
+        self._base = 0
+        self._lock = threading.RLock()
+
+    def slot_span(self, slot: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        """First 15-minute bucket and number of buckets an interview slot covers
+
+        Args:
+            slot: The interview slot
+
+        Returns:
+            The bucket span, or None if the slot has no valid date and time
+        """
+        start = slot_epoch(slot)
+        if start is None:
+            return None
+        minutes = slot.get("duration_minutes") or self.duration_minutes
+        return _span(start, minutes)
+
+    def _row(self, resource: Resource) -> int:
+        """Row of a calendar, adding an empty one if it is new"""
+        row = self._rows.get(resource)
+        if row is None:
+            row = self._rows[resource] = len(self._rows)
+            if row >= self._busy.shape[0]:
+                self._resize(max(8, 2 * self._busy.shape[0]), self._base, self._base + self._busy.shape[1])
+        return row
+
+    def _cover(self, first_word: int, end_word: int) -> None:
+        """Grow the matrices so columns cover words first_word to end_word - 1"""
+        columns = self._busy.shape[1]
+        if not columns:
+            self._resize(self._busy.shape[0], first_word, end_word)
+        elif first_word < self._base or end_word > self._base + columns:
+            self._resize(self._busy.shape[0], min(first_word, self._base),
+                         max(end_word, self._base + columns))
+
+    def _resize(self, rows: int, first_word: int, end_word: int) -> None:
+        busy = np.zeros((rows, end_word - first_word), dtype=np.uint64)
+        offered = np.zeros_like(busy)
+        old_rows, old_columns = self._busy.shape
+        if old_rows and old_columns:
+            start = self._base - first_word
+            busy[:old_rows, start:start + old_columns] = self._busy
+            offered[:old_rows, start:start + old_columns] = self._offered
+        self._busy, self._offered, self._base = busy, offered, first_word
+
+    def _set(self, matrix: str, row: int, first: int, count: int, value: bool) -> None:
+        masks = _word_masks(first, count)
+        self._cover(masks[0][0], masks[-1][0] + 1)
+        bits = self._busy if matrix == "busy" else self._offered
+        for word, mask in masks:
+            column = word - self._base
+            if value:
+                bits[row, column] |= np.uint64(mask)
+            else:
+                bits[row, column] &= ~np.uint64(mask)
+
+    def _booked(self, resource: Resource, first: int, count: int) -> bool:
+        row = self._rows.get(resource)
+        if row is None:
+            return False
+        columns = self._busy.shape[1]
+        for word, mask in _word_masks(first, count):
+            column = word - self._base
+            if 0 <= column < columns and int(self._busy[row, column]) & mask:
+                return True
+        return False
+
+    def add_availability(self, resource: Resource, start: datetime.datetime, minutes: int) -> None:
+        """Mark a period as available in a calendar
+
+        Args:
+            resource: The calendar, e.g. ("interviewer", "Lisa Patel, CTO")
+            start: Start of the period
+            minutes: Length of the period
+        """
+        first, count = _span(to_epoch(start), minutes)
+        with self._lock:
+            self._set("offered", self._row(resource), first, count, True)
+
+    def register_slots(self, slots: List[Dict[str, Any]]) -> None:
+        """Mark the interviewer of every slot as available at its time
+
+        Args:
+            slots: Interview slots, as listed in a job's interview_slots
+        """
+        with self._lock:
+            for slot in slots:
+                span = self.slot_span(slot)
+                if span is None:
+                    continue
+                for resource in slot_resources(slot):
+                    if resource[0] == "interviewer":
+                        self._set("offered", self._row(resource), *span, True)
+
+    def conflicts(self, slot: Dict[str, Any]) -> List[str]:
+        """The interviewer and room of a slot that are already booked at its time
+
+        Args:
+            slot: The interview slot
+
+        Returns:
+            Descriptions of the booked calendars, e.g. "room HQ Conference
+            Room A"; empty if the slot is free or has no valid date and time
+        """
+        span = self.slot_span(slot)
+        if span is None:
+            return []
+        with self._lock:
+            return [f"{kind} {name}" for kind, name in slot_resources(slot)
+                    if self._booked((kind, name), *span)]
+
+    def is_free(self, slot: Dict[str, Any]) -> bool:
+        """Whether neither the interviewer nor the room of a slot is booked"""
+        return not self.conflicts(slot)
+
+    def book(self, slot: Dict[str, Any]) -> List[str]:
+        """Book the interviewer and room of a slot unless either is taken
+
+        The check and the booking happen under one lock, so two requests
+        cannot book the same calendar at the same time.
+
+        Args:
+            slot: The interview slot
+
+        Returns:
+            The conflicting calendars, as for conflicts; empty if the slot
+            was booked or has no valid date and time
+        """
+        span = self.slot_span(slot)
+        if span is None:
+            return []
+        resources = slot_resources(slot)
+        with self._lock:
+            conflicts = [f"{kind} {name}" for kind, name in resources if self._booked((kind, name), *span)]
+            if conflicts:
+                return conflicts
+            for resource in resources:
+                self._set("busy", self._row(resource), *span, True)
+            return []
+
+    def release(self, slot: Dict[str, Any]) -> None:
+        """Free the interviewer and room of a booked slot again
+
+        Args:
+            slot: The interview slot that was booked
+        """
+        span = self.slot_span(slot)
+        if span is None:
+            return
+        with self._lock:
+            for resource in slot_resources(slot):
+                if resource in self._rows:
+                    self._set("busy", self._rows[resource], *span, False)
+
+    def common_free_time(self, resources: List[Resource], start: datetime.datetime,
+                         end: datetime.datetime, minutes: Optional[int] = None) -> List[Dict[str, str]]:
+        """Find the periods when all the given calendars are free together
+
+        The free bitsets of the calendars are ANDed word by word in one
+        vectorised reduction. Interviewers are free where they made time
+        available and are not booked; rooms wherever they are not booked.
+
+        Args:
+            resources: The calendars, e.g. a panel of interviewers and a room
+            start: Start of the search window
+            end: End of the search window
+            minutes: Shortest period to return; defaults to the interview length
+
+        Returns:
+            The free periods, each with ISO start and end times, in order
+        """
+        first, count = _span(to_epoch(start), (end - start) // datetime.timedelta(minutes=1))
+        needed = _span(to_epoch(start), minutes or self.duration_minutes)[1]
+        if not resources or count <= 0:
+            return []
+
+        with self._lock:
+            if any(kind == "interviewer" and (kind, name) not in self._rows for kind, name in resources):
+                return []
+            bits = self.free_matrix(resources, first, count).all(axis=0).astype(np.int8)
+
+        edges = np.diff(np.concatenate(([0], bits, [0])))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        return [
+            {"start": format_iso((first + int(s)) * BUCKET_SECONDS), "end": format_iso((first + int(e)) * BUCKET_SECONDS)}
+            for s, e in zip(starts, ends) if e - s >= needed
+        ]
+
+    def free_matrix(self, resources: List[Resource], first: int, count: int) -> np.ndarray:
+        """Free buckets of several calendars over a range of buckets
+
+        Interviewers are free where they made time available and are not
+        booked; rooms wherever they are not booked. Calendars that were
+        never seen count as an interviewer without time or an empty room.
+
+        Args:
+            resources: The calendars
+            first: First bucket of the range
+            count: Number of buckets in the range
+
+        Returns:
+            Boolean matrix with one row per calendar and one column per bucket
+        """
+        first_word, end_word = first // BUCKETS_PER_WORD, (first + count - 1) // BUCKETS_PER_WORD + 1
+        words = np.zeros((len(resources), end_word - first_word), dtype=np.uint64)
+        with self._lock:
+            low, high = max(first_word, self._base), min(end_word, self._base + self._busy.shape[1])
+            for index, resource in enumerate(resources):
+                room = resource[0] == "room"
+                if room:
+                    words[index] = _ALL
+                row = self._rows.get(resource)
+                if row is None or low >= high:
+                    continue
+                columns = slice(low - self._base, high - self._base)
+                offered = _ALL if room else self._offered[row, columns]
+                words[index, low - first_word:high - first_word] = offered & ~self._busy[row, columns]
+
+        bits = np.unpackbits(words.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+        offset = first - first_word * BUCKETS_PER_WORD
+        return bits[:, offset:offset + count].astype(bool)
+
+    def available_slots(self, slots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The slots whose interviewer and room are both still free
+
+        Args:
+            slots: Interview slots, as listed in a job's interview_slots
+
+        Returns:
+            The free slots, in their original order. Slots without a valid
+            date and time are kept, as they cannot be checked.
+        """
+        slots = [slot for slot in slots or [] if isinstance(slot, dict)]
+        booked = self._booked_bulk(slots)
+        return [slot for slot, taken in zip(slots, booked) if not taken]
+
+    def available_slots_bulk(self, job_listings: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Filter the interview slots of many jobs against the calendars at once
+
+        The slots of all jobs are checked together in one vectorised pass;
+        see available_slots.
+
+        Args:
+            job_listings: Jobs with job_id and interview_slots
+
+        Returns:
+            Mapping of job_id to the job's free slots, in their original order
+        """
+        owners, slots = [], []
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for index, job in enumerate(job_listings):
+            job_id = str(job.get("job_id") or job.get("title") or f"job-{index}")
+            result.setdefault(job_id, [])
+            for slot in job.get("interview_slots") or []:
+                if isinstance(slot, dict):
+                    owners.append(job_id)
+                    slots.append(slot)
+
+        for job_id, slot, taken in zip(owners, slots, self._booked_bulk(slots)):
+            if not taken:
+                result[job_id].append(slot)
+        return result
+
+    def _booked_bulk(self, slots: List[Dict[str, Any]]) -> np.ndarray:
+        """Whether the interviewer, a panel member or the room of each slot is booked
+
+        The slots are normalised to epoch arrays once, turned into word
+        indexes and bit masks, and the words of every calendar a slot holds
+        are gathered from the busy matrix and tested with array operations
+        instead of one check per slot.
+        """
+        booked = np.zeros(len(slots), dtype=bool)
+        if not slots:
+            return booked
+        table = SlotTable(slots, self.duration_minutes)
+        first, count = table.buckets(BUCKET_SECONDS)
+        # Spans over 64 buckets are checked on their first 64
+        count = np.minimum(count, BUCKETS_PER_WORD)
+        with self._lock:
+            columns = self._busy.shape[1]
+            if not columns:
+                return booked
+
+            # One entry per (slot, calendar) pair
+            resources = [slot_resources(slot) for slot in slots]
+            owners = np.array([index for index, held in enumerate(resources) for _ in held], dtype=np.int64)
+            rows = np.array([self._rows.get(resource, -1) for held in resources for resource in held],
+                            dtype=np.int64)
+
+            column = first // BUCKETS_PER_WORD - self._base
+            offset = (first % BUCKETS_PER_WORD).astype(np.uint64)
+            width = count.astype(np.uint64)
+            full = np.where(count >= BUCKETS_PER_WORD, _ALL,
+                            (_ONE << np.minimum(width, np.uint64(63))) - _ONE)
+            low = full << offset
+            # Bits that spill into the next word
+            spill = (offset + width) > _WORD_BITS
+            high = np.where(spill, full >> np.where(spill, _WORD_BITS - offset, np.uint64(0)), np.uint64(0))
+
+            for words, mask in ((column[owners], low[owners]), (column[owners] + 1, high[owners])):
+                valid = (rows >= 0) & (words >= 0) & (words < columns)
+                gathered = self._busy[np.where(valid, rows, 0), np.clip(words, 0, columns - 1)]
+                booked[owners[valid & ((gathered & mask) != 0)]] = True
+
+        return booked & table.valid
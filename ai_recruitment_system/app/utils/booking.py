@@ -0,0 +1,178 @@
+from typing import Dict, List, Any, Tuple
+import random
+import sqlite3
+import threading
+import time
+
+from .availability import AvailabilityEngine, slot_resources
+from .interview_store import InterviewStore
+
+# Number of locks the (calendar, day) pairs are striped over; bookings of
+# different interviewers or rooms on different days rarely wait for each other
+BOOKING_LOCK_STRIPES = 64
+
+# Attempts to claim a slot while the database is locked by another process
+BOOKING_MAX_ATTEMPTS = 5
+BOOKING_RETRY_BASE_SECONDS = 0.05
+
+
+class BookingMetrics:
+    """Counters of slot booking attempts, conflicts, lock waits and retries"""
+
+    def __init__(self):
+        self._counts = {
+            "attempts": 0, "booked": 0, "conflicts": 0, "store_conflicts": 0,
+            "lock_waits": 0, "lock_wait_seconds": 0.0, "retries": 0, "failures": 0
+        }
+        self._lock = threading.Lock()
+
+    def add(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters
+
+        Returns:
+            Booking attempts, successful bookings, conflicts (of which
+            store_conflicts were only caught by the shared database, i.e.
+            booked by another process), stripe lock waits and the time spent
+            waiting, database retries and bookings that gave up
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        counts["lock_wait_seconds"] = round(counts["lock_wait_seconds"], 4)
+        counts["conflict_rate"] = round(counts["conflicts"] / counts["attempts"], 3) if counts["attempts"] else 0.0
+        return counts
+
+
+class SlotBooker:
+    """Books interview slots safely across threads and processes
+
+    Within a process, bookings take striped locks keyed by calendar and day,
+    so two bookings of the same interviewer or room on the same day run one
+    after the other while unrelated ones proceed in parallel. Across
+    processes, every booked 15-minute bucket of every calendar is claimed in
+    the shared interview store, whose primary key lets only one claim per
+    bucket succeed; this is the compare-and-swap, and the in-memory calendars
+    only serve as a fast first check.
+    """
+
+    def __init__(self, availability: AvailabilityEngine, store: InterviewStore,
+                 stripes: int = BOOKING_LOCK_STRIPES):
+        """Initialize the booker
+
+        Args:
+            availability: The in-memory interviewer and room calendars
+            store: The interview store holding the shared claims
+            stripes: Number of striped locks
+        """
+        self.availability = availability
+        self.store = store
+        self.metrics = BookingMetrics()
+        self._stripes = [threading.Lock() for _ in range(max(1, stripes))]
+
+    def _claims(self, slot: Dict[str, Any]) -> List[Tuple[str, int]]:
+        span = self.availability.slot_span(slot)
+        if span is None:
+            return []
+        first, count = span
+        return [(f"{kind}:{name}", bucket) for kind, name in slot_resources(slot)
+                for bucket in range(first, first + count)]
+
+    def _stripe_locks(self, slot: Dict[str, Any]) -> List[threading.Lock]:
+        day = slot.get("date")
+        indexes = {hash((resource, day)) % len(self._stripes) for resource in slot_resources(slot)}
+        # Always taken in index order, so two bookings cannot deadlock
+        return [self._stripes[index] for index in sorted(indexes)]
+
+    def _acquire(self, locks: List[threading.Lock]) -> None:
+        for lock in locks:
+            if not lock.acquire(blocking=False):
+                started = time.perf_counter()
+                lock.acquire()
+                self.metrics.add("lock_waits")
+                self.metrics.add("lock_wait_seconds", time.perf_counter() - started)
+
+    def book(self, slot: Dict[str, Any], interview_id: str, interview: Dict[str, Any]) -> List[str]:
+        """Book the interviewer and room of a slot for an interview
+
+        The interview record is written in the same transaction as the slot
+        claims, so once the booking succeeds it is durable, and a failed
+        booking writes nothing.
+
+        Args:
+            slot: The interview slot
+            interview_id: The interview being booked
+            interview: The interview record to save with the booking
+
+        Returns:
+            Descriptions of the calendars that are already booked, as for
+            AvailabilityEngine.conflicts; empty if the slot was booked
+
+        Raises:
+            sqlite3.OperationalError: If the database stayed locked after
+                all attempts
+        """
+        self.metrics.add("attempts")
+        claims = self._claims(slot)
+        if not claims:
+            # Nothing to hold (no valid time, or a virtual interview without interviewer)
+            self.store.add_many([interview])
+            self.metrics.add("booked")
+            return []
+
+        locks = self._stripe_locks(slot)
+        self._acquire(locks)
+        try:
+            conflicts = self.availability.conflicts(slot)
+            if conflicts:
+                self.metrics.add("conflicts")
+                return conflicts
+
+            holders = self._reserve(interview_id, claims, interview)
+            if holders:
+                # Booked by another process; bring those bookings into the local calendars
+                for holder in holders:
+                    interview = self.store.get(holder)
+                    if interview:
+                        self.availability.book(interview.get("schedule", {}))
+                self.metrics.add("conflicts")
+                self.metrics.add("store_conflicts")
+                return self.availability.conflicts(slot) or [f"slot held by {', '.join(holders)}"]
+
+            self.availability.book(slot)
+            self.metrics.add("booked")
+            return []
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _reserve(self, interview_id: str, claims: List[Tuple[str, int]],
+                 interview: Dict[str, Any]) -> List[str]:
+        for attempt in range(BOOKING_MAX_ATTEMPTS):
+            try:
+                return self.store.reserve(interview_id, claims, interview)
+            except sqlite3.OperationalError as e:
+                if attempt == BOOKING_MAX_ATTEMPTS - 1 or "locked" not in str(e).lower():
+                    self.metrics.add("failures")
+                    raise
+                self.metrics.add("retries")
+                time.sleep(BOOKING_RETRY_BASE_SECONDS * (2 ** attempt) * (1 + random.random()))
+        return []
+
+    def release(self, slot: Dict[str, Any], interview_id: str) -> None:
+        """Free the slot of a booked interview again
+
+        Args:
+            slot: The interview slot that was booked
+            interview_id: The interview it was booked for
+        """
+        locks = self._stripe_locks(slot)
+        self._acquire(locks)
+        try:
+            self.store.release(interview_id)
+            self.availability.release(slot)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
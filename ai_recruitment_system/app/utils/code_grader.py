@@ -0,0 +1,357 @@
+from typing import Dict, List, Any, Optional
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pwd
+    import resource
+except ImportError:  # Not available on Windows; limits are then not enforced
+    pwd = None
+    resource = None
+
+DEFAULT_TIME_LIMIT = float(os.getenv("GRADER_TIME_LIMIT_SECONDS", "5"))
+DEFAULT_MEMORY_LIMIT_MB = int(os.getenv("GRADER_MEMORY_LIMIT_MB", "256"))
+DEFAULT_WORKERS = int(os.getenv("GRADER_WORKERS", str(os.cpu_count() or 2)))
+MAX_OUTPUT_BYTES = 64 * 1024
+
+# Unprivileged account submissions run as when the grader itself runs as root
+GRADER_USER = os.getenv("GRADER_USER", "nobody")
+
+# Interpreter that runs submissions; GRADER_USER must be able to execute it
+GRADER_PYTHON = os.getenv("GRADER_PYTHON", sys.executable)
+
+SUPPORTED_LANGUAGES = ("python", "python3")
+
+# Runs inside the sandboxed interpreter before the candidate's code. Network
+# modules are made unimportable, which only keeps honest code off the
+# network; real isolation needs the empty network namespace.
+_RUNNER = """
+import runpy, sys
+for _name in ("socket", "_socket", "ssl", "_ssl"):
+    sys.modules[_name] = None
+_solution = sys.argv[1]
+sys.argv = ["solution.py"]
+runpy.run_path(_solution, run_name="__main__")
+"""
+
+
+def _limit_resources(time_limit: float, memory_limit_mb: int):
+    """Build the preexec_fn that applies CPU, memory, file and process limits
+
+    It runs after the switch to the sandbox user, so the process limit
+    applies, and refuses to start the code if it would still run as root.
+    The CPU limit lies a second above the wall-clock limit, so a busy loop
+    is stopped by the wall clock and reported as a timeout.
+    """
+    def apply():
+        if os.geteuid() == 0:
+            raise PermissionError("graded code must not run as root")
+        cpu_seconds = int(time_limit + 0.999) + 1
+        memory = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (1024 * 1024, 1024 * 1024))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (32, 32))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if hasattr(resource, "RLIMIT_NPROC"):
+            resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    return apply
+
+
+def _running_as_root() -> bool:
+    return pwd is not None and os.geteuid() == 0
+
+
+def _sandbox_user() -> Optional[Any]:
+    """Password entry of GRADER_USER when running as root, else None"""
+    if not _running_as_root():
+        return None
+    try:
+        return pwd.getpwnam(GRADER_USER)
+    except KeyError:
+        return None
+
+
+def _outputs_match(actual: str, expected: str) -> bool:
+    """Compare program output ignoring trailing whitespace on each line"""
+    normalise = lambda text: [line.rstrip() for line in text.strip().splitlines()]
+    return normalise(actual) == normalise(expected)
+
+
+def _read_output(file) -> str:
+    file.seek(0)
+    return file.read(MAX_OUTPUT_BYTES).decode("utf-8", errors="replace")
+
+
+class CodeGrader:
+    """Runs coding-challenge submissions against test cases in sandboxed subprocesses
+
+    Every test case runs in a fresh interpreter with a stripped environment,
+    CPU/memory/file/process limits and a wall-clock timeout. Its working
+    directory is an empty scratch directory, and the solution and runner are
+    read-only. When the grader runs as root the code runs as GRADER_USER, so
+    it cannot read files such as .env that are not world-readable; if that
+    account is missing or cannot run GRADER_PYTHON, nothing is graded rather
+    than running the code as root. When `unshare` works the process also
+    gets an empty network namespace; otherwise network modules are only
+    disabled in the interpreter, which the result reports as
+    "network_isolated": false.
+    """
+
+    def __init__(self, time_limit: float = DEFAULT_TIME_LIMIT,
+                 memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+                 max_workers: int = DEFAULT_WORKERS):
+        """Initialize the code grader
+
+        Args:
+            time_limit: Per-test wall-clock and CPU limit in seconds
+            memory_limit_mb: Per-test address-space limit in megabytes
+            max_workers: Number of submissions graded in parallel
+        """
+        self.time_limit = time_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.max_workers = max_workers
+        self.user = _sandbox_user()
+        # Why graded code cannot run safely here, if it cannot
+        self.disabled_reason: Optional[str] = None
+        self._network_prefix: Optional[List[str]] = None
+        self._probed = False
+        self._probe_lock = threading.Lock()
+
+    def _user_options(self) -> Dict[str, Any]:
+        """Popen options switching to the sandbox user, if there is one"""
+        if self.user is None:
+            return {}
+        return {"user": self.user.pw_uid, "group": self.user.pw_gid, "extra_groups": []}
+
+    def _isolation_prefix(self) -> List[str]:
+        """Command prefix that removes network access
+
+        Probed once: first, when the grader runs as root, whether the
+        sandbox user exists and can run the interpreter, which disables
+        grading if not; then whether it can create a network namespace. The
+        namespace keeps the user's own uid, so graded code never sees uid 0.
+        """
+        with self._probe_lock:
+            if not self._probed:
+                if _running_as_root():
+                    if self.user is None or self.user.pw_uid == 0:
+                        self.disabled_reason = f"sandbox user {GRADER_USER} does not exist or is root"
+                    elif not self._probe([GRADER_PYTHON, "-I", "-S", "-c", "pass"]):
+                        self.disabled_reason = (f"{GRADER_USER} cannot run {GRADER_PYTHON}; set GRADER_PYTHON "
+                                                "to an interpreter it can execute")
+                    if self.disabled_reason:
+                        print(f"Warning: Local code grading is disabled: {self.disabled_reason}")
+                self._network_prefix = []
+                unshare = shutil.which("unshare")
+                if unshare and self._probe([unshare, "--net", "--map-current-user", "true"]):
+                    self._network_prefix = [unshare, "--net", "--map-current-user"]
+                if not self._network_prefix:
+                    print("Warning: unshare --net is unavailable; graded code is not network-isolated")
+                self._probed = True
+        return self._network_prefix
+
+    def _probe(self, command: List[str]) -> bool:
+        """Whether a command succeeds as the sandbox user"""
+        try:
+            return subprocess.run(command, capture_output=True, timeout=10, **self._user_options()).returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+    @property
+    def network_isolated(self) -> bool:
+        """Whether graded code runs in an empty network namespace"""
+        return bool(self._isolation_prefix())
+
+    @property
+    def sandbox_user(self) -> Optional[str]:
+        """Account graded code runs as, or None when it runs as the grader's own user"""
+        self._isolation_prefix()
+        return self.user.pw_name if self.user is not None else None
+
+    def _wait(self, process: subprocess.Popen) -> Optional[Any]:
+        """Reap the process within the time limit and return its resource usage
+
+        os.wait4 reports the CPU time of this child alone. Its ru_maxrss is
+        not used: the kernel carries the grader's own peak over into the
+        child at fork, so no rusage gives the solution's peak memory.
+
+        Returns:
+            The child's rusage, or None if it was killed at the time limit
+        """
+        deadline = time.monotonic() + self.time_limit
+        delay = 0.001
+        while True:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                process.returncode = os.waitstatus_to_exitcode(status)
+                return usage
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        _, status, _ = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        return None
+
+    def _run_test(self, workdir: str, test_case: Dict[str, Any], index: int) -> Dict[str, Any]:
+        scratch = tempfile.mkdtemp(prefix="scratch-", dir=workdir)
+        if self.user is not None:
+            os.chown(scratch, self.user.pw_uid, self.user.pw_gid)
+
+        command = self._isolation_prefix() + [
+            GRADER_PYTHON, "-I", "-S", os.path.join(workdir, "runner.py"), os.path.join(workdir, "solution.py")
+        ]
+        # Output goes to unlinked files, so nothing blocks on a full pipe
+        with tempfile.TemporaryFile() as stdin, tempfile.TemporaryFile() as stdout, \
+                tempfile.TemporaryFile() as stderr:
+            stdin.write(str(test_case.get("input", "")).encode("utf-8"))
+            stdin.seek(0)
+            started = time.monotonic()
+            try:
+                process = subprocess.Popen(
+                    command,
+                    stdin=stdin,
+                    stdout=stdout,
+                    stderr=stderr,
+                    cwd=scratch,
+                    env={"PATH": "/usr/bin:/bin", "PYTHONHASHSEED": "0", "HOME": scratch},
+                    preexec_fn=_limit_resources(self.time_limit, self.memory_limit_mb) if resource else None,
+                    start_new_session=True,
+                    **self._user_options()
+                )
+            except (OSError, subprocess.SubprocessError) as e:
+                # Includes the refusal to run as root
+                shutil.rmtree(scratch, ignore_errors=True)
+                return {"index": index, "passed": False, "status": "error",
+                        "error": f"Could not start the solution: {str(e)}", "wall_time_ms": 0.0}
+            usage = self._wait(process)
+            wall_time_ms = round((time.monotonic() - started) * 1000, 1)
+            output = _read_output(stdout)
+            errors = _read_output(stderr)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+        if usage is None:
+            return {
+                "index": index,
+                "passed": False,
+                "status": "timeout",
+                "wall_time_ms": round(self.time_limit * 1000, 1)
+            }
+
+        if process.returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+            # Stopped by the CPU limit
+            status = "timeout"
+        elif process.returncode != 0:
+            status = "memory_limit" if "MemoryError" in errors else "runtime_error"
+        elif _outputs_match(output, str(test_case.get("expected_output", ""))):
+            status = "ok"
+        else:
+            status = "wrong_answer"
+
+        result = {
+            "index": index,
+            "passed": status == "ok",
+            "status": status,
+            "wall_time_ms": wall_time_ms,
+            "cpu_time_ms": round((usage.ru_utime + usage.ru_stime) * 1000, 1)
+        }
+        if status == "runtime_error":
+            # Only the final traceback line (the exception) is kept
+            lines = errors.strip().splitlines()
+            result["error"] = lines[-1][:300] if lines else f"exit code {process.returncode}"
+        return result
+
+    def grade(self, code: str, test_cases: List[Dict[str, Any]], language: str = "python") -> Dict[str, Any]:
+        """Run one submission against its test cases
+
+        Args:
+            code: The submitted source code
+            test_cases: Test cases with "input" (stdin) and "expected_output" (stdout)
+            language: Language of the submission
+
+        Returns:
+            Pass/fail counts, overall status, per-test timing metrics and
+            the isolation that was applied; status "unsupported" if the
+            submission cannot be graded here, including when grading is
+            disabled because the code would run as root
+        """
+        # Challenges often name a version too, e.g. "Python 3.10"
+        language = (language or "python").strip().lower()
+        if language.split(" ")[0] not in SUPPORTED_LANGUAGES:
+            return {"status": "unsupported", "error": f"Local grading is not available for {language}"}
+        if not test_cases:
+            return {"status": "unsupported", "error": "No test cases provided"}
+        self._isolation_prefix()
+        if self.disabled_reason:
+            return {"status": "unsupported", "error": f"Local grading is disabled: {self.disabled_reason}"}
+
+        with tempfile.TemporaryDirectory(prefix="grader-") as workdir:
+            # Readable by the sandbox user, writable only by the grader
+            os.chmod(workdir, 0o755)
+            for name, content in (("solution.py", code), ("runner.py", _RUNNER)):
+                with open(os.path.join(workdir, name), 'w', encoding='utf-8') as file:
+                    file.write(content)
+                os.chmod(os.path.join(workdir, name), 0o644)
+            tests = [self._run_test(workdir, test_case, index) for index, test_case in enumerate(test_cases)]
+
+        passed = sum(1 for test in tests if test["passed"])
+        return {
+            "status": "passed" if passed == len(tests) else "failed",
+            "passed": passed,
+            "total": len(tests),
+            "pass_rate": round(passed / len(tests), 3),
+            "max_wall_time_ms": max(test["wall_time_ms"] for test in tests),
+            "network_isolated": self.network_isolated,
+            "sandbox_user": self.sandbox_user,
+            "tests": tests
+        }
+
+    def grade_many(self, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Grade many submissions in parallel
+
+        Args:
+            submissions: Dictionaries with "code", "test_cases" and optional "language"
+
+        Returns:
+            One grading result per submission, in the same order
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(
+                lambda item: self.grade(item.get("code", ""), item.get("test_cases", []), item.get("language", "python")),
+                submissions
+            ))
+
+
+def summarize_grading(grading: Dict[str, Any]) -> Dict[str, Any]:
+    """Condense a grading result to what the evaluation prompt needs
+
+    Args:
+        grading: Result of CodeGrader.grade
+
+    Returns:
+        Pass counts, the slowest test and the status of each failed test
+    """
+    return {
+        "graded_locally": True,
+        "tests_passed": grading["passed"],
+        "tests_total": grading["total"],
+        "pass_rate": grading["pass_rate"],
+        "max_wall_time_ms": grading["max_wall_time_ms"],
+        "failures": [
+            {key: test[key] for key in ("index", "status", "error") if key in test}
+            for test in grading["tests"] if not test["passed"]
+        ]
+    }
@@ -0,0 +1,259 @@
+from typing import Dict, List, Any, Optional, Iterator, Set
+import asyncio
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+DEFAULT_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "10"))
+DEFAULT_TIMEOUT = float(os.getenv("RESUME_EXTRACTION_TIMEOUT", "30"))
+DEFAULT_WORKERS = int(os.getenv("RESUME_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def iter_pdf_pages(path: str, max_pages: int = DEFAULT_MAX_PAGES) -> Iterator[str]:
+    """Yield the text of a PDF one page at a time
+
+    Pages are released as soon as their text is extracted, so memory stays
+    bounded by a single page regardless of document size.
+
+    Args:
+        path: Path to the PDF file
+        max_pages: Maximum number of pages to read
+
+    Yields:
+        The text of each page
+    """
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        for index, page in enumerate(pdf.pages):
+            if index >= max_pages:
+                break
+            yield page.extract_text() or ""
+            if hasattr(page, "close"):
+                page.close()
+
+
+def iter_docx_pages(path: str, max_pages: int = DEFAULT_MAX_PAGES) -> Iterator[str]:
+    """Yield the text of a DOCX file one page at a time
+
+    DOCX has no fixed layout, so pages are split on explicit and rendered
+    page breaks. The document XML is streamed rather than loaded whole.
+
+    Args:
+        path: Path to the DOCX file
+        max_pages: Maximum number of pages to read
+
+    Yields:
+        The text of each page
+    """
+    pages = 0
+    paragraphs: List[str] = []
+    current: List[str] = []
+
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("word/document.xml") as document:
+            for event, element in ElementTree.iterparse(document, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    is_break = (
+                        (tag == f"{_WORD_NS}br" and element.get(f"{_WORD_NS}type") == "page")
+                        or tag == f"{_WORD_NS}lastRenderedPageBreak"
+                    )
+                    if is_break and (paragraphs or current):
+                        if current:
+                            paragraphs.append("".join(current))
+                            current = []
+                        yield "\n".join(paragraphs)
+                        paragraphs = []
+                        pages += 1
+                        if pages >= max_pages:
+                            return
+                    continue
+
+                if tag == f"{_WORD_NS}t" and element.text:
+                    current.append(element.text)
+                elif tag == f"{_WORD_NS}tab":
+                    current.append("\t")
+                elif tag == f"{_WORD_NS}p":
+                    paragraphs.append("".join(current))
+                    current = []
+                    element.clear()
+
+    if paragraphs or current:
+        paragraphs.append("".join(current))
+        yield "\n".join(paragraphs)
+
+
+def extract_text(path: str, max_pages: int = DEFAULT_MAX_PAGES,
+                 timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """Extract the text of a single document
+
+    Runs inside a worker process. The deadline is checked between pages so a
+    slow document returns what was read so far instead of blocking the worker.
+
+    Args:
+        path: Path to the document
+        max_pages: Maximum number of pages to read
+        timeout: Time budget in seconds
+
+    Returns:
+        Dictionary with the extracted text and page statistics, or an error
+    """
+    extension = os.path.splitext(path)[1].lower()
+    started = time.monotonic()
+
+    try:
+        if extension == ".txt":
+            with open(path, 'r', encoding='utf-8') as file:
+                text = file.read()
+            return {"path": path, "text": text, "pages": 1, "truncated": False, "timed_out": False}
+
+        # Ask for one page past the cap so truncation can be reported exactly
+        if extension == ".pdf":
+            pages = iter_pdf_pages(path, max_pages + 1)
+        elif extension == ".docx":
+            pages = iter_docx_pages(path, max_pages + 1)
+        else:
+            return {"path": path, "error": f"Unsupported document type: {extension or 'unknown'}"}
+
+        texts = []
+        truncated = False
+        timed_out = False
+        for page_text in pages:
+            if len(texts) >= max_pages:
+                truncated = True
+                break
+            texts.append(page_text)
+            if time.monotonic() - started > timeout:
+                timed_out = True
+                break
+        if hasattr(pages, "close"):
+            pages.close()
+
+        return {
+            "path": path,
+            "text": "\n\n".join(texts).strip(),
+            "pages": len(texts),
+            "truncated": truncated,
+            "timed_out": timed_out
+        }
+    except ImportError as e:
+        return {"path": path, "error": f"Missing dependency for {extension} extraction: {str(e)}"}
+    except Exception as e:
+        return {"path": path, "error": f"Failed to extract text: {str(e)}"}
+
+
+def _extract_to_pipe(connection, path: str, max_pages: int, timeout: float) -> None:
+    """Worker process entry point: extract one document and send the result back"""
+    try:
+        connection.send(extract_text(path, max_pages, timeout))
+    finally:
+        connection.close()
+
+
+class DocumentExtractor:
+    """Extracts resume text from PDF, DOCX and plain-text files in worker processes
+
+    Each document is extracted in its own process, so CPU-heavy PDF layout
+    analysis never runs on the event loop and a worker that hangs past the
+    deadline can be killed without affecting the other documents. At most
+    ``max_workers`` processes run at once.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_pages: int = DEFAULT_MAX_PAGES,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """Initialize the document extractor
+
+        Args:
+            max_workers: Maximum number of worker processes running at once
+            max_pages: Maximum number of pages read per document
+            timeout: Per-file time budget in seconds
+        """
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._processes: Set[multiprocessing.Process] = set()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Threads that each supervise one worker process, created on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="document-extraction")
+        return self._executor
+
+    async def extract(self, path: str) -> Dict[str, Any]:
+        """Extract the text of a document without blocking the event loop
+
+        Args:
+            path: Path to the document
+
+        Returns:
+            Dictionary with the extracted text and page statistics, or an error
+        """
+        if not os.path.exists(path):
+            return {"path": path, "error": f"File not found: {path}"}
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._run, path)
+
+    async def extract_many(self, paths: List[str]) -> List[Dict[str, Any]]:
+        """Extract the text of several documents in parallel
+
+        Args:
+            paths: Paths to the documents
+
+        Returns:
+            One result per path, in the same order
+        """
+        return await asyncio.gather(*(self.extract(path) for path in paths))
+
+    def _run(self, path: str) -> Dict[str, Any]:
+        """Extract one document in a new worker process and wait for its result
+
+        The worker stops at the deadline between pages; the grace period covers
+        a single page that never finishes, after which the worker is killed.
+        """
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_extract_to_pipe,
+                                          args=(sender, path, self.max_pages, self.timeout), daemon=True)
+        try:
+            process.start()
+        except OSError as e:
+            receiver.close()
+            sender.close()
+            return {"path": path, "error": f"Could not start text extraction worker: {str(e)}"}
+        # Only the worker holds the sending end now, so a crash shows up as end of file
+        sender.close()
+        self._processes.add(process)
+
+        try:
+            if not receiver.poll(self.timeout * 1.5):
+                return {"path": path, "error": f"Text extraction timed out after {self.timeout}s"}
+            try:
+                return receiver.recv()
+            except EOFError:
+                return {"path": path, "error": "Text extraction worker exited unexpectedly"}
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.kill()
+            process.join()
+            self._processes.discard(process)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        for process in list(self._processes):
+            if process.is_alive():
+                process.kill()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
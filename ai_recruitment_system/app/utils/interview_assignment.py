@@ -0,0 +1,232 @@
+from typing import Dict, List, Any, Optional, Tuple
+import datetime
+import os
+import time
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+from .slot_table import SlotTable, slot_epoch, to_epoch, INTERVIEW_DURATION_MINUTES
+
+# Value of scheduling one interview, on top of the candidate's priority
+# (expected between 0 and 1, like a match score), so the solver schedules as
+# many candidates as it can before it favours high priorities
+ASSIGNMENT_VALUE = 1.0
+
+# Weight of the slot's position in time; kept well below the priority so
+# earlier slots only break ties between candidates of equal priority
+EARLINESS_WEIGHT = 1e-3
+
+# Earliest feasible slots per candidate that become edges of the matching;
+# candidates left unassigned get more in the next round
+ASSIGNMENT_SLOTS_PER_CANDIDATE = int(os.getenv("ASSIGNMENT_SLOTS_PER_CANDIDATE", "32"))
+
+# Rounds in which unassigned candidates get more slots
+ASSIGNMENT_MAX_ROUNDS = 4
+
+def _parse_time(value: Any) -> Optional[datetime.datetime]:
+    if isinstance(value, datetime.datetime):
+        return value
+    try:
+        return datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _slot_key(slot: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    return (slot.get("date"), slot.get("time"), slot.get("interviewer"))
+
+
+def assign_interviews(candidates: List[Dict[str, Any]], job_listings: List[Dict[str, Any]],
+                      duration_minutes: int = INTERVIEW_DURATION_MINUTES,
+                      slots_per_candidate: int = ASSIGNMENT_SLOTS_PER_CANDIDATE) -> Dict[str, Any]:
+    """Assign interview slots to many candidates at once
+
+    The assignment is solved as a min-cost bipartite matching between
+    candidates and slots. Only feasible pairs become edges: the slot belongs
+    to the candidate's job and lies inside one of their availability
+    windows, which is tested for all of a job's candidates and slots with
+    array operations. Every candidate also gets an edge to a private
+    "unassigned" node, so a full matching always exists and scipy's sparse
+    solver can be used; this scales to thousands of candidates and slots.
+    A pairing is worth ASSIGNMENT_VALUE plus the candidate's priority, minus
+    a small term that prefers earlier slots. A slot listed under several
+    jobs (same date, time and interviewer) is one slot.
+
+    To keep the graph small, each candidate only gets edges to their
+    slots_per_candidate earliest feasible slots. Later slots never lower
+    the cost of a pairing, so this only matters when all of a candidate's
+    edges are taken: such candidates get four times as many edges and the
+    matching is solved again, for up to ASSIGNMENT_MAX_ROUNDS rounds.
+
+    Args:
+        candidates: Candidates, each with:
+            - candidate_id: Identifier (defaults to name or position)
+            - job_id: Optional job the interview is for; any job if missing
+            - priority: Optional number between 0 and 1, higher is more
+              important (e.g. the match score); defaults to 0
+            - availability: Optional list of {"start", "end"} ISO date-time
+              windows; available at any time if missing
+        job_listings: Jobs with job_id and their free interview_slots
+        duration_minutes: Length of an interview when the slot does not
+            give a duration_minutes
+        slots_per_candidate: Earliest feasible slots per candidate in the
+            first round
+
+    Returns:
+        Dictionary with the assignments (candidate_id, job_id, slot), the
+        candidate_ids left unassigned and solver stats
+    """
+    started = time.perf_counter()
+
+    job_ids = [str(job.get("job_id") or job.get("title") or f"job-{index}")
+               for index, job in enumerate(job_listings)]
+    job_index = {job_id: index for index, job_id in enumerate(job_ids)}
+
+    # Distinct slots, and the slots each job offers
+    slot_index: Dict[Tuple[Any, Any, Any], int] = {}
+    slots: List[Dict[str, Any]] = []
+    job_slots: List[List[int]] = []
+    for job in job_listings:
+        offered: Dict[int, None] = {}
+        for slot in job.get("interview_slots") or []:
+            if not isinstance(slot, dict) or slot_epoch(slot) is None:
+                continue
+            key = _slot_key(slot)
+            if key not in slot_index:
+                slot_index[key] = len(slots)
+                slots.append(slot)
+            offered[slot_index[key]] = None
+        job_slots.append(list(offered))
+    slot_job = {}
+    for index, offered in enumerate(job_slots):
+        for slot in offered:
+            slot_job.setdefault(slot, index)
+
+    candidate_ids = [str(c.get("candidate_id") or c.get("name") or f"candidate-{index}")
+                     for index, c in enumerate(candidates)]
+
+    # Candidates grouped by the job whose slots they may take; None stands
+    # for any slot, and candidates for unknown jobs get none
+    groups: Dict[Optional[int], List[int]] = {}
+    for index, candidate in enumerate(candidates):
+        if candidate.get("job_id") is None:
+            groups.setdefault(None, []).append(index)
+        elif str(candidate["job_id"]) in job_index:
+            groups.setdefault(job_index[str(candidate["job_id"])], []).append(index)
+
+    # Slot times as epoch seconds; earliness is each slot's rank in time
+    table = SlotTable(slots, duration_minutes)
+    starts, ends = table.starts, table.ends
+    earliness = np.empty(len(slots))
+    earliness[table.order] = np.arange(len(slots)) / max(len(slots), 1)
+    priority = np.array([float(c.get("priority") or 0) for c in candidates])
+
+    # Feasible slots of each group's candidates, earliest first, with their
+    # rank among the candidate's feasible slots
+    feasible = []
+    degree = np.zeros(len(candidates), dtype=np.int64)
+    for job, members in groups.items():
+        columns = np.array(job_slots[job] if job is not None else range(len(slots)), dtype=np.int64)
+        if not len(columns):
+            continue
+        columns = columns[np.argsort(earliness[columns], kind="stable")]
+        available = _available(candidates, members, starts[columns], ends[columns])
+        rows, positions = np.nonzero(available)
+        ranks = np.cumsum(available, axis=1, dtype=np.int32)[rows, positions]
+        members = np.array(members, dtype=np.int64)
+        feasible.append((members[rows], columns[positions], ranks))
+        degree[members] = available.sum(axis=1)
+
+    limits = np.full(len(candidates), max(slots_per_candidate, 1), dtype=np.int64)
+    matched: List[Tuple[int, int]] = []
+    edges = rounds = 0
+    while feasible and degree.any() and rounds < ASSIGNMENT_MAX_ROUNDS:
+        rounds += 1
+        kept = [ranks <= limits[rows] for rows, _, ranks in feasible]
+        rows = np.concatenate([rows[keep] for (rows, _, _), keep in zip(feasible, kept)])
+        columns = np.concatenate([columns[keep] for (_, columns, _), keep in zip(feasible, kept)])
+        edges = len(rows)
+        matched = _match(rows, columns, len(candidates), len(slots), priority, earliness)
+
+        # Candidates whose edges were all taken while they have later slots
+        assigned_rows = np.zeros(len(candidates), dtype=bool)
+        assigned_rows[[row for row, _ in matched]] = True
+        starved = ~assigned_rows & (degree > limits)
+        if not starved.any():
+            break
+        limits[starved] *= 4
+
+    assignments: List[Dict[str, Any]] = []
+    assigned = set()
+    for row, column in matched:
+        job_id = candidates[row].get("job_id")
+        assignments.append({
+            "candidate_id": candidate_ids[row],
+            "job_id": str(job_id) if job_id is not None else job_ids[slot_job[column]],
+            "slot": slots[column]
+        })
+        assigned.add(row)
+
+    return {
+        "assignments": assignments,
+        "unassigned": [candidate_ids[index] for index in range(len(candidates)) if index not in assigned],
+        "stats": {
+            "candidates": len(candidates),
+            "slots": len(slots),
+            "feasible_pairs": int(degree.sum()),
+            "edges": edges,
+            "rounds": rounds,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+    }
+
+
+def _match(rows: np.ndarray, columns: np.ndarray, count: int, slot_count: int,
+           priority: np.ndarray, earliness: np.ndarray) -> List[Tuple[int, int]]:
+    """Min-cost matching of candidates to slots over the given edges
+
+    Returns:
+        The (candidate, slot) pairs, in candidate order
+    """
+    cost = EARLINESS_WEIGHT * earliness[columns] - priority[rows] - ASSIGNMENT_VALUE
+
+    # Unassigned nodes cost nothing; all costs are shifted to be positive,
+    # which every full matching pays equally
+    shift = 1.0 - min(float(cost.min()), 0.0)
+    graph = coo_matrix(
+        (np.concatenate([cost + shift, np.full(count, shift)]),
+         (np.concatenate([rows, np.arange(count)]), np.concatenate([columns, slot_count + np.arange(count)]))),
+        shape=(count, slot_count + count)
+    ).tocsr()
+    matched_rows, matched_columns = min_weight_full_bipartite_matching(graph)
+    return [(int(row), int(column)) for row, column in zip(matched_rows, matched_columns) if column < slot_count]
+
+
+def _available(candidates: List[Dict[str, Any]], members: List[int],
+               starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Boolean matrix of whether each candidate can attend each slot"""
+    owners, window_starts, window_ends = [], [], []
+    restricted = np.zeros(len(members), dtype=bool)
+    for position, index in enumerate(members):
+        windows = candidates[index].get("availability")
+        if not windows:
+            continue
+        restricted[position] = True
+        for window in windows:
+            start = _parse_time(window.get("start")) if isinstance(window, dict) else None
+            end = _parse_time(window.get("end")) if isinstance(window, dict) else None
+            if start is not None and end is not None:
+                owners.append(position)
+                window_starts.append(to_epoch(start))
+                window_ends.append(to_epoch(end))
+
+    available = np.ones((len(members), len(starts)), dtype=bool)
+    available[restricted] = False
+    if owners:
+        fits = ((np.array(window_starts)[:, None] <= starts[None, :]) &
+                (ends[None, :] <= np.array(window_ends)[:, None]))
+        # OR the windows of each candidate together
+        np.logical_or.at(available, np.array(owners), fits)
+    return available
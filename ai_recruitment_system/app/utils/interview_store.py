@@ -0,0 +1,376 @@
+from typing import Dict, List, Any, Optional, Tuple
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import xml.etree.ElementTree as ET
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MOYARC_PATH = os.path.join(PROJECT_ROOT, "moya", "project.moyarc")
+
+# Overrides the db_url of project.moyarc, e.g. sqlite:////var/lib/recruitment/interviews.db
+INTERVIEW_DB_URL = os.getenv("INTERVIEW_DB_URL")
+
+# Records queued with add() are written in batches of this size, or by a timer
+# INTERVIEW_STORE_FLUSH_SECONDS after the first one was queued; reads see
+# pending ones. Booked interviews are not queued: they are written with their
+# slot claims.
+INTERVIEW_STORE_BATCH_SIZE = int(os.getenv("INTERVIEW_STORE_BATCH_SIZE", "32"))
+INTERVIEW_STORE_FLUSH_SECONDS = float(os.getenv("INTERVIEW_STORE_FLUSH_SECONDS", "1.0"))
+
+_COLUMNS = ("interview_id", "candidate_name", "candidate_email", "job_id", "job_title",
+            "interviewer", "location", "date", "time", "status", "created_at", "data")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interviews (
+    interview_id TEXT PRIMARY KEY,
+    candidate_name TEXT,
+    candidate_email TEXT,
+    job_id TEXT,
+    job_title TEXT,
+    interviewer TEXT,
+    location TEXT,
+    date TEXT,
+    time TEXT,
+    status TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_interviews_interviewer_date ON interviews (interviewer, date);
+CREATE INDEX IF NOT EXISTS idx_interviews_date ON interviews (date);
+CREATE INDEX IF NOT EXISTS idx_interviews_candidate ON interviews (candidate_name);
+CREATE INDEX IF NOT EXISTS idx_interviews_job ON interviews (job_id);
+CREATE TABLE IF NOT EXISTS slot_claims (
+    resource TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    interview_id TEXT NOT NULL,
+    PRIMARY KEY (resource, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_slot_claims_interview ON slot_claims (interview_id);
+"""
+
+
+def configured_db_url() -> str:
+    """The interview database URL from INTERVIEW_DB_URL or project.moyarc"""
+    if INTERVIEW_DB_URL:
+        return INTERVIEW_DB_URL
+    try:
+        for setting in ET.parse(MOYARC_PATH).getroot().iter("set"):
+            if setting.get("name") == "db_url" and setting.text:
+                return setting.text.strip()
+    except (OSError, ET.ParseError) as e:
+        print(f"Warning: Could not read db_url from {MOYARC_PATH}: {str(e)}")
+    return "sqlite:///recruitment.db"
+
+
+def sqlite_path(db_url: str) -> str:
+    """File path of a sqlite:/// URL; relative paths are taken from the project root
+
+    Args:
+        db_url: The database URL
+
+    Returns:
+        The database file path, or ":memory:"
+    """
+    if not db_url.startswith("sqlite:///"):
+        raise ValueError(f"Unsupported interview database URL: {db_url} (only sqlite:/// is supported)")
+    path = db_url[len("sqlite:///"):]
+    if path in ("", ":memory:"):
+        return ":memory:"
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def new_interview_id() -> str:
+    """A random interview ID that is unique across processes and restarts"""
+    return f"INT-{uuid.uuid4().hex[:16].upper()}"
+
+
+class InterviewStore:
+    """Persistent interview repository on SQLite
+
+    The database runs in WAL mode, so readers in other processes are not
+    blocked while interviews are written. Interviews are indexed by
+    interviewer and date, date, candidate and job. A booked interview is
+    written in the same transaction as its slot claims, so it is durable
+    once the booking succeeds. Records that may be lost in a crash can be
+    queued with add() instead and are written in one transaction per batch;
+    every read flushes the queue first, so callers always see their own
+    writes.
+    """
+
+    def __init__(self, db_url: Optional[str] = None,
+                 batch_size: int = INTERVIEW_STORE_BATCH_SIZE,
+                 flush_seconds: float = INTERVIEW_STORE_FLUSH_SECONDS):
+        """Open (and if needed create) the interview database
+
+        Args:
+            db_url: sqlite:/// URL of the database; defaults to the configured one
+            batch_size: Number of pending interviews that triggers a write
+            flush_seconds: Longest time an interview stays pending
+        """
+        self.db_url = db_url or configured_db_url()
+        self.path = sqlite_path(self.db_url)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._pending: List[tuple] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        atexit.register(self.close)
+
+    @staticmethod
+    def _row(interview: Dict[str, Any]) -> tuple:
+        candidate = interview.get("candidate", {})
+        job = interview.get("job", {})
+        schedule = interview.get("schedule", {})
+        return (
+            interview["interview_id"], candidate.get("name"), candidate.get("email"),
+            job.get("job_id"), job.get("title"), schedule.get("interviewer"),
+            schedule.get("location"), schedule.get("date"), schedule.get("time"),
+            interview.get("status"), interview.get("created_at"), json.dumps(interview)
+        )
+
+    def add(self, interview: Dict[str, Any]) -> None:
+        """Queue an interview record for writing in the next batch
+
+        Queued records are lost if the process dies before the batch is
+        written, so this is only for updates that can be redone; bookings
+        are written by reserve.
+
+        Args:
+            interview: The interview record, with interview_id, candidate,
+                job, schedule, status and created_at
+        """
+        with self._lock:
+            self._pending.append(self._row(interview))
+            if len(self._pending) >= self.batch_size:
+                self._flush_quietly()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self._flush_quietly)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_quietly(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                # The batch stays pending and is retried by the next write or read
+                print(f"Warning: Could not write interviews, will retry: {str(e)}")
+
+    def add_many(self, interviews: List[Dict[str, Any]]) -> None:
+        """Write many interview records in one transaction
+
+        Args:
+            interviews: The interview records
+        """
+        with self._lock:
+            self._pending.extend(self._row(interview) for interview in interviews)
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending interviews in one transaction"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            placeholders = ", ".join("?" for _ in _COLUMNS)
+            with _Transaction(self._conn):
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO interviews ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                    self._pending
+                )
+            self._pending = []
+
+    def reserve(self, interview_id: str, claims: List[Tuple[str, int]],
+                interview: Dict[str, Any]) -> List[str]:
+        """Claim calendar buckets for an interview, all or nothing
+
+        Each (resource, bucket) pair can be claimed once, enforced by the
+        primary key, so of two processes claiming the same bucket exactly one
+        succeeds. The claims and the interview record are committed in one
+        transaction, at once, so a crash never leaves a booked interview
+        unsaved or a slot claimed for an interview that does not exist.
+
+        Args:
+            interview_id: The interview the buckets are claimed for
+            claims: (resource, bucket) pairs, e.g. ("interviewer:Lisa Patel, CTO", 1970112)
+            interview: The interview record to write with the claims
+
+        Returns:
+            IDs of the interviews already holding some of the buckets; empty
+            if all were claimed
+
+        Raises:
+            sqlite3.OperationalError: If the database stayed locked
+        """
+        with self._lock:
+            try:
+                with _Transaction(self._conn):
+                    self._conn.executemany(
+                        "INSERT INTO slot_claims (resource, bucket, interview_id) VALUES (?, ?, ?)",
+                        [(resource, bucket, interview_id) for resource, bucket in claims]
+                    )
+                    self._conn.execute(
+                        f"INSERT OR REPLACE INTO interviews ({', '.join(_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                        self._row(interview)
+                    )
+                return []
+            except sqlite3.IntegrityError:
+                holders = set()
+                for resource, bucket in claims:
+                    row = self._conn.execute("SELECT interview_id FROM slot_claims WHERE resource = ? AND bucket = ?",
+                                             (resource, bucket)).fetchone()
+                    if row and row["interview_id"] != interview_id:
+                        holders.add(row["interview_id"])
+                return sorted(holders)
+
+    def release_orphan_claims(self) -> int:
+        """Delete slot claims that have no interview record
+
+        A maintenance call for databases written by earlier versions, whose
+        claims were committed before their interviews; such claims would
+        block their slots for good. reserve writes both together, so live
+        bookings are never orphans.
+
+        Returns:
+            The number of claims deleted
+        """
+        with self._lock:
+            self.flush()
+            with _Transaction(self._conn):
+                return self._conn.execute("DELETE FROM slot_claims WHERE interview_id NOT IN "
+                                          "(SELECT interview_id FROM interviews)").rowcount
+
+    def release(self, interview_id: str) -> None:
+        """Drop the calendar claims of an interview
+
+        Args:
+            interview_id: The interview whose buckets are freed
+        """
+        with self._lock:
+            with _Transaction(self._conn):
+                self._conn.execute("DELETE FROM slot_claims WHERE interview_id = ?", (interview_id,))
+
+    def get(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """Look up an interview by ID
+
+        Args:
+            interview_id: The interview ID
+
+        Returns:
+            The interview record, or None if there is none
+        """
+        with self._lock:
+            self.flush()
+            row = self._conn.execute("SELECT data FROM interviews WHERE interview_id = ?",
+                                     (interview_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def find(self, interviewer: Optional[str] = None, date: Optional[str] = None,
+             candidate: Optional[str] = None, job_id: Optional[str] = None,
+             status: Optional[str] = None, from_date: Optional[str] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Find interviews, each filter using its index
+
+        Args:
+            interviewer: Interviewer name
+            date: Interview date (YYYY-MM-DD)
+            candidate: Candidate name
+            job_id: Job ID
+            status: Interview status, e.g. "scheduled"
+            from_date: Earliest interview date (YYYY-MM-DD)
+            limit: Maximum number of interviews to return
+
+        Returns:
+            The interview records, ordered by date and time
+        """
+        filters = [("interviewer = ?", interviewer), ("date = ?", date), ("candidate_name = ?", candidate),
+                   ("job_id = ?", job_id), ("status = ?", status), ("date >= ?", from_date)]
+        clauses = [clause for clause, value in filters if value is not None]
+        values: List[Any] = [value for _, value in filters if value is not None]
+        query = "SELECT data FROM interviews"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY date, time, created_at"
+        if limit is not None:
+            query += " LIMIT ?"
+            values.append(int(limit))
+
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(query, values).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def count(self) -> int:
+        """Number of stored interviews"""
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM interviews").fetchone()[0]
+
+    def close(self) -> None:
+        """Write pending interviews and close the database"""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self.flush()
+            finally:
+                self._conn.close()
+                self._conn = None
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+_stores: Dict[str, InterviewStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_interview_store(db_url: Optional[str] = None) -> InterviewStore:
+    """The shared interview store of a database, opened on first use
+
+    Args:
+        db_url: sqlite:/// URL of the database; defaults to the configured one
+
+    Returns:
+        The store, shared by every caller in this process. If the database
+        cannot be opened, an in-memory store is used so scheduling still works.
+    """
+    db_url = db_url or configured_db_url()
+    with _stores_lock:
+        if db_url not in _stores or _stores[db_url]._conn is None:
+            try:
+                _stores[db_url] = InterviewStore(db_url)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                print(f"Warning: Could not open the interview database, interviews will not persist: {str(e)}")
+                _stores[db_url] = InterviewStore("sqlite:///:memory:")
+        return _stores[db_url]
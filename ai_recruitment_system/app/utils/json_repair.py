@@ -0,0 +1,241 @@
+from typing import List, Any, Optional, Tuple
+import copy
+import json
+import re
+
+# Bare words the model sometimes emits outside of strings
+_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null"
+}
+_CLOSERS = {"{": "}", "[": "]"}
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def repair_json(text: str, opener: Optional[str] = None) -> Optional[str]:
+    """Turn an LLM completion into a string that json.loads accepts
+
+    The completion is scanned once: markdown fences and prose before the first
+    '{' or '[' (or before the first opener, when given) are skipped, '//'
+    comments and trailing commas are dropped, Python literals are mapped to
+    JSON and anything after the top-level value is ignored. Truncated output
+    has its open string, dangling key and open arrays/objects closed, and so
+    does output with a mismatched closer, where the scan stops.
+
+    Args:
+        text: The raw completion text
+        opener: Optional '{' or '[' the top-level value is expected to start with
+
+    Returns:
+        The repaired JSON text, or None if the text contains no JSON value
+    """
+    return _repair(text, opener)[0]
+
+
+def is_truncated_json(text: str, opener: Optional[str] = None) -> bool:
+    """Whether repairing an LLM completion had to close its top-level value
+
+    This is the case for output cut off at the token limit, and for output
+    with a mismatched closer. The data recovered from such output is
+    complete up to the cut, but its last open entry is not.
+
+    Args:
+        text: The raw completion text
+        opener: Optional '{' or '[' the top-level value is expected to start with
+
+    Returns:
+        True if an open string, array or object was closed by the repair
+    """
+    return _repair(text, opener)[1]
+
+
+def _repair(text: str, opener: Optional[str]) -> Tuple[Optional[str], bool]:
+    """Repaired JSON text and whether the top-level value had to be closed"""
+    if not isinstance(text, str):
+        return None, False
+
+    starts = [i for i in (text.find(char) for char in (opener or "{[")) if i >= 0]
+    if not starts:
+        return None, False
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    string_start = -1
+    i = min(starts)
+    length = len(text)
+
+    while i < length:
+        char = text[i]
+
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                # Raw newlines are not allowed inside JSON strings
+                out[-1] = "\\n"
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+            string_start = len(out)
+            out.append(char)
+        elif char in "{[":
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            _drop_dangling(out)
+            if not stack or _CLOSERS[stack[-1]] != char:
+                # A mismatched closer: close what is open and keep what came before
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+        elif char == "/" and text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = length if newline < 0 else newline
+            continue
+        elif char.isalpha() and not (out and out[-1][-1:].isdigit()):
+            end = i
+            while end < length and (text[end].isalnum() or text[end] == "_"):
+                end += 1
+            word = text[i:end]
+            out.append(_LITERALS.get(word, json.dumps(word)))
+            i = end
+            continue
+        else:
+            out.append(char)
+        i += 1
+
+    closed = in_string or bool(stack)
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+        # A truncated key needs a value before the object can be closed
+        preceding = "".join(out[:string_start]).rstrip()
+        if stack and stack[-1] == "{" and preceding.endswith(("{", ",")):
+            out.append(":null")
+
+    if stack:
+        _drop_dangling(out)
+        while stack:
+            out.append(_CLOSERS[stack.pop()])
+
+    return "".join(out), closed
+
+
+def _drop_dangling(out: List[str]) -> None:
+    """Remove a trailing comma or complete a trailing colon before a closer"""
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+    elif out and out[-1] == ":":
+        out.append("null")
+
+
+def extract_json(text: str, schema: Any = None) -> Any:
+    """Parse an LLM completion into Python data, repairing it if needed
+
+    Args:
+        text: The raw completion text
+        schema: Optional schema template passed to coerce_to_schema
+
+    Returns:
+        The parsed (and coerced) data, or None if nothing could be recovered
+    """
+    if isinstance(text, (dict, list)):
+        data = text
+    else:
+        opener = "{" if isinstance(schema, dict) else "[" if isinstance(schema, list) else None
+        repaired = repair_json(text, opener)
+        if repaired is None:
+            return None
+        try:
+            data = json.loads(repaired)
+        except json.JSONDecodeError:
+            return None
+
+    if schema is not None:
+        data = coerce_to_schema(data, schema)
+    return data
+
+
+def coerce_to_schema(data: Any, schema: Any) -> Any:
+    """Coerce parsed data to the shape of a schema template
+
+    The template is an example value: dicts list their expected keys with
+    defaults, a one-item list gives the template for every element and
+    scalars give both the expected type and the default. Missing keys are
+    filled from the template and extra keys are kept.
+
+    Args:
+        data: The parsed data
+        schema: The schema template
+
+    Returns:
+        The coerced data
+    """
+    if isinstance(schema, dict):
+        if not isinstance(data, dict):
+            return _default(schema)
+        result = dict(data)
+        for key, template in schema.items():
+            if key in result:
+                result[key] = coerce_to_schema(result[key], template)
+            else:
+                result[key] = _default(template)
+        return result
+
+    if isinstance(schema, list):
+        if data is None or data == "N/A":
+            return []
+        if not isinstance(data, list):
+            data = [data]
+        if not schema:
+            return data
+        return [coerce_to_schema(item, schema[0]) for item in data if item is not None]
+
+    if isinstance(schema, bool):
+        if isinstance(data, bool):
+            return data
+        if isinstance(data, str):
+            return data.strip().lower() in ("true", "yes", "1")
+        return schema if data is None else bool(data)
+
+    if isinstance(schema, (int, float)):
+        if isinstance(data, (int, float)) and not isinstance(data, bool):
+            return data
+        if isinstance(data, str):
+            match = _NUMBER_PATTERN.search(data)
+            if match:
+                number = float(match.group())
+                return int(number) if isinstance(schema, int) and number.is_integer() else number
+        return schema
+
+    if isinstance(schema, str):
+        if data is None:
+            return schema
+        if isinstance(data, (dict, list)):
+            return data
+        return data if isinstance(data, str) else str(data)
+
+    return data
+
+
+def _default(template: Any) -> Any:
+    """Build the default value for a schema template"""
+    if isinstance(template, dict):
+        return {key: _default(value) for key, value in template.items()}
+    if isinstance(template, list):
+        return []
+    return copy.copy(template)
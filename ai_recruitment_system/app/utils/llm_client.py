@@ -0,0 +1,206 @@
+from typing import Dict, List, Any, AsyncIterator, Optional
+import asyncio
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+# Connections kept in the shared pool, across all hosts
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "64"))
+
+# Requests in flight to one host at the same time
+LLM_MAX_PER_HOST = int(os.getenv("LLM_MAX_PER_HOST", "32"))
+
+# Seconds an idle connection stays open for the next request
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+
+# Seconds to wait for a model reply
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+
+# Attempts per request when the endpoint is throttling or unavailable
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_RETRY_BASE_SECONDS = 0.5
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Failures of a pooled connection the server had already closed, or of a new one
+_RETRY_ERRORS = (httpx.ConnectError, httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError)
+
+
+class LLMRequestError(Exception):
+    """An LLM request the endpoint rejected"""
+
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"LLM request failed with status {status_code}: {body[:500]}")
+        self.status_code = status_code
+        self.body = body
+
+
+class AsyncLLMClient:
+    """Async Azure OpenAI chat client over a shared keep-alive connection pool
+
+    All requests of a process share one httpx.AsyncClient, so TLS
+    connections are reused instead of opened per call, and a per-host
+    semaphore caps the requests in flight to each endpoint. The pool belongs
+    to the event loop it was first used on; a new event loop gets a new pool.
+    Each pool is closed when its loop shuts down its async generators, as
+    asyncio.run does, or on its own loop when a later loop replaces it while
+    the first is still open.
+    """
+
+    def __init__(self, api_base: Optional[str], api_key: Optional[str], api_version: Optional[str],
+                 deployment: str, pool_size: int = LLM_POOL_SIZE, max_per_host: int = LLM_MAX_PER_HOST):
+        """Initialize the client; no connection is opened until the first request
+
+        Args:
+            api_base: The Azure OpenAI endpoint
+            api_key: The Azure OpenAI key
+            api_version: The Azure OpenAI API version
+            deployment: The model deployment to call
+            pool_size: Connections kept in the pool
+            max_per_host: Requests in flight to one host at the same time
+        """
+        self.api_base = (api_base or "").rstrip("/")
+        self.api_key = api_key
+        self.api_version = api_version
+        self.deployment = deployment
+        self.pool_size = max(1, pool_size)
+        self.max_per_host = max(1, max_per_host)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closer: Optional[AsyncIterator[None]] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._counts = {"requests": 0, "retries": 0, "failures": 0, "in_flight": 0, "peak_in_flight": 0,
+                        "host_waits": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        """Whether an endpoint and key are set"""
+        return bool(self.api_base and self.api_key)
+
+    async def _pool(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Connections of an earlier event loop cannot be used on this one
+            previous, previous_loop = self._client, self._loop
+            if previous is not None and not previous_loop.is_closed():
+                asyncio.run_coroutine_threadsafe(previous.aclose(), previous_loop)
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size,
+                                    keepalive_expiry=LLM_KEEPALIVE_SECONDS),
+                timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0),
+                headers={"api-key": self.api_key or ""}
+            )
+            self._loop = loop
+            self._host_limits = {}
+            self._closer = self._close_at_shutdown(self._client)
+            await self._closer.__anext__()
+        return self._client
+
+    @staticmethod
+    async def _close_at_shutdown(client: httpx.AsyncClient) -> AsyncIterator[None]:
+        """Async generator that closes a pool when its loop finalises it
+
+        Started once and left suspended; loop.shutdown_asyncgens (called by
+        asyncio.run) closes it before the loop is closed, which runs the
+        finally block on that loop.
+        """
+        try:
+            yield
+        finally:
+            await client.aclose()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    def _add(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+            if name == "in_flight":
+                self._counts["peak_in_flight"] = max(self._counts["peak_in_flight"], self._counts["in_flight"])
+
+    async def chat(self, messages: List[Dict[str, str]],
+                   response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Send one chat completion request and return the reply text
+
+        Throttled (429) and unavailable (5xx) requests, and requests on a
+        connection that dropped, are retried with exponential backoff,
+        honouring Retry-After.
+
+        Args:
+            messages: The chat messages, with role and content
+            response_format: Optional JSON Schema response_format for the reply
+
+        Returns:
+            The content of the first choice
+
+        Raises:
+            LLMRequestError: If the endpoint rejected the request
+            httpx.HTTPError: If the endpoint could not be reached
+        """
+        url = f"{self.api_base}/openai/deployments/{self.deployment}/chat/completions"
+        body: Dict[str, Any] = {"messages": messages}
+        if response_format is not None:
+            body["response_format"] = response_format
+
+        client = await self._pool()
+        limit = self._host_limit(url)
+        if limit.locked():
+            self._add("host_waits")
+        async with limit:
+            self._add("requests")
+            self._add("in_flight")
+            started = time.perf_counter()
+            try:
+                for attempt in range(LLM_MAX_ATTEMPTS):
+                    last = attempt == LLM_MAX_ATTEMPTS - 1
+                    delay = LLM_RETRY_BASE_SECONDS * (2 ** attempt) * (1 + random.random())
+                    try:
+                        response = await client.post(url, params={"api-version": self.api_version}, json=body)
+                    except _RETRY_ERRORS:
+                        if last:
+                            self._add("failures")
+                            raise
+                        self._add("retries")
+                        await asyncio.sleep(delay)
+                        continue
+                    if response.status_code in _RETRY_STATUS and not last:
+                        self._add("retries")
+                        try:
+                            delay = max(delay, float(response.headers.get("retry-after", 0)))
+                        except ValueError:
+                            pass
+                        await asyncio.sleep(delay)
+                        continue
+                    if response.status_code >= 400:
+                        self._add("failures")
+                        raise LLMRequestError(response.status_code, response.text)
+                    return response.json()["choices"][0]["message"]["content"] or ""
+                return ""
+            finally:
+                self._add("in_flight", -1)
+                self._add("seconds", time.perf_counter() - started)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Requests, retries, failures, requests in flight now and at peak,
+        waits for a per-host slot and total request time"""
+        with self._lock:
+            counts = dict(self._counts)
+        counts["seconds"] = round(counts["seconds"], 3)
+        counts["pool_size"] = self.pool_size
+        counts["max_per_host"] = self.max_per_host
+        return counts
+
+    async def aclose(self) -> None:
+        """Close the pooled connections"""
+        client, self._client = self._client, None
+        self._closer = None
+        if client is not None and self._loop is asyncio.get_running_loop():
+            await client.aclose()
@@ -0,0 +1,128 @@
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from functools import lru_cache
+import os
+import threading
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+DEFAULT_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+DEFAULT_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+# Only tokenization and NER are needed; the rest is never loaded
+EXCLUDED_COMPONENTS = ["parser", "tagger", "attribute_ruler", "lemmatizer", "morphologizer", "senter", "textcat"]
+
+# Entity labels kept from the NER component
+ENTITY_LABELS = ("PERSON", "ORG", "GPE", "LOC", "DATE")
+
+# Skill vocabulary covering the job catalog and common resume terms
+DEFAULT_SKILLS: Tuple[str, ...] = (
+    "python", "java", "javascript", "typescript", "c++", "c#", "go", "r", "sql", "html", "css",
+    "react", "react native", "redux", "node.js", "express", "spring", "flask", "django", "graphql",
+    "rest api", "microservices", "mongodb", "postgresql", "mysql", "oracle", "redis", "firebase",
+    "elasticsearch", "kafka", "nosql", "machine learning", "deep learning", "ai", "nlp",
+    "computer vision", "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "opencv",
+    "statistics", "data visualization", "tableau", "spark", "hadoop", "big data", "mlops",
+    "aws", "docker", "kubernetes", "ci/cd", "terraform", "ansible", "prometheus", "grafana", "git",
+    "ios", "android", "mobile development", "webpack", "jest", "sass", "accessibility",
+    "database optimization", "backup and recovery", "data modeling", "high availability"
+)
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """Return the process-wide spaCy pipeline, loading it on first use
+
+    spaCy itself is imported here rather than at module level, so importing
+    the agents does not pay for it until an extraction actually runs.
+
+    Returns:
+        The loaded spaCy Language object
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL, exclude=EXCLUDED_COMPONENTS)
+    return _nlp
+
+
+@lru_cache(maxsize=8)
+def _skill_matcher(skills: Tuple[str, ...]):
+    """Build (once per vocabulary) a case-insensitive phrase matcher for skills
+
+    Each skill is its own match id, so a match maps back to the skill
+    however the matched text is spaced or cased.
+    """
+    from spacy.matcher import PhraseMatcher
+
+    nlp = get_nlp()
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    for skill in skills:
+        matcher.add(skill, [nlp.make_doc(skill)])
+    return matcher
+
+
+def _match_skills(nlp, matcher, text: str) -> List[str]:
+    """Skills of a matcher mentioned in a text, in order of first mention
+
+    Only the tokenizer runs. Skills are matched on whitespace-normalised
+    text, so "React\nNative" is one skill; overlapping matches keep the
+    longest span.
+    """
+    from spacy.tokens import Span
+    from spacy.util import filter_spans
+
+    flat = nlp.make_doc(" ".join(text.split()))
+    found_skills = []
+    for span in filter_spans([Span(flat, start, end, label=match_id) for match_id, start, end in matcher(flat)]):
+        if span.label_ not in found_skills:
+            found_skills.append(span.label_)
+    return found_skills
+
+
+def extract_entities(texts: Iterable[str], skills: Optional[Iterable[str]] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     n_process: int = DEFAULT_N_PROCESS) -> List[Dict[str, Any]]:
+    """Extract named entities and skills from many texts in batches
+
+    Args:
+        texts: The texts to process
+        skills: Skill vocabulary to match, defaults to DEFAULT_SKILLS
+        batch_size: Number of texts per nlp.pipe batch
+        n_process: Number of worker processes used by nlp.pipe
+
+    Returns:
+        One dictionary per text with "entities" (label -> values) and "skills"
+    """
+    nlp = get_nlp()
+    matcher = _skill_matcher(tuple(skills) if skills else DEFAULT_SKILLS)
+
+    results = []
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        entities: Dict[str, List[str]] = {label: [] for label in ENTITY_LABELS}
+        for ent in doc.ents:
+            if ent.label_ in entities and ent.text not in entities[ent.label_]:
+                entities[ent.label_].append(ent.text)
+        results.append({"entities": entities, "skills": _match_skills(nlp, matcher, doc.text)})
+    return results
+
+
+def extract_skills(text: str, skills: Optional[Iterable[str]] = None) -> List[str]:
+    """Extract the skills mentioned in a single text
+
+    Only the tokenizer and the phrase matcher run, not the NER pipeline,
+    so this is cheap enough for a gate in front of the resume parse.
+
+    Args:
+        text: The text to search
+        skills: Skill vocabulary to match, defaults to DEFAULT_SKILLS
+
+    Returns:
+        The matched skills, in order of first mention
+
+    Raises:
+        ImportError, OSError: If spaCy or its model is not installed
+    """
+    return _match_skills(get_nlp(), _skill_matcher(tuple(skills) if skills else DEFAULT_SKILLS), text)
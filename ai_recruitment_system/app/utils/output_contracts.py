@@ -0,0 +1,58 @@
+from typing import Dict, Any
+import os
+
+# Ask the model for short-key, minified JSON and re-expand it locally
+COMPACT_LLM_OUTPUT = os.getenv("COMPACT_LLM_OUTPUT", "true").lower() == "true"
+
+
+class OutputContract:
+    """Maps the short keys of a compact LLM output format back to the public schema
+
+    The key map gives, for every public field name, either its short key or a
+    (short key, nested key map) pair. A nested key map is a dict for an object
+    value, or a one-item list holding the key map of every element of an
+    array of objects. Short keys only need to be unique within one object.
+    """
+
+    def __init__(self, keys: Dict[str, Any]):
+        """Initialize the output contract
+
+        Args:
+            keys: Public field name to short key, or to (short key, nested key map)
+        """
+        self.keys = keys
+
+    def expand(self, data: Any) -> Any:
+        """Rename short keys to their public names
+
+        Keys that are already public names, or unknown, are kept unchanged, so
+        full-format responses pass through as they are.
+
+        Args:
+            data: The parsed compact response
+
+        Returns:
+            The data with public field names
+        """
+        return _expand(data, self.keys)
+
+
+def _expand(data: Any, keys: Any) -> Any:
+    if isinstance(keys, list):
+        if not isinstance(data, list):
+            return data
+        return [_expand(item, keys[0]) for item in data]
+    if not isinstance(data, dict) or not isinstance(keys, dict):
+        return data
+
+    short_names = {}
+    for name, key in keys.items():
+        short, nested = key if isinstance(key, tuple) else (key, None)
+        short_names[short] = (name, nested)
+        short_names.setdefault(name, (name, nested))
+
+    result = {}
+    for key, value in data.items():
+        name, nested = short_names.get(key, (key, None))
+        result[name] = _expand(value, nested) if nested is not None else value
+    return result
@@ -0,0 +1,214 @@
+from typing import Dict, List, Any, Optional, Tuple
+import datetime
+import heapq
+import itertools
+import os
+import time
+
+import numpy as np
+
+from .availability import AvailabilityEngine, BUCKET_MINUTES, BUCKET_SECONDS, Resource
+from .slot_table import format_iso, to_epoch
+
+# Longest time spent searching for panel options; the best ones found so far are returned
+PANEL_TIME_BUDGET_SECONDS = float(os.getenv("PANEL_TIME_BUDGET_SECONDS", "0.5"))
+
+# Number of panel options returned
+PANEL_MAX_OPTIONS = int(os.getenv("PANEL_MAX_OPTIONS", "10"))
+
+# Panel interviews start on this grid, e.g. on the hour and half hour
+PANEL_STEP_MINUTES = int(os.getenv("PANEL_STEP_MINUTES", "30"))
+
+
+def _window_starts(free: np.ndarray, needed: int) -> np.ndarray:
+    """Buckets where a run of needed free buckets begins, for each row of free
+
+    Args:
+        free: Boolean matrix of free buckets, one row per calendar
+        needed: Length of the interview in buckets
+
+    Returns:
+        Boolean matrix with one column per possible start bucket
+    """
+    sums = np.zeros((free.shape[0], free.shape[1] + 1), dtype=np.int32)
+    np.cumsum(free, axis=1, out=sums[:, 1:])
+    return (sums[:, needed:] - sums[:, :-needed]) == needed
+
+
+def _parse_panel(panel: Dict[str, Any]) -> Tuple[List[str], List[Tuple[int, List[str]]], List[str]]:
+    """Required interviewers, choice groups (count, members) and rooms of a panel"""
+    required = [str(name).strip() for name in panel.get("interviewers") or [] if str(name).strip()]
+    groups = []
+    for group in panel.get("choose") or []:
+        members = [str(name).strip() for name in group.get("from") or []
+                   if str(name).strip() and str(name).strip() not in required]
+        count = int(group.get("count") or 1)
+        if count > len(members):
+            raise ValueError(f"Panel group needs {count} of {len(members)} interviewers")
+        groups.append((count, members))
+    rooms = [str(room).strip() for room in panel.get("rooms") or [] if str(room).strip()]
+    return required, groups, rooms
+
+
+def find_panel_options(availability: AvailabilityEngine, panel: Dict[str, Any],
+                       start: datetime.datetime, end: datetime.datetime,
+                       max_options: int = PANEL_MAX_OPTIONS,
+                       time_budget: float = PANEL_TIME_BUDGET_SECONDS) -> Dict[str, Any]:
+    """Find times when a whole interview panel and a room are free together
+
+    The search is a small constraint problem over the availability bitsets:
+    the start time, the members picked from each choice group and the room.
+    Every calendar becomes a boolean vector of feasible start buckets, so
+    constraint propagation is a vector AND: the start domain is narrowed by
+    the required interviewers, by each group still having enough free
+    members and by at least one room being free, before any choice is made.
+    Groups are then picked by backtracking, fewest combinations first and
+    the combinations that keep most start times tried first. A branch is
+    pruned as soon as its start domain is empty, a later group can no
+    longer be filled or its earliest start cannot beat the options found.
+
+    Args:
+        availability: The interviewer and room calendars
+        panel: Dictionary with:
+            - interviewers: Interviewers who must all attend
+            - choose: Optional groups, each {"count": n, "from": [names]},
+              of which n interviewers must attend
+            - rooms: Rooms of which one is needed; none for a call
+            - location: Location of a panel without rooms, e.g. "Zoom"
+            - duration_minutes: Length of the interview
+            - step_minutes: Grid of the start times
+        start: Start of the search window
+        end: End of the search window
+        max_options: Number of options to return
+        time_budget: Seconds after which the search stops
+
+    Returns:
+        Dictionary with the options, earliest first (each a slot with date,
+        time, interviewer, panel, location and duration_minutes, plus ISO
+        start and end), whether the search was complete and search stats
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    stats = {"nodes": 0, "pruned": 0}
+
+    try:
+        required, groups, rooms = _parse_panel(panel)
+    except (TypeError, ValueError, AttributeError) as e:
+        return {"error": f"Invalid interview panel: {str(e)}"}
+    if not required and not groups:
+        return {"error": "Interview panel has no interviewers"}
+
+    duration = int(panel.get("duration_minutes") or availability.duration_minutes)
+    needed = -(-duration // BUCKET_MINUTES)
+    step = max(int(panel.get("step_minutes") or PANEL_STEP_MINUTES) // BUCKET_MINUTES, 1)
+    first = -(-to_epoch(start) // BUCKET_SECONDS)
+    count = to_epoch(end) // BUCKET_SECONDS - first
+
+    def result(options: List[Tuple[int, int, Tuple[str, ...], Optional[str]]], complete: bool) -> Dict[str, Any]:
+        stats["seconds"] = round(time.perf_counter() - started, 4)
+        return {
+            "options": [_option(first + bucket, members, room, panel, duration)
+                        for bucket, _, members, room in sorted(options)],
+            "complete": complete,
+            "stats": stats
+        }
+
+    if count < needed:
+        return result([], True)
+
+    # One vector of feasible start buckets per calendar
+    people = required + sorted({name for _, members in groups for name in members})
+    resources: List[Resource] = [("interviewer", name) for name in people] + [("room", room) for room in rooms]
+    fits = _window_starts(availability.free_matrix(resources, first, count), needed)
+    fits &= ((first + np.arange(fits.shape[1])) % step == 0)
+    person = {name: fits[index] for index, name in enumerate(people)}
+    room_fits = fits[len(people):]
+
+    # Propagation before the search
+    domain = np.ones(fits.shape[1], dtype=bool)
+    for name in required:
+        domain &= person[name]
+    if rooms:
+        domain &= room_fits.any(axis=0)
+    for count_needed, members in groups:
+        domain &= np.sum([person[name] for name in members], axis=0) >= count_needed
+    if not domain.any():
+        return result([], True)
+
+    # Fewest combinations first
+    order = sorted(groups, key=lambda group: len(list(itertools.combinations(group[1], group[0]))))
+    # Best options so far as a max-heap on (start, rank), one per start time
+    best: List[Tuple[int, int, Tuple[str, ...], Optional[str]]] = []
+    taken = set()
+    rank = itertools.count()
+
+    def bound() -> int:
+        return -best[0][0] if len(best) >= max_options else fits.shape[1]
+
+    def search(level: int, domain: np.ndarray, members: Tuple[str, ...]) -> bool:
+        stats["nodes"] += 1
+        if time.perf_counter() > deadline:
+            return False
+        if level == len(order):
+            for bucket in np.flatnonzero(domain):
+                if bucket >= bound():
+                    break
+                if bucket in taken:
+                    continue
+                free_rooms = np.flatnonzero(room_fits[:, bucket]) if rooms else [None]
+                if not len(free_rooms):
+                    continue
+                room = rooms[free_rooms[0]] if rooms else None
+                taken.add(bucket)
+                heapq.heappush(best, (-bucket, -next(rank), members, room))
+                if len(best) > max_options:
+                    taken.discard(-heapq.heappop(best)[0])
+            return True
+
+        count_needed, group = order[level]
+        choices = []
+        for chosen in itertools.combinations([name for name in group if name not in members], count_needed):
+            narrowed = domain.copy()
+            for name in chosen:
+                narrowed &= person[name]
+            choices.append((int(narrowed.sum()), chosen, narrowed))
+        # The combinations keeping most start times first
+        choices.sort(key=lambda choice: -choice[0])
+
+        for kept, chosen, narrowed in choices:
+            picked = members + chosen
+            if not kept or np.argmax(narrowed) >= bound():
+                stats["pruned"] += 1
+                continue
+            # Forward check: every later group must still be fillable
+            for later_count, later in order[level + 1:]:
+                available = [person[name] for name in later if name not in picked]
+                if len(available) < later_count:
+                    narrowed = np.zeros_like(narrowed)
+                    break
+                narrowed = narrowed & (np.sum(available, axis=0) >= later_count)
+            if not narrowed.any():
+                stats["pruned"] += 1
+                continue
+            if not search(level + 1, narrowed, picked):
+                return False
+        return True
+
+    complete = search(0, domain, tuple(required))
+    return result([(-bucket, -order_rank, members, room) for bucket, order_rank, members, room in best], complete)
+
+
+def _option(bucket: int, members: Tuple[str, ...], room: Optional[str],
+            panel: Dict[str, Any], duration: int) -> Dict[str, Any]:
+    starts_at = bucket * BUCKET_SECONDS
+    moment = format_iso(starts_at)
+    return {
+        "date": moment[:10],
+        "time": moment[11:16],
+        "interviewer": members[0],
+        "panel": list(members),
+        "location": room or panel.get("location") or "Video call",
+        "duration_minutes": duration,
+        "start": moment,
+        "end": format_iso(starts_at + 60 * duration)
+    }
@@ -0,0 +1,130 @@
+from typing import Dict, List, Any, Optional
+from collections import Counter
+import os
+
+from .nlp import extract_skills
+
+# Share of a posting's required skills a resume must mention to pass the gate.
+# This is a heuristic on the raw text. It is not derived from the matcher's
+# TF-IDF cosine score, which also weighs experience keywords and the job
+# description, so a resume under it may still have reached MATCH_THRESHOLD;
+# failing resumes are therefore queued, not rejected, unless configured.
+PRESCREEN_MIN_SKILL_COVERAGE = float(os.getenv("PRESCREEN_MIN_SKILL_COVERAGE", "0.2"))
+
+# Why the gate is disabled, once skill extraction has failed to load
+_disabled_reason: Optional[str] = None
+
+
+def _job_key(job: Dict[str, Any], index: int) -> str:
+    return str(job.get("job_id") or job.get("id") or job.get("title") or f"job-{index}")
+
+
+def _normalise(skills: Any) -> List[str]:
+    if not isinstance(skills, list):
+        return []
+    return list(dict.fromkeys(skill.strip().lower() for skill in skills if isinstance(skill, str) and skill.strip()))
+
+
+class JobSkillIndex:
+    """Inverted index from skills to the open postings that ask for them
+
+    Used to pre-screen raw resume text before the LLM parse. The skills a
+    resume mentions are found with the skill extractor, restricted to the
+    postings' own skill vocabulary, and each posting's required-skill
+    coverage is counted through the index, so only postings that share a
+    skill with the resume are touched. The coverage is a cheap heuristic
+    for ordering work, not a prediction of the final match score.
+    """
+
+    def __init__(self, job_listings: List[Dict[str, Any]],
+                 min_coverage: float = PRESCREEN_MIN_SKILL_COVERAGE):
+        """Build the index
+
+        Args:
+            job_listings: The open postings, with required_skills and
+                optional preferred_skills
+            min_coverage: Required-skill coverage needed to pass the gate
+        """
+        self.min_coverage = min_coverage
+        self.job_keys: List[str] = []
+        self.required_counts: List[int] = []
+        self.required: Dict[str, List[int]] = {}
+        self.preferred: Dict[str, List[int]] = {}
+        # Postings without required skills cannot rule anyone out
+        self.open_jobs: List[int] = []
+
+        vocabulary = set()
+        for index, job in enumerate(job_listings):
+            required = _normalise(job.get("required_skills"))
+            preferred = _normalise(job.get("preferred_skills"))
+            self.job_keys.append(_job_key(job, index))
+            self.required_counts.append(len(required))
+            if not required:
+                self.open_jobs.append(index)
+            for skill in required:
+                self.required.setdefault(skill, []).append(index)
+            for skill in preferred:
+                self.preferred.setdefault(skill, []).append(index)
+            vocabulary.update(required)
+            vocabulary.update(preferred)
+        # Sorted so the cached skill matcher is reused for the same postings
+        self.vocabulary = tuple(sorted(vocabulary))
+
+    def screen(self, resume_text: str) -> Dict[str, Any]:
+        """Pre-screen raw resume text against the open postings
+
+        Skills are matched with the tokenizer only; the NER pipeline is left
+        to the parse stage. If the skill extractor cannot run (e.g. the spaCy
+        model is not installed), the gate is disabled for the rest of the
+        process, with one warning, and every resume passes with
+        "gate_disabled": true so no application is lost.
+
+        Args:
+            resume_text: The raw resume text
+
+        Returns:
+            The screening result; see screen_skills
+        """
+        global _disabled_reason
+        if not self.vocabulary or self.open_jobs:
+            return self.screen_skills([])
+        if _disabled_reason is None:
+            try:
+                return self.screen_skills(extract_skills(resume_text, self.vocabulary))
+            except (ImportError, OSError) as e:
+                _disabled_reason = f"skill extraction is unavailable: {str(e)}"
+                print(f"Warning: Pre-screen gate disabled, every resume passes: {_disabled_reason}")
+        return {"passed": True, "skills": [], "coverage": None, "best_job": None,
+                "eligible_jobs": [], "skipped": True, "gate_disabled": True, "reason": _disabled_reason}
+
+    def screen_skills(self, skills: List[str]) -> Dict[str, Any]:
+        """Pre-screen a list of skills against the open postings
+
+        Args:
+            skills: The skills found in the resume
+
+        Returns:
+            Dictionary with passed, the skills found, the best required-skill
+            coverage and its posting, and the postings that reach the
+            minimum coverage, best first; gate_disabled is False
+        """
+        skills = _normalise(skills)
+        required_hits = Counter(index for skill in skills for index in self.required.get(skill, ()))
+        preferred_hits = Counter(index for skill in skills for index in self.preferred.get(skill, ()))
+
+        coverage = {index: hits / self.required_counts[index] for index, hits in required_hits.items()}
+        coverage.update({index: 1.0 for index in self.open_jobs})
+        # Preferred skills only break ties between postings
+        ranked = sorted(coverage, key=lambda index: (coverage[index], preferred_hits[index]), reverse=True)
+        eligible = [index for index in ranked if coverage[index] >= self.min_coverage]
+
+        best: Optional[int] = ranked[0] if ranked else None
+        return {
+            "passed": bool(eligible) or not self.vocabulary,
+            "skills": skills,
+            "coverage": round(coverage[best], 3) if best is not None else 0.0,
+            "best_job": self.job_keys[best] if best is not None else None,
+            "eligible_jobs": [self.job_keys[index] for index in eligible],
+            "skipped": False,
+            "gate_disabled": False
+        }
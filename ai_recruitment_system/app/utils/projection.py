@@ -0,0 +1,113 @@
+from typing import Dict, Any, Union
+import json
+import threading
+
+from .prompts import estimate_tokens
+
+# A projection spec maps field names to None (keep the whole value) or to a
+# nested spec, which is applied to a dict value or to every item of a list
+# value. A tuple of names is shorthand for a spec whose fields are all None.
+ProjectionSpec = Union[Dict[str, Any], tuple]
+
+# Values that carry no information for the model
+EMPTY_VALUES = (None, "", "N/A", [], {})
+
+
+def project(data: Any, spec: ProjectionSpec) -> Any:
+    """Keep only the fields named in a projection spec
+
+    Args:
+        data: A dict, or a list of dicts
+        spec: The projection spec
+
+    Returns:
+        A copy of data with only the projected fields; empty values are dropped
+    """
+    if isinstance(data, list):
+        return [item for item in (project(item, spec) for item in data) if item not in EMPTY_VALUES]
+    if not isinstance(data, dict):
+        return data
+    if isinstance(spec, tuple):
+        spec = dict.fromkeys(spec)
+
+    result = {}
+    for field, field_spec in spec.items():
+        value = data.get(field)
+        if field_spec is not None:
+            value = project(value, field_spec)
+        if value not in EMPTY_VALUES:
+            result[field] = value
+    return result
+
+
+def compact_json(data: Any) -> str:
+    """Minified JSON with sorted keys, so equal data always serialises identically"""
+    return json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ProjectionMetrics:
+    """Per-prompt-field statistics on tokens saved by projection and minification"""
+
+    def __init__(self):
+        self._fields: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, full_text: str, compact_text: str) -> None:
+        """Record one serialised value
+
+        Args:
+            name: Name of the prompt field
+            full_text: The value as pretty-printed, unprojected JSON
+            compact_text: The value as sent
+        """
+        with self._lock:
+            stats = self._fields.setdefault(name, {"calls": 0, "full_tokens": 0, "compact_tokens": 0})
+            stats["calls"] += 1
+            stats["full_tokens"] += estimate_tokens(full_text)
+            stats["compact_tokens"] += estimate_tokens(compact_text)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current metrics for every prompt field
+
+        Returns:
+            Mapping of field name to call count, estimated tokens before and
+            after projection, tokens saved and the fraction saved
+        """
+        with self._lock:
+            result = {}
+            for name, stats in self._fields.items():
+                saved = stats["full_tokens"] - stats["compact_tokens"]
+                result[name] = {
+                    **stats,
+                    "saved_tokens": saved,
+                    "savings": round(saved / stats["full_tokens"], 3) if stats["full_tokens"] else 0.0
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._fields.clear()
+
+
+PROJECTION_METRICS = ProjectionMetrics()
+
+
+def serialize_for_prompt(name: str, data: Any, spec: ProjectionSpec = None) -> str:
+    """Project and minify a value for embedding in a prompt
+
+    Args:
+        name: Name of the prompt field, used in the metrics
+        data: The value to serialise
+        spec: Optional projection spec; without one the value is only minified
+
+    Returns:
+        The compact JSON text
+    """
+    compact_text = compact_json(project(data, spec) if spec is not None else data)
+    PROJECTION_METRICS.record(name, json.dumps(data, indent=2, default=str), compact_text)
+    return compact_text
+
+
+def get_projection_metrics() -> Dict[str, Dict[str, Any]]:
+    """Return the token savings of every projected prompt field"""
+    return PROJECTION_METRICS.snapshot()
@@ -0,0 +1,117 @@
+from typing import Dict, Any
+import hashlib
+import os
+import threading
+
+# Providers only cache prompt prefixes of at least this many tokens
+MIN_CACHEABLE_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+
+# Rough characters-per-token ratio for English prompts and JSON
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text without loading a tokenizer"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class PromptCacheMetrics:
+    """Per-template statistics on how much of each prompt is a cacheable prefix"""
+
+    def __init__(self):
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, prefix: str, prompt: str) -> None:
+        """Record one rendered prompt
+
+        Args:
+            name: Template name
+            prefix: The static prefix of the prompt
+            prompt: The full rendered prompt
+        """
+        prefix_tokens = estimate_tokens(prefix)
+        prompt_tokens = estimate_tokens(prompt)
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            stats = self._templates.setdefault(name, {
+                "calls": 0,
+                "prefix_chars": len(prefix),
+                "prefix_tokens": prefix_tokens,
+                "prompt_tokens_total": 0,
+                "prefix_digests": set()
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens_total"] += prompt_tokens
+            stats["prefix_digests"].add(digest)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current metrics for every template
+
+        Returns:
+            Mapping of template name to its statistics, including the share of
+            prompt tokens covered by the prefix and whether the prefix is long
+            enough for provider-side caching
+        """
+        with self._lock:
+            result = {}
+            for name, stats in self._templates.items():
+                calls = stats["calls"]
+                average_tokens = stats["prompt_tokens_total"] / calls if calls else 0
+                result[name] = {
+                    "calls": calls,
+                    "prefix_chars": stats["prefix_chars"],
+                    "prefix_tokens": stats["prefix_tokens"],
+                    "average_prompt_tokens": round(average_tokens, 1),
+                    "prefix_share": round(stats["prefix_tokens"] / average_tokens, 3) if average_tokens else 0.0,
+                    "cacheable": stats["prefix_tokens"] >= MIN_CACHEABLE_TOKENS,
+                    # More than one digest means the prefix is not byte-identical
+                    "prefix_stable": len(stats["prefix_digests"]) == 1
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+PROMPT_METRICS = PromptCacheMetrics()
+
+
+class PromptTemplate:
+    """A prompt split into a static prefix and a per-request suffix
+
+    The prefix holds every instruction and schema and is emitted byte for byte
+    on every call, so provider-side prefix caching can reuse it. Per-request
+    data is only ever substituted into the suffix.
+    """
+
+    def __init__(self, name: str, prefix: str, suffix: str):
+        """Initialize the prompt template
+
+        Args:
+            name: Template name used in the metrics
+            prefix: Static instructions and schemas, used verbatim
+            suffix: str.format template for the per-request variables
+        """
+        self.name = name
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def render(self, **variables: Any) -> str:
+        """Build the prompt for one request
+
+        Args:
+            **variables: Values for the suffix placeholders
+
+        Returns:
+            The static prefix followed by the rendered suffix
+        """
+        prompt = self.prefix + self.suffix.format(**variables)
+        PROMPT_METRICS.record(self.name, self.prefix, prompt)
+        return prompt
+
+
+def get_prompt_metrics() -> Dict[str, Dict[str, Any]]:
+    """Return the cacheable-prefix metrics of every prompt template"""
+    return PROMPT_METRICS.snapshot()
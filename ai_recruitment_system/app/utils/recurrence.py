@@ -0,0 +1,162 @@
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from functools import lru_cache
+import datetime
+import json
+import os
+
+from . import slot_table
+from .slot_table import SlotTable, to_epoch
+
+# Number of days ahead, from today, for which a job's interview slots are listed
+INTERVIEW_SLOT_WINDOW_DAYS = int(os.getenv("INTERVIEW_SLOT_WINDOW_DAYS", "7"))
+
+# Number of (rule, day) expansions kept in memory
+RECURRENCE_CACHE_DAYS = int(os.getenv("RECURRENCE_CACHE_DAYS", "4096"))
+
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_DAY_SETS = {
+    "weekdays": _WEEKDAYS[:5],
+    "weekends": _WEEKDAYS[5:],
+    "daily": _WEEKDAYS
+}
+
+# A compiled rule: interviewer, location, weekday bitmask, start and end
+# minute of the day, slot length, first and last valid day ordinal and the
+# excluded day ordinals
+_Compiled = Tuple[str, Optional[str], int, int, int, int, int, int, frozenset]
+
+
+def _minute_of_day(value: Any, default: str) -> int:
+    hours, minutes = str(value or default).split(":", 1)
+    return int(hours) * 60 + int(minutes)
+
+
+def _ordinal(value: Any, default: int) -> int:
+    if not value:
+        return default
+    return datetime.date.fromisoformat(str(value)).toordinal()
+
+
+def _weekday_mask(days: Any) -> int:
+    if not days:
+        days = "weekdays"
+    if isinstance(days, str):
+        days = _DAY_SETS.get(days.lower(), [days])
+    mask = 0
+    for day in days:
+        mask |= 1 << _WEEKDAYS.index(str(day).lower()[:3])
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def _compile(rule_json: str) -> _Compiled:
+    rule = json.loads(rule_json)
+    return (
+        rule["interviewer"],
+        rule.get("location"),
+        _weekday_mask(rule.get("days")),
+        _minute_of_day(rule.get("start"), "09:00"),
+        _minute_of_day(rule.get("end"), "17:00"),
+        max(int(rule.get("slot_minutes") or 60), 1),
+        _ordinal(rule.get("valid_from"), 1),
+        _ordinal(rule.get("valid_until"), datetime.date.max.toordinal()),
+        frozenset(_ordinal(day, 0) for day in rule.get("except_dates") or [])
+    )
+
+
+def compile_rule(rule: Dict[str, Any]) -> _Compiled:
+    """Parse an availability rule once; rules with the same content share the result
+
+    Args:
+        rule: Dictionary with:
+            - interviewer: Interviewer name and title
+            - location: Optional interview location
+            - days: Weekday names ("mon".."sun") or "weekdays", "weekends",
+              "daily"; defaults to weekdays
+            - start, end: Daily hours as "HH:MM"; default 09:00 to 17:00
+            - slot_minutes: Length of each slot; defaults to 60
+            - valid_from, valid_until: Optional first and last date (YYYY-MM-DD)
+            - except_dates: Optional dates without slots, e.g. holidays
+
+    Returns:
+        The compiled rule
+
+    Raises:
+        KeyError, ValueError: If the rule is malformed
+    """
+    return _compile(json.dumps(rule, sort_keys=True))
+
+
+@lru_cache(maxsize=RECURRENCE_CACHE_DAYS)
+def _day_times(compiled: _Compiled, ordinal: int) -> Tuple[str, ...]:
+    """Start times of a compiled rule's slots on one day"""
+    _, _, mask, start, end, length, first, last, excluded = compiled
+    if not first <= ordinal <= last or ordinal in excluded:
+        return ()
+    if not mask >> datetime.date.fromordinal(ordinal).weekday() & 1:
+        return ()
+    return tuple(f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(start, end - length + 1, length))
+
+
+def expand_rules(rules: List[Dict[str, Any]], start: datetime.date,
+                 end: datetime.date) -> Iterator[Dict[str, Any]]:
+    """Lazily generate the interview slots of availability rules
+
+    Slots are produced day by day in date and time order, and only for the
+    requested dates. Each rule's slot times per day are cached, so repeated
+    and overlapping windows do not expand a day twice.
+
+    Args:
+        rules: Availability rules, see compile_rule; malformed ones are skipped
+        start: First date of the window
+        end: Last date of the window (inclusive)
+
+    Yields:
+        Slot dictionaries with date, time, interviewer, location and
+        duration_minutes
+    """
+    compiled = []
+    for rule in rules or []:
+        try:
+            compiled.append(compile_rule(rule))
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Warning: Skipping invalid availability rule {rule!r}: {str(e)}")
+
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        day = datetime.date.fromordinal(ordinal).isoformat()
+        daily = [(time, rule) for rule in compiled for time in _day_times(rule, ordinal)]
+        daily.sort(key=lambda item: item[0])
+        for time, rule in daily:
+            slot = {"date": day, "time": time, "interviewer": rule[0], "duration_minutes": rule[5]}
+            if rule[1]:
+                slot["location"] = rule[1]
+            yield slot
+
+
+def job_interview_slots(job: Dict[str, Any], start: Optional[datetime.datetime] = None,
+                        days: int = INTERVIEW_SLOT_WINDOW_DAYS) -> List[Dict[str, Any]]:
+    """The interview slots of a job within a window
+
+    Slots come from the job's interview_availability rules, expanded for the
+    window only, and from any concrete interview_slots the job still lists.
+
+    Args:
+        job: The job listing
+        start: Start of the window; defaults to now, so past slots are left out
+        days: Number of days in the window
+
+    Returns:
+        The slots starting within the window, in time order
+    """
+    start = start or slot_table.now()
+    end = start + datetime.timedelta(days=days)
+
+    slots = [slot for slot in job.get("interview_slots") or [] if isinstance(slot, dict)]
+    slots.extend(expand_rules(job.get("interview_availability"), start.date(), end.date()))
+    return SlotTable(slots).between(to_epoch(start), to_epoch(end))
+
+
+def expansion_cache_info() -> Dict[str, int]:
+    """Hits, misses and size of the per-day expansion cache"""
+    info = _day_times.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
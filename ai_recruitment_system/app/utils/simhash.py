@@ -0,0 +1,195 @@
+from typing import Dict, List, Any, Optional, Tuple
+import copy
+import hashlib
+import os
+import re
+import threading
+
+DEFAULT_MAX_DISTANCE = int(os.getenv("RESUME_DEDUP_DISTANCE", "6"))
+FINGERPRINT_BITS = 64
+
+# Resume headings and the parsed profile fields each one feeds
+SECTION_FIELDS = {
+    "header": ["name", "contact_info"],
+    "summary": ["summary"],
+    "skills": ["skills"],
+    "experience": ["experience"],
+    "education": ["education"],
+    "certifications": ["certifications"]
+}
+_SECTION_ALIASES = {
+    "summary": "summary", "profile": "summary", "objective": "summary",
+    "professional summary": "summary",
+    "skills": "skills", "technical skills": "skills",
+    "experience": "experience", "work experience": "experience",
+    "professional experience": "experience", "employment": "experience",
+    "education": "education",
+    "certifications": "certifications", "certificates": "certifications",
+    "projects": "projects", "extras": "extras", "achievements": "extras"
+}
+_HEADING_PATTERN = re.compile(r"^\s*([A-Za-z ]{3,40}?)\s*:?\s*$")
+_TOKEN_PATTERN = re.compile(r"[a-z0-9+#./]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase a text and reduce it to its word tokens"""
+    return " ".join(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Compute the 64-bit SimHash fingerprint of a text
+
+    Word shingles are hashed and summed bit by bit, so small edits move only
+    a few bits and the Hamming distance tracks how different two texts are.
+
+    Args:
+        text: The text to fingerprint
+        shingle_size: Number of words per shingle
+
+    Returns:
+        The fingerprint as an integer
+    """
+    tokens = normalize_text(text).split()
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        value = _hash64(shingle)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count("1")
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Split resume text on its headings
+
+    Text before the first heading is returned as the "header" section.
+
+    Args:
+        text: The resume text
+
+    Returns:
+        Mapping of section name to section text
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        match = _HEADING_PATTERN.match(line)
+        name = _SECTION_ALIASES.get(match.group(1).strip().lower()) if match else None
+        if name:
+            current = name
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+
+def section_digests(text: str) -> Dict[str, str]:
+    """Digest of the normalised text of each resume section"""
+    return {
+        name: hashlib.blake2b(normalize_text(body).encode("utf-8"), digest_size=8).hexdigest()
+        for name, body in split_sections(text).items()
+    }
+
+
+class ResumeFingerprintIndex:
+    """Index of parsed resumes keyed by SimHash fingerprint
+
+    The 64-bit fingerprint is split into max_distance + 1 bands. Two
+    fingerprints within max_distance bits must agree on at least one band,
+    so a lookup only compares against resumes sharing a band.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        """Initialize the fingerprint index
+
+        Args:
+            max_distance: Largest Hamming distance treated as a near-duplicate
+        """
+        self.max_distance = max_distance
+        self.band_count = max_distance + 1
+        self.band_width = FINGERPRINT_BITS // self.band_count
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(self.band_count)]
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_width) - 1
+        return [(fingerprint >> (band * self.band_width)) & mask for band in range(self.band_count)]
+
+    def add(self, resume_text: str, profile: Dict[str, Any]) -> None:
+        """Store a parsed profile under the fingerprint of its resume
+
+        Args:
+            resume_text: The resume text that was parsed
+            profile: The parsed resume data
+        """
+        fingerprint = simhash(resume_text)
+        entry = {
+            "fingerprint": fingerprint,
+            "sections": section_digests(resume_text),
+            "profile": copy.deepcopy(profile)
+        }
+        with self._lock:
+            entry_id = len(self._entries)
+            self._entries.append(entry)
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                self._bands[band].setdefault(key, []).append(entry_id)
+
+    def lookup(self, resume_text: str) -> Optional[Dict[str, Any]]:
+        """Find the closest previously parsed near-duplicate of a resume
+
+        Args:
+            resume_text: The resume text to look up
+
+        Returns:
+            None if there is no near-duplicate, otherwise a dictionary with
+            the stored "profile" (a copy), the Hamming "distance" and the
+            "changed_sections" whose text differs from the stored resume
+        """
+        fingerprint = simhash(resume_text)
+        best: Optional[Tuple[int, Dict[str, Any]]] = None
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                candidates.update(self._bands[band].get(key, ()))
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                distance = hamming_distance(fingerprint, entry["fingerprint"])
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, entry)
+
+        if best is None:
+            return None
+
+        distance, entry = best
+        sections = section_digests(resume_text)
+        changed = sorted(
+            name for name in set(sections) | set(entry["sections"])
+            if sections.get(name) != entry["sections"].get(name)
+        )
+        return {
+            "profile": copy.deepcopy(entry["profile"]),
+            "distance": distance,
+            "changed_sections": changed
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,158 @@
+from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
+import datetime
+import os
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# Time zone of the dates and times in interview slots and availability rules
+INTERVIEW_TIMEZONE = os.getenv("INTERVIEW_TIMEZONE", "UTC")
+
+# Length of an interview when the slot does not give a duration_minutes
+INTERVIEW_DURATION_MINUTES = int(os.getenv("INTERVIEW_DURATION_MINUTES", "60"))
+
+_UNIX_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+TIMEZONE = ZoneInfo(INTERVIEW_TIMEZONE)
+
+
+def _localize(moment: datetime.datetime) -> datetime.datetime:
+    return moment.replace(tzinfo=TIMEZONE)
+
+
+def now() -> datetime.datetime:
+    """The current time in the interview time zone"""
+    return datetime.datetime.now(TIMEZONE)
+
+
+def to_epoch(moment: datetime.datetime) -> int:
+    """Epoch seconds of a datetime; naive ones are taken in the interview time zone"""
+    if moment.tzinfo is None:
+        moment = _localize(moment)
+    return int(moment.timestamp())
+
+
+@lru_cache(maxsize=4096)
+def _date_epoch(date: str) -> Optional[int]:
+    """Epoch seconds of local midnight of a YYYY-MM-DD date, or None if invalid
+
+    The UTC offset is taken at noon, so a DST change in the small hours does
+    not move daytime slots.
+    """
+    try:
+        day = datetime.date.fromisoformat(date)
+    except (TypeError, ValueError):
+        return None
+    offset = _localize(datetime.datetime(day.year, day.month, day.day, 12)).utcoffset()
+    return (day.toordinal() - _UNIX_EPOCH_ORDINAL) * 86400 - int(offset.total_seconds())
+
+
+@lru_cache(maxsize=1440)
+def _time_seconds(time: str) -> Optional[int]:
+    """Seconds after midnight of an HH:MM time, or None if invalid"""
+    try:
+        hours, minutes = time.split(":")
+        if len(minutes) != 2 or not (0 <= int(hours) < 24 and 0 <= int(minutes) < 60):
+            return None
+        return int(hours) * 3600 + int(minutes) * 60
+    except (AttributeError, ValueError):
+        return None
+
+
+def slot_epoch(slot: Dict[str, Any]) -> Optional[int]:
+    """Start of an interview slot in epoch seconds, or None if its date or time is invalid
+
+    Dates and times are parsed once each and cached, so converting many
+    slots does no per-slot datetime parsing.
+    """
+    day = _date_epoch(slot.get("date")) if isinstance(slot.get("date"), str) else None
+    seconds = _time_seconds(slot.get("time")) if isinstance(slot.get("time"), str) else None
+    if day is None or seconds is None:
+        return None
+    return day + seconds
+
+
+@lru_cache(maxsize=4096)
+def format_epoch(epoch: int) -> Tuple[str, str]:
+    """Display date and time of an epoch, e.g. ("Monday, October 19, 2026", "02:00 PM")"""
+    moment = datetime.datetime.fromtimestamp(epoch, TIMEZONE)
+    return moment.strftime("%A, %B %d, %Y"), moment.strftime("%I:%M %p")
+
+
+@lru_cache(maxsize=4096)
+def format_iso(epoch: int) -> str:
+    """ISO 8601 local time of an epoch, with its UTC offset"""
+    return datetime.datetime.fromtimestamp(epoch, TIMEZONE).isoformat()
+
+
+class SlotTable:
+    """Interview slots normalised to epoch seconds in compact arrays
+
+    Slots are converted once, at ingest: starts and ends are int64 epoch
+    seconds and valid marks the slots with a usable date and time. Sorting
+    and range queries run on the arrays, and display strings come from a
+    cached formatter.
+    """
+
+    def __init__(self, slots: List[Dict[str, Any]],
+                 duration_minutes: int = INTERVIEW_DURATION_MINUTES):
+        """Build the table
+
+        Args:
+            slots: Interview slots with date, time and optional duration_minutes
+            duration_minutes: Length of a slot without duration_minutes
+        """
+        self.slots = slots
+        epochs = [slot_epoch(slot) for slot in slots]
+        self.valid = np.array([epoch is not None for epoch in epochs], dtype=bool)
+        self.starts = np.array([epoch or 0 for epoch in epochs], dtype=np.int64)
+        self.durations = np.array([int(slot.get("duration_minutes") or duration_minutes) for slot in slots],
+                                  dtype=np.int64)
+        self.ends = self.starts + 60 * self.durations
+        self._order: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    @property
+    def order(self) -> np.ndarray:
+        """Indexes of the valid slots by start time"""
+        if self._order is None:
+            valid = np.flatnonzero(self.valid)
+            self._order = valid[np.argsort(self.starts[valid], kind="stable")]
+        return self._order
+
+    def sorted(self) -> List[Dict[str, Any]]:
+        """The valid slots by start time"""
+        return [self.slots[index] for index in self.order]
+
+    def between(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """The valid slots starting in [start, end), by start time
+
+        Args:
+            start: Start of the range in epoch seconds
+            end: End of the range in epoch seconds
+        """
+        starts = self.starts[self.order]
+        lo, hi = np.searchsorted(starts, [start, end], side="left")
+        return [self.slots[index] for index in self.order[lo:hi]]
+
+    def buckets(self, bucket_seconds: int) -> Tuple[np.ndarray, np.ndarray]:
+        """First bucket and number of buckets each slot covers
+
+        Args:
+            bucket_seconds: Length of a bucket
+
+        Returns:
+            Two int64 arrays; invalid slots cover no buckets
+        """
+        first = self.starts // bucket_seconds
+        count = -(-self.ends // bucket_seconds) - first
+        return first, np.where(self.valid, count, 0)
+
+    def formatted(self, index: int) -> Tuple[str, str]:
+        """Display date and time of a slot, or its raw strings if it is invalid"""
+        if not self.valid[index]:
+            return self.slots[index].get("date", ""), self.slots[index].get("time", "")
+        return format_epoch(int(self.starts[index]))
@@ -0,0 +1,344 @@
+from typing import Dict, List, Any, Optional, Callable
+import copy
+import os
+import threading
+
+from .json_repair import extract_json, coerce_to_schema
+
+# Ask the model for JSON constrained by a JSON Schema (response_format) where
+# the deployment supports it; responses are validated locally either way
+STRUCTURED_LLM_OUTPUT = os.getenv("STRUCTURED_LLM_OUTPUT", "true").lower() == "true"
+
+# Validation errors kept per output for the metrics
+MAX_ERROR_SAMPLES = 5
+
+_TYPE_CHECKS = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None
+}
+
+Validator = Callable[[Any, str, List[str]], None]
+
+
+def template_schema(template: Any) -> Dict[str, Any]:
+    """Build a JSON Schema from a schema template as used by coerce_to_schema
+
+    Every key of a dict template is required. An empty dict or list template
+    accepts any object or array.
+
+    Args:
+        template: The schema template
+
+    Returns:
+        The JSON Schema
+    """
+    if isinstance(template, dict):
+        if not template:
+            return {"type": "object"}
+        return {
+            "type": "object",
+            "properties": {key: template_schema(value) for key, value in template.items()},
+            "required": list(template)
+        }
+    if isinstance(template, list):
+        return {"type": "array", "items": template_schema(template[0])} if template else {"type": "array"}
+    if isinstance(template, bool):
+        return {"type": "boolean"}
+    if isinstance(template, (int, float)):
+        # Integer defaults still accept fractional scores
+        return {"type": "number"}
+    if isinstance(template, str):
+        return {"type": "string"}
+    return {}
+
+
+def compile_validator(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """Compile a JSON Schema into a validation function
+
+    The schema is walked once; the returned function only runs the checks it
+    compiled to. Supported keywords are type, enum, minimum, maximum,
+    properties, required, additionalProperties and items.
+
+    Args:
+        schema: The JSON Schema
+
+    Returns:
+        A function that returns the validation errors of a value, as
+        "path: problem" strings; an empty list means the value is valid
+    """
+    check = _compile(schema)
+
+    def validate(data: Any) -> List[str]:
+        errors: List[str] = []
+        check(data, "$", errors)
+        return errors
+
+    return validate
+
+
+def _compile(schema: Dict[str, Any]) -> Validator:
+    rules: List[Validator] = []
+
+    type_check = None
+    if "type" in schema:
+        names = [schema["type"]] if isinstance(schema["type"], str) else list(schema["type"])
+        checks = [_TYPE_CHECKS[name] for name in names]
+        expected = " or ".join(names)
+        type_check = lambda value: any(check(value) for check in checks)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {allowed}")
+        rules.append(check_enum)
+
+    minimum, maximum = schema.get("minimum"), schema.get("maximum")
+    if minimum is not None or maximum is not None:
+        def check_range(value, path, errors):
+            if not _TYPE_CHECKS["number"](value):
+                return
+            if minimum is not None and value < minimum:
+                errors.append(f"{path}: {value} is below {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{path}: {value} is above {maximum}")
+        rules.append(check_range)
+
+    if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+        properties = {name: _compile(sub) for name, sub in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+        additional = schema.get("additionalProperties", True)
+        check_additional = _compile(additional) if isinstance(additional, dict) else None
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}.{name}: missing")
+            for name, item in value.items():
+                if name in properties:
+                    properties[name](item, f"{path}.{name}", errors)
+                elif additional is False:
+                    errors.append(f"{path}.{name}: not allowed")
+                elif check_additional is not None:
+                    check_additional(item, f"{path}.{name}", errors)
+        rules.append(check_object)
+
+    if isinstance(schema.get("items"), dict):
+        check_item = _compile(schema["items"])
+
+        def check_items(value, path, errors):
+            if not isinstance(value, list):
+                return
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]", errors)
+        rules.append(check_items)
+
+    def check(value, path, errors):
+        if type_check is not None and not type_check(value):
+            errors.append(f"{path}: expected {expected}, got {type(value).__name__}")
+            return
+        for rule in rules:
+            rule(value, path, errors)
+
+    return check
+
+
+def _compact_schema(schema: Dict[str, Any], keys: Any) -> Dict[str, Any]:
+    """Rename a schema's properties to the short keys of an output contract
+
+    Properties without a short key are left out, and nothing is required
+    because compact formats omit empty fields.
+    """
+    if isinstance(keys, list):
+        items = schema.get("items", {})
+        return {**schema, "items": _compact_schema(items, keys[0])}
+    schema = {name: value for name, value in schema.items() if name != "required"}
+    if not isinstance(keys, dict):
+        return schema
+    properties = schema.get("properties", {})
+    compact = {}
+    for name, key in keys.items():
+        short, nested = key if isinstance(key, tuple) else (key, None)
+        sub = properties.get(name, {})
+        compact[short] = _compact_schema(sub, nested) if nested is not None else _without_required(sub)
+    return {**schema, "type": "object", "properties": compact}
+
+
+def _without_required(schema: Any) -> Any:
+    if isinstance(schema, dict):
+        return {name: _without_required(value) for name, value in schema.items() if name != "required"}
+    return schema
+
+
+class StructuredOutputMetrics:
+    """Per-output statistics on how often LLM responses matched their schema"""
+
+    def __init__(self):
+        self._outputs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, name: str) -> Dict[str, Any]:
+        return self._outputs.setdefault(name, {
+            "responses": 0, "valid": 0, "filled": 0, "repaired": 0, "unparsable": 0, "errors": []
+        })
+
+    def record(self, name: str, errors: Optional[List[str]]) -> None:
+        """Record one response
+
+        Args:
+            name: Name of the structured output
+            errors: The validation errors, or None if the response had no JSON
+        """
+        with self._lock:
+            stats = self._stats(name)
+            stats["responses"] += 1
+            if errors is None:
+                stats["unparsable"] += 1
+            elif not errors:
+                stats["valid"] += 1
+            elif all(error.endswith(": missing") for error in errors):
+                stats["filled"] += 1
+            else:
+                stats["repaired"] += 1
+                for error in errors:
+                    if len(stats["errors"]) >= MAX_ERROR_SAMPLES:
+                        break
+                    if not error.endswith(": missing") and error not in stats["errors"]:
+                        stats["errors"].append(error)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current metrics for every structured output
+
+        Returns:
+            Mapping of output name to the number of responses that were
+            valid, only missing fields (filled with defaults), had to be
+            repaired or held no JSON, the valid share and sample errors
+        """
+        with self._lock:
+            result = {}
+            for name, stats in self._outputs.items():
+                result[name] = {
+                    **stats,
+                    "errors": list(stats["errors"]),
+                    "valid_rate": round(stats["valid"] / stats["responses"], 3) if stats["responses"] else 0.0
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._outputs.clear()
+
+
+STRUCTURED_OUTPUT_METRICS = StructuredOutputMetrics()
+
+
+class StructuredOutput:
+    """The JSON Schema of one kind of LLM response, with its compiled validator
+
+    The schema is derived from the schema template the response was already
+    coerced to, so the defaults stay in one place. It is sent to the model as
+    a response_format, in its short-key form when the compact output format
+    is used, and every response is validated against it locally. Responses
+    that validate are used as they are; only the rest are coerced to the
+    template.
+    """
+
+    def __init__(self, name: str, template: Any, contract=None,
+                 properties: Optional[Dict[str, Any]] = None,
+                 coerce: Optional[Callable[[Any], Any]] = None):
+        """Initialize the structured output
+
+        Args:
+            name: Name of the output, sent to the model as the schema name
+            template: The schema template of the response
+            contract: Optional OutputContract of the compact format
+            properties: JSON Schemas of fields the template cannot express,
+                such as optional objects or objects keyed by free-form names;
+                fields that are not in the template are optional
+            coerce: Optional replacement for coercing invalid responses to
+                the template
+        """
+        self.name = name
+        self.template = template
+        self.contract = contract
+        self.schema = template_schema(template)
+        if properties:
+            self.schema["properties"] = {**self.schema.get("properties", {}), **properties}
+        self._coerce = coerce or (lambda data: coerce_to_schema(data, template))
+        self._validate = compile_validator(self.schema)
+        self._response_formats: Dict[bool, Dict[str, Any]] = {}
+
+    def response_format(self, compact: bool = False) -> Dict[str, Any]:
+        """The response_format that asks the model for this schema
+
+        Args:
+            compact: Whether the prompt asks for the short-key format
+
+        Returns:
+            A json_schema response_format. It is not strict, because strict
+            mode cannot express the free-form and optional fields.
+        """
+        compact = compact and self.contract is not None
+        if compact not in self._response_formats:
+            schema = copy.deepcopy(self.schema)
+            if compact:
+                schema = _compact_schema(schema, self.contract.keys)
+            self._response_formats[compact] = {
+                "type": "json_schema",
+                "json_schema": {"name": self.name, "schema": schema, "strict": False}
+            }
+        return self._response_formats[compact]
+
+    def validate(self, data: Any) -> List[str]:
+        """Validate data against the schema
+
+        Args:
+            data: The parsed response, with public field names
+
+        Returns:
+            The validation errors; empty if the data is valid
+        """
+        return self._validate(data)
+
+    def load(self, response: Any) -> Any:
+        """Parse a response and expand its short keys
+
+        Args:
+            response: The raw model output
+
+        Returns:
+            The parsed data with public field names, or None if the response
+            holds no JSON value
+        """
+        data = extract_json(response)
+        if data is None:
+            STRUCTURED_OUTPUT_METRICS.record(self.name, None)
+            return None
+        return self.contract.expand(data) if self.contract is not None else data
+
+    def conform(self, data: Any) -> Any:
+        """Return data that matches the schema
+
+        Args:
+            data: The parsed response, with public field names
+
+        Returns:
+            The data itself if it is valid, otherwise the data coerced to the
+            template
+        """
+        errors = self._validate(data)
+        STRUCTURED_OUTPUT_METRICS.record(self.name, errors)
+        return self._coerce(data) if errors else data
+
+
+def get_structured_output_metrics() -> Dict[str, Dict[str, Any]]:
+    """Return the schema conformance of every structured LLM output"""
+    return STRUCTURED_OUTPUT_METRICS.snapshot()
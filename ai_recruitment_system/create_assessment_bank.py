@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+This script precomputes the assessment question bank for every job listing.
+At runtime, assessments for these jobs are assembled from the bank instead of
+being generated from scratch for every candidate.
+"""
+
+import asyncio
+import os
+import sys
+import json
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.agents.assessment_bank import AssessmentBankTool
+
+def read_job_listings(file_path):
+    """Read job listings, skipping the '#' header lines written by create_job_listings.py"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = [line for line in f.read().split('\n') if not line.strip().startswith('#')]
+    return json.loads('\n'.join(lines))
+
+async def create_assessment_bank(job_listings_path, offline=False, overwrite=False):
+    """Build bank entries for every job in the listings file"""
+    job_listings = read_job_listings(job_listings_path)
+    print(f"Loaded {len(job_listings)} job listings from {job_listings_path}")
+
+    if offline:
+        # Template questions only, no Azure OpenAI credentials needed
+        bank = AssessmentBankTool()
+        for job_info in job_listings:
+            if job_info.get("job_id") and (overwrite or not bank.has_job(job_info["job_id"])):
+                bank.add_entry(bank.build_template_entry(job_info))
+        bank.save()
+        print(f"Template question bank written to: {bank.bank_path}")
+        return
+
+    from app.orchestrator import RecruitmentOrchestrator
+    orchestrator = RecruitmentOrchestrator()
+    try:
+        summary = await orchestrator.build_assessment_bank(job_listings, overwrite=overwrite)
+    finally:
+        await orchestrator.aclose()
+
+    print(f"Question bank written to: {orchestrator.assessment_bank.bank_path}")
+    print(f"Generated: {len(summary['built'])}, templated: {len(summary['templated'])}, "
+          f"already present: {len(summary['skipped'])}")
+
+if __name__ == "__main__":
+    # Default job listings path is job_listings.txt in the current directory
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_listings.txt")
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    job_listings_path = args[0] if args else default_path
+
+    asyncio.run(create_assessment_bank(
+        job_listings_path,
+        offline="--offline" in sys.argv,
+        overwrite="--overwrite" in sys.argv
+    ))
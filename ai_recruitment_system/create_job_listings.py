@@ -16,6 +16,9 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
     # Create timestamp to ensure unique content
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    # Senior roles are interviewed by a panel
+    ml_availability = generate_interview_availability(3)
+    
     # Sample job listings all from the same company
     job_listings = [
         {
@@ -28,7 +31,8 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["pytorch", "kubernetes", "mlops", "computer vision"],
             "experience_level": "5+ years",
             "description": "Lead the development of cutting-edge AI solutions for our enterprise clients. You'll design and implement machine learning models and collaborate with cross-functional teams.",
-            "interview_slots": generate_interview_slots(5)
+            "interview_availability": ml_availability,
+            "interview_panel": generate_interview_panel(ml_availability)
         },
         {
             "job_id": "JOB-FS-002",
@@ -40,7 +44,7 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["typescript", "redis", "aws", "graphql"],
             "experience_level": "3+ years",
             "description": "Join our web development team to build modern applications. You'll work on both frontend with React and backend with Node.js and Express.",
-            "interview_slots": generate_interview_slots(4)
+            "interview_availability": generate_interview_availability()
         },
         {
             "job_id": "JOB-DEV-003",
@@ -52,7 +56,7 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["terraform", "ansible", "prometheus", "grafana"],
             "experience_level": "4+ years",
             "description": "Automate and optimize our cloud infrastructure. You'll implement CI/CD pipelines and maintain our container orchestration platform.",
-            "interview_slots": generate_interview_slots(3)
+            "interview_availability": generate_interview_availability()
         },
         {
             "job_id": "JOB-DS-004",
@@ -64,7 +68,7 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["r", "tableau", "spark", "hadoop", "big data"],
             "experience_level": "3+ years",
             "description": "Analyze complex datasets and build predictive models to drive business decisions. You'll work with stakeholders to identify opportunities for data-driven solutions.",
-            "interview_slots": generate_interview_slots(4)
+            "interview_availability": generate_interview_availability()
         },
         {
             "job_id": "JOB-FE-005",
@@ -76,7 +80,7 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["redux", "sass", "webpack", "jest", "accessibility"],
             "experience_level": "2+ years",
             "description": "Create beautiful and responsive user interfaces for our web applications. You'll collaborate with designers to implement pixel-perfect UIs.",
-            "interview_slots": generate_interview_slots(3)
+            "interview_availability": generate_interview_availability()
         },
         {
             "job_id": "JOB-BE-006",
@@ -88,7 +92,7 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["kafka", "elasticsearch", "docker", "aws", "nosql"],
             "experience_level": "4+ years",
             "description": "Design and implement scalable backend services and APIs for our enterprise products. You'll build robust and maintainable systems.",
-            "interview_slots": generate_interview_slots(3)
+            "interview_availability": generate_interview_availability()
         },
         {
             "job_id": "JOB-MOB-007",
@@ -100,7 +104,7 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["redux", "native modules", "app store deployment", "firebase"],
             "experience_level": "3+ years",
             "description": "Develop cross-platform mobile applications using React Native. You'll build features that work flawlessly on both iOS and Android.",
-            "interview_slots": generate_interview_slots(3)
+            "interview_availability": generate_interview_availability()
         },
         {
             "job_id": "JOB-DBA-008",
@@ -112,7 +116,7 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
             "preferred_skills": ["mysql", "oracle", "data modeling", "high availability", "cloud databases"],
             "experience_level": "5+ years",
             "description": "Manage and optimize our database systems to ensure high performance and reliability. You'll be responsible for database security, backup, and recovery procedures.",
-            "interview_slots": generate_interview_slots(2)
+            "interview_availability": generate_interview_availability()
         }
     ]
     
@@ -129,42 +133,49 @@ def create_job_listings(output_path, company_name="TechNova Innovations"):
     print(f"Timestamp included: {timestamp}")
     return output_path, job_listings
 
-def generate_interview_slots(num_slots=3):
-    """Generate random interview slots for the coming week"""
-    slots = []
-    today = datetime.datetime.now()
+def generate_interview_availability(num_interviewers=2):
+    """Generate weekly availability rules for random interviewers
+    
+    Concrete interview slots are expanded from these rules when they are
+    queried, so the listings never go stale.
+    """
+    interviewers = random.sample([
+        "Sarah Johnson, Senior Recruiter",
+        "Michael Chen, Technical Lead",
+        "Emily Rodriguez, VP of Engineering",
+        "David Kim, Department Manager",
+        "Lisa Patel, CTO"
+    ], num_interviewers)
     
-    # Generate slots for the next 7 days
-    for i in range(1, 8):
-        # Skip weekends
-        day = today + datetime.timedelta(days=i)
-        if day.weekday() >= 5:  # Saturday or Sunday
-            continue
-            
-        # Generate random times (9 AM to 4 PM)
-        for _ in range(min(num_slots, 3)):  # Max 3 slots per day
-            hour = random.randint(9, 16)
-            slot = {
-                "date": day.strftime("%Y-%m-%d"),
-                "time": f"{hour:02d}:00",
-                "interviewer": random.choice([
-                    "Sarah Johnson, Senior Recruiter",
-                    "Michael Chen, Technical Lead",
-                    "Emily Rodriguez, VP of Engineering",
-                    "David Kim, Department Manager",
-                    "Lisa Patel, CTO"
-                ]),
-                "location": random.choice([
-                    "Virtual (Zoom)",
-                    "HQ Conference Room A",
-                    "HQ Conference Room B",
-                    "Branch Office Conference Room",
-                    "Video Call (Microsoft Teams)"
-                ])
-            }
-            slots.append(slot)
+    return [
+        {
+            "interviewer": interviewer,
+            "location": random.choice([
+                "Virtual (Zoom)",
+                "HQ Conference Room A",
+                "HQ Conference Room B",
+                "Branch Office Conference Room",
+                "Video Call (Microsoft Teams)"
+            ]),
+            "days": "weekdays",
+            # Interviews between 9 AM and 5 PM
+            "start": "09:00",
+            "end": "17:00",
+            "slot_minutes": 60
+        }
+        for interviewer in interviewers
+    ]
+
+def generate_interview_panel(availability):
+    """Generate a panel of the first interviewer and one of the others"""
+    interviewers = [rule["interviewer"] for rule in availability]
     
-    return slots
+    return {
+        "interviewers": interviewers[:1],
+        "choose": [{"count": 1, "from": interviewers[1:]}],
+        "rooms": ["HQ Conference Room A", "HQ Conference Room B"],
+        "duration_minutes": 90
+    }
 
 if __name__ == "__main__":
     # Default output path is job_listings.txt in the current directory
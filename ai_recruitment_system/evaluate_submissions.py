@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+This script evaluates a batch of assessment submissions, for example after a
+hiring event. Results are appended to a checkpoint file as they complete;
+running the script again with the same checkpoint skips finished submissions.
+
+Submissions are read from a JSONL file, one object per line with
+assessment_id and submission (and optionally submission_id, candidate_id and
+evaluator_notes). Assessments are read from a JSON file holding either a list
+of assessments or an object keyed by assessment_id.
+"""
+
+import asyncio
+import os
+import sys
+import json
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.orchestrator import RecruitmentOrchestrator
+from app.batch_evaluation import evaluate_submissions, BATCH_EVALUATION_CHUNK_SIZE, BATCH_EVALUATION_CONCURRENCY
+
+def read_submissions(file_path):
+    """Read one submission per line, skipping blank lines"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def read_assessments(file_path):
+    """Read assessments keyed by assessment_id"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        assessments = json.load(f)
+    if isinstance(assessments, list):
+        assessments = {assessment["assessment_id"]: assessment for assessment in assessments}
+    return assessments
+
+def option(name, default):
+    """Value of a --name=value option"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+async def main(submissions_path, assessments_path, checkpoint_path):
+    submissions = read_submissions(submissions_path)
+    assessments = read_assessments(assessments_path)
+    print(f"Loaded {len(submissions)} submissions for {len(assessments)} assessments")
+
+    orchestrator = RecruitmentOrchestrator()
+    try:
+        summary = await evaluate_submissions(
+            orchestrator,
+            submissions,
+            assessments,
+            checkpoint_path,
+            chunk_size=int(option("chunk-size", BATCH_EVALUATION_CHUNK_SIZE)),
+            max_concurrency=int(option("concurrency", BATCH_EVALUATION_CONCURRENCY))
+        )
+    finally:
+        await orchestrator.aclose()
+
+    passed = sum(1 for record in summary["evaluations"].values() if record["evaluation"].get("status") == "passed")
+    print(f"Evaluations in {checkpoint_path}: {len(summary['evaluations'])} ({passed} passed)")
+    print(f"Resumed from checkpoint: {len(summary['resumed'])}")
+    for failure in summary["failed"]:
+        print(f"Failed: {failure['submission_id']}: {failure['error']}")
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(args) < 2:
+        print("Usage: python evaluate_submissions.py <submissions.jsonl> <assessments.json> "
+              "[--checkpoint=evaluations.jsonl] [--chunk-size=5] [--concurrency=4]")
+        sys.exit(1)
+
+    asyncio.run(main(args[0], args[1], option("checkpoint", "evaluations.jsonl")))
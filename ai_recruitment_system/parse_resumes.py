@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+This script parses many resume files at once, for example when importing a
+backlog of applications. Several resumes are packed into each LLM request
+under a token budget; resumes missing from a packed reply are parsed one at
+a time. The parsed profiles are written to a JSON file keyed by file path.
+"""
+
+import asyncio
+import os
+import sys
+import json
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.orchestrator import RecruitmentOrchestrator
+from app.agents.resume_parser import RESUME_PACK_TOKEN_BUDGET, RESUME_PACK_MAX_RESUMES, RESUME_PACK_OUTPUT_BUDGET
+
+def option(name, default):
+    """Value of a --name=value option"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+async def main(file_paths, output_path):
+    orchestrator = RecruitmentOrchestrator()
+    try:
+        resume_texts = {}
+        failed = {}
+        for file_path in file_paths:
+            extraction = await orchestrator.read_resume_file(file_path)
+            if "error" in extraction:
+                failed[file_path] = extraction["error"]
+            else:
+                resume_texts[file_path] = extraction["text"]
+        print(f"Read {len(resume_texts)} of {len(file_paths)} resume files")
+
+        profiles = await orchestrator.process_resumes(
+            resume_texts,
+            token_budget=int(option("token-budget", RESUME_PACK_TOKEN_BUDGET)),
+            max_resumes=int(option("max-resumes", RESUME_PACK_MAX_RESUMES)),
+            output_budget=int(option("output-budget", RESUME_PACK_OUTPUT_BUDGET))
+        )
+    finally:
+        await orchestrator.aclose()
+
+    for file_path, profile in profiles.items():
+        if "error" in profile:
+            failed[file_path] = profile["error"]
+    parsed = {file_path: profile for file_path, profile in profiles.items() if file_path not in failed}
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(parsed, f, indent=2)
+    print(f"Parsed profiles written to {output_path}: {len(parsed)}")
+    for file_path, error in failed.items():
+        print(f"Failed: {file_path}: {error}")
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not args:
+        print("Usage: python parse_resumes.py <resume files...> "
+              "[--output=profiles.json] [--token-budget=4000] [--max-resumes=6] [--output-budget=3000]")
+        sys.exit(1)
+
+    asyncio.run(main(args, option("output", "profiles.json")))
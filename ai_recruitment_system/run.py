@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the new orchestrator
 from app.orchestrator import RecruitmentOrchestrator
+from app.utils.recurrence import job_interview_slots
 
 # Update the parse_resume function to better handle resume parsing results
 async def parse_resume(file_path, orchestrator):
@@ -25,64 +26,37 @@ async def parse_resume(file_path, orchestrator):
     
     # Read the file content
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            file_size = os.path.getsize(file_path)
-            
-            print(f"Successfully read file ({file_size} bytes)")
-            preview = content[:150] + "..." if len(content) > 150 else content
-            print(f"Content preview: {preview}\n")
-            
-            # Parse the resume using the orchestrator
-            parsed_data = await orchestrator.process_resume(content)
-            
-            # Check if we got valid data
-            if not parsed_data or not isinstance(parsed_data, dict):
-                print("\nError: Failed to parse resume properly")
-                return None
-                
-            # If we have a raw_response, it might be worth checking
-            if "raw_response" in parsed_data:
-                print("\nNote: Got raw response from parser, attempting to extract structured data")
-                # You could add additional parsing here if needed
-            
-            print("\n=== EXTRACTED INFORMATION ===")
-            name = parsed_data.get('name', 'Not found')
-            print(f"Name: {name}")
-            
-            # Handle contact information properly
-            contact_info = parsed_data.get('contact_info', {})
-            if not isinstance(contact_info, dict):
-                contact_info = {}
-                
-            email = contact_info.get('email', 'Not found')
-            phone = contact_info.get('phone', 'Not found')
-            print(f"Email: {email}")
-            print(f"Phone: {phone}")
-            
-            # Handle skills properly
-            skills = parsed_data.get('skills', [])
-            if not isinstance(skills, list):
-                skills = []
-            skills_str = ', '.join(skills) if skills else 'Not found'
-            print(f"Skills: {skills_str}")
-            
-            # Handle education properly
-            education = parsed_data.get('education', [])
-            if not isinstance(education, list):
-                education = [str(education)] if education else ['Not found']
-            
-            # Handle experience properly
-            experience = parsed_data.get('experience', [])
-            if not isinstance(experience, list):
-                experience = [str(experience)] if experience else ['Not found']
-            
-            # Print education and experience count
-            print(f"Education: {len(education)} entries")
-            print(f"Experience: {len(experience)} entries")
-            
-            return parsed_data
-            
+        # PDF and DOCX text is extracted in a worker process
+        extraction = await orchestrator.read_resume_file(file_path)
+        if "error" in extraction:
+            print(f"Error reading resume: {extraction['error']}")
+            return None
+        content = extraction["text"]
+        file_size = os.path.getsize(file_path)
+        
+        print(f"Successfully read file ({file_size} bytes, {extraction.get('pages', 1)} page(s))")
+        preview = content[:150] + "..." if len(content) > 150 else content
+        print(f"Content preview: {preview}\n")
+        
+        # Parse the resume using the orchestrator
+        parsed_data = await orchestrator.process_resume(content)
+        
+        # Parsed resumes are validated against the resume schema, so every
+        # field is present with the right type
+        if "error" in parsed_data:
+            print(f"\nError: Failed to parse resume properly: {parsed_data['error']}")
+            return None
+        
+        print("\n=== EXTRACTED INFORMATION ===")
+        print(f"Name: {parsed_data['name']}")
+        print(f"Email: {parsed_data['contact_info']['email']}")
+        print(f"Phone: {parsed_data['contact_info']['phone']}")
+        print(f"Skills: {', '.join(parsed_data['skills']) or 'Not found'}")
+        print(f"Education: {len(parsed_data['education'])} entries")
+        print(f"Experience: {len(parsed_data['experience'])} entries")
+        
+        return parsed_data
+        
     except Exception as e:
         print(f"Error parsing resume: {str(e)}")
         print("Stack trace:")
@@ -171,8 +145,9 @@ async def generate_candidate_assessment(candidate_profile, job_info, orchestrato
         raise ValueError("Job information is empty or invalid")
     
     try:
-        # Call the orchestrator to generate assessment
-        assessment = await orchestrator.generate_assessment(candidate_profile, job_info)
+        # Call the orchestrator to generate assessment, answering locally if
+        # the LLM misses the interactive latency budget
+        assessment = await orchestrator.generate_assessment_hedged(candidate_profile, job_info)
         
         return assessment
         
@@ -275,8 +250,9 @@ def print_job_matches(matches):
         print(f"   Preferred Skills: {', '.join(match.get('preferred_skills', []))}")
         
         # Display if the job has interview slots
-        if 'interview_slots' in match and match['interview_slots']:
-            print(f"   Available Interview Slots: {len(match['interview_slots'])}")
+        interview_slots = job_interview_slots(match)
+        if interview_slots:
+            print(f"   Available Interview Slots: {len(interview_slots)}")
           
 def print_header(title: str) -> None:
     """Print a formatted section header"""
@@ -285,26 +261,9 @@ def print_header(title: str) -> None:
 def print_assessment(assessment):
     """Display assessment details in a well-formatted structure"""
     try:
-        # Convert to dictionary if assessment is a string
-        if isinstance(assessment, str):
-            import json
-            try:
-                # First clean the string by removing any potential markdown or extraneous text
-                assessment_str = assessment.strip()
-                
-                # Find JSON content - look for the first { and last }
-                json_start = assessment_str.find('{')
-                json_end = assessment_str.rfind('}') + 1
-                
-                if json_start >= 0 and json_end > json_start:
-                    json_content = assessment_str[json_start:json_end]
-                    assessment = json.loads(json_content)
-                else:
-                    print("Error: Could not locate valid JSON content in the assessment")
-                    return
-            except json.JSONDecodeError as e:
-                print(f"Error: Assessment data is not in valid JSON format: {str(e)}")
-                return
+        if "error" in assessment:
+            print(f"Error generating assessment: {assessment['error']}")
+            return
         
         # Basic information
         print("\n==================== BASIC INFORMATION ====================")
@@ -409,10 +368,17 @@ async def automated_recruitment_process(candidate_profile, job_listings, orchest
         assessment = await generate_candidate_assessment(candidate_profile, best_match, orchestrator)
         print_assessment(assessment)
         
-        # Check if the job has interview slots available
-        if 'interview_slots' in best_match and best_match['interview_slots'] and len(best_match['interview_slots']) > 0:
-            # Automatically select the first available interview slot
-            selected_slot = best_match['interview_slots'][0]
+        # Pick an interview slot whose interviewer and room are still free
+        plan = {}
+        if job_interview_slots(best_match):
+            plan = await orchestrator.assign_interviews([{
+                "candidate_id": candidate_profile.get("name", "Candidate"),
+                "job_id": best_match.get("job_id"),
+                "priority": match_score if isinstance(match_score, (int, float)) else 0
+            }], [best_match])
+
+        if plan.get('assignments'):
+            selected_slot = plan['assignments'][0]['slot']
             print(f"\n=== AUTOMATICALLY SCHEDULING INTERVIEW ===")
             print(f"Selected Interview Slot: {selected_slot.get('date')} at {selected_slot.get('time')}")
             print(f"Interviewer: {selected_slot.get('interviewer')}")
@@ -479,7 +445,7 @@ async def main():
         traceback.print_exc()
     finally:
         # Clean up resources
-        orchestrator.cleanup()
+        await orchestrator.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,22 @@
+import datetime
+
+from app.utils.availability import BUCKET_SECONDS, BUCKETS_PER_WORD
+from app.utils.slot_table import TIMEZONE, to_epoch
+
+# Length of one 64-bucket word of a calendar
+WORD_SECONDS = BUCKET_SECONDS * BUCKETS_PER_WORD
+
+# A word boundary in January 2030, so bookings around it touch two words
+BOUNDARY = (to_epoch(datetime.datetime(2030, 1, 7, 12)) // WORD_SECONDS + 1) * WORD_SECONDS
+
+
+def local(epoch: int) -> datetime.datetime:
+    """Local time of an epoch, as the calendars read it"""
+    return datetime.datetime.fromtimestamp(epoch, TIMEZONE).replace(tzinfo=None)
+
+
+def slot_at(epoch: int, interviewer: str = "Lisa", location: str = "Video call", **extra) -> dict:
+    """An interview slot starting at an epoch"""
+    moment = local(epoch)
+    return {"date": moment.strftime("%Y-%m-%d"), "time": moment.strftime("%H:%M"),
+            "interviewer": interviewer, "location": location, **extra}
@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from app.utils.availability import AvailabilityEngine, BUCKET_SECONDS
+
+from .helpers import BOUNDARY, local, slot_at
+
+MINUTE = 60
+
+
+@pytest.fixture
+def engine():
+    return AvailabilityEngine(duration_minutes=60)
+
+
+@pytest.mark.parametrize("offset, minutes, booked", [
+    (-60, 30, False),   # ends as the booking starts
+    (-45, 30, True),    # overlaps its start, in the first word
+    (-15, 15, True),    # last bucket before the boundary
+    (0, 15, True),      # first bucket after the boundary
+    (15, 30, True),     # overlaps its end, in the second word
+    (30, 30, False),    # starts as the booking ends
+    (-120, 240, True),  # covers the whole booking
+])
+def test_booking_across_word_boundary(engine, offset, minutes, booked):
+    assert engine.book(slot_at(BOUNDARY - 30 * MINUTE, duration_minutes=60)) == []
+
+    slot = slot_at(BOUNDARY + offset * MINUTE, duration_minutes=minutes)
+    assert bool(engine.conflicts(slot)) is booked
+    assert engine.is_free(slot) is not booked
+
+
+def test_release_across_word_boundary(engine):
+    slot = slot_at(BOUNDARY - 30 * MINUTE, duration_minutes=60)
+    engine.book(slot)
+    engine.release(slot)
+
+    assert engine.is_free(slot_at(BOUNDARY - 15 * MINUTE, duration_minutes=15))
+    assert engine.is_free(slot_at(BOUNDARY, duration_minutes=15))
+
+
+def test_booking_far_from_earlier_bookings(engine):
+    engine.book(slot_at(BOUNDARY))
+    engine.book(slot_at(BOUNDARY - 400 * 24 * 3600))
+    engine.book(slot_at(BOUNDARY + 400 * 24 * 3600))
+
+    assert engine.conflicts(slot_at(BOUNDARY)) == ["interviewer Lisa"]
+    assert engine.conflicts(slot_at(BOUNDARY - 400 * 24 * 3600)) == ["interviewer Lisa"]
+    assert engine.is_free(slot_at(BOUNDARY + 24 * 3600))
+
+
+def test_same_room_conflicts(engine):
+    engine.book(slot_at(BOUNDARY, "Lisa", "HQ Conference Room A"))
+
+    assert engine.conflicts(slot_at(BOUNDARY, "Omar", "HQ Conference Room A")) == ["room HQ Conference Room A"]
+    assert engine.is_free(slot_at(BOUNDARY, "Omar", "HQ Conference Room B"))
+
+
+@pytest.mark.parametrize("location", ["Video call", "Zoom", "Microsoft Teams", "Phone screen", "", None])
+def test_virtual_locations_never_conflict(engine, location):
+    engine.book(slot_at(BOUNDARY, "Lisa", location))
+
+    assert engine.is_free(slot_at(BOUNDARY, "Omar", location))
+    assert engine.conflicts(slot_at(BOUNDARY, "Lisa", location)) == ["interviewer Lisa"]
+
+
+def test_room_and_interviewer_both_reported(engine):
+    engine.book(slot_at(BOUNDARY, "Lisa", "HQ Conference Room A"))
+
+    assert engine.conflicts(slot_at(BOUNDARY, "Lisa", "HQ Conference Room A")) == [
+        "interviewer Lisa", "room HQ Conference Room A"
+    ]
+    assert engine.conflicts(slot_at(BOUNDARY, "Lisa", "Zoom")) == ["interviewer Lisa"]
+
+
+def test_panel_members_are_booked(engine):
+    engine.book(slot_at(BOUNDARY, "Lisa", "Zoom", panel=["Lisa", "Omar"]))
+
+    assert engine.conflicts(slot_at(BOUNDARY, "Omar", "Zoom")) == ["interviewer Omar"]
+    assert engine.is_free(slot_at(BOUNDARY, "Priya", "Zoom"))
+
+
+def test_booked_bulk_agrees_with_conflicts(engine):
+    rng = random.Random(41)
+    people = ["Lisa", "Omar", "Priya", "Chen"]
+    places = ["HQ Conference Room A", "HQ Conference Room B", "Zoom", "Video call"]
+
+    def random_slot():
+        start = BOUNDARY + rng.randrange(-24, 24) * BUCKET_SECONDS
+        slot = slot_at(start, rng.choice(people), rng.choice(places),
+                       duration_minutes=rng.choice([15, 30, 45, 60, 90, 120]))
+        if rng.random() < 0.3:
+            slot["panel"] = rng.sample(people, 2)
+        return slot
+
+    for _ in range(20):
+        engine.book(random_slot())
+    queries = [random_slot() for _ in range(500)]
+    queries.append({"date": "not a date", "time": "10:00", "interviewer": "Lisa"})
+
+    expected = [bool(engine.conflicts(slot)) for slot in queries]
+    assert engine._booked_bulk(queries).tolist() == expected
+    assert any(expected) and not all(expected)
+    assert engine.available_slots(queries) == [slot for slot, taken in zip(queries, expected) if not taken]
+
+
+def test_available_slots_bulk_by_job(engine):
+    engine.book(slot_at(BOUNDARY, "Lisa", "HQ Conference Room A"))
+    jobs = [
+        {"job_id": "J1", "interview_slots": [slot_at(BOUNDARY, "Lisa"), slot_at(BOUNDARY + 3600, "Lisa")]},
+        {"job_id": "J2", "interview_slots": [slot_at(BOUNDARY, "Omar", "HQ Conference Room A"),
+                                             slot_at(BOUNDARY, "Omar", "Zoom")]},
+    ]
+
+    free = engine.available_slots_bulk(jobs)
+
+    assert free["J1"] == [jobs[0]["interview_slots"][1]]
+    assert free["J2"] == [jobs[1]["interview_slots"][1]]
+
+
+def test_common_free_time_across_word_boundary(engine):
+    start, end = BOUNDARY - 4 * 3600, BOUNDARY + 4 * 3600
+    for name in ("Lisa", "Omar"):
+        engine.add_availability(("interviewer", name), local(start), 8 * 60)
+    engine.book(slot_at(BOUNDARY - 30 * MINUTE, "Omar", duration_minutes=60))
+
+    periods = engine.common_free_time([("interviewer", "Lisa"), ("interviewer", "Omar")],
+                                      local(start), local(end), minutes=60)
+
+    assert [(p["start"][11:16], p["end"][11:16]) for p in periods] == [
+        (local(start).strftime("%H:%M"), local(BOUNDARY - 30 * MINUTE).strftime("%H:%M")),
+        (local(BOUNDARY + 30 * MINUTE).strftime("%H:%M"), local(end).strftime("%H:%M")),
+    ]
@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pytest
+
+from app.utils import code_grader
+from app.utils.code_grader import CodeGrader
+
+WHO_AM_I = "import os\nprint('root' if os.getuid() == 0 or os.geteuid() == 0 else 'sandboxed')\n"
+SANDBOXED = [{"input": "", "expected_output": "sandboxed"}]
+
+as_root = pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="needs root")
+
+
+@pytest.fixture
+def grader():
+    grader = CodeGrader(time_limit=1, max_workers=2)
+    if grader.grade("print(1)", [{"input": "", "expected_output": "1"}])["status"] == "unsupported":
+        pytest.skip(f"Local grading is disabled here: {grader.disabled_reason}")
+    return grader
+
+
+def test_graded_code_never_runs_as_root():
+    # Whatever the configuration, the code either runs unprivileged or not at all
+    result = CodeGrader(time_limit=2).grade(WHO_AM_I, SANDBOXED)
+
+    assert result["status"] in ("passed", "unsupported")
+
+
+@as_root
+def test_unusable_interpreter_disables_grading(tmp_path, monkeypatch):
+    private = tmp_path / "private"
+    private.mkdir(mode=0o700)
+    (private / "python").symlink_to(sys.executable)
+    monkeypatch.setattr(code_grader, "GRADER_PYTHON", str(private / "python"))
+
+    result = CodeGrader().grade(WHO_AM_I, SANDBOXED)
+
+    assert result["status"] == "unsupported"
+    assert "disabled" in result["error"]
+
+
+@as_root
+def test_missing_sandbox_user_disables_grading(monkeypatch):
+    monkeypatch.setattr(code_grader, "GRADER_USER", "no-such-grader-user")
+
+    result = CodeGrader().grade(WHO_AM_I, SANDBOXED)
+
+    assert result["status"] == "unsupported"
+
+
+def test_infinite_loop_is_a_timeout(grader):
+    result = grader.grade("while True:\n    pass\n", [{"input": "", "expected_output": ""}])
+
+    assert result["status"] == "failed"
+    assert result["tests"][0]["status"] == "timeout"
+
+
+def test_cpu_limit_is_a_timeout(grader):
+    code = ("import resource\n"
+            "resource.setrlimit(resource.RLIMIT_CPU, (1, 2))\n"
+            "while True:\n    pass\n")
+    grader.time_limit = 4
+
+    result = grader.grade(code, [{"input": "", "expected_output": ""}])
+
+    assert result["tests"][0]["status"] == "timeout"
+
+
+def test_answers_and_errors(grader):
+    code = "a, b = map(int, input().split())\nprint(a // b)\n"
+    result = grader.grade(code, [
+        {"input": "6 3", "expected_output": "2"},
+        {"input": "7 2", "expected_output": "4"},
+        {"input": "1 0", "expected_output": "0"},
+    ])
+
+    assert [test["status"] for test in result["tests"]] == ["ok", "wrong_answer", "runtime_error"]
+    assert "ZeroDivisionError" in result["tests"][2]["error"]
+    assert result["passed"] == 1
+
+
+def test_grade_many_keeps_order(grader):
+    submissions = [{"code": f"print({value})", "test_cases": [{"input": "", "expected_output": "2"}]}
+                   for value in (2, 3, 2)]
+
+    assert [result["passed"] for result in grader.grade_many(submissions)] == [1, 0, 1]
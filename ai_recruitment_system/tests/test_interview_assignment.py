@@ -0,0 +1,92 @@
+from app.utils.interview_assignment import assign_interviews
+
+from .helpers import BOUNDARY, local, slot_at
+
+HOUR = 3600
+
+
+def job(job_id, *hours, interviewer="Lisa"):
+    return {"job_id": job_id, "interview_slots": [slot_at(BOUNDARY + hour * HOUR, interviewer) for hour in hours]}
+
+
+def by_candidate(result):
+    return {a["candidate_id"]: (a["job_id"], a["slot"]["time"]) for a in result["assignments"]}
+
+
+def time_at(hour):
+    return local(BOUNDARY + hour * HOUR).strftime("%H:%M")
+
+
+def test_higher_priority_wins_the_only_slot():
+    candidates = [
+        {"candidate_id": "low", "job_id": "J1", "priority": 0.2},
+        {"candidate_id": "high", "job_id": "J1", "priority": 0.9},
+        {"candidate_id": "mid", "job_id": "J1", "priority": 0.5},
+    ]
+
+    result = assign_interviews(candidates, [job("J1", 0)])
+
+    assert by_candidate(result) == {"high": ("J1", time_at(0))}
+    assert result["unassigned"] == ["low", "mid"]
+
+
+def test_scheduling_more_candidates_beats_priority():
+    # "high" could take either slot, "low" only the first; both get one
+    candidates = [
+        {"candidate_id": "high", "job_id": "J1", "priority": 1.0},
+        {"candidate_id": "low", "job_id": "J1", "priority": 0.0,
+         "availability": [{"start": local(BOUNDARY).isoformat(), "end": local(BOUNDARY + HOUR).isoformat()}]},
+    ]
+
+    result = assign_interviews(candidates, [job("J1", 0, 1)])
+
+    assert by_candidate(result) == {"low": ("J1", time_at(0)), "high": ("J1", time_at(1))}
+
+
+def test_earlier_slots_break_ties():
+    candidates = [{"candidate_id": "only", "job_id": "J1", "priority": 0.5}]
+
+    result = assign_interviews(candidates, [job("J1", 3, 1, 2)])
+
+    assert by_candidate(result) == {"only": ("J1", time_at(1))}
+
+
+def test_candidates_only_get_their_jobs_slots():
+    candidates = [
+        {"candidate_id": "a", "job_id": "J1"},
+        {"candidate_id": "b", "job_id": "J2"},
+        {"candidate_id": "c", "job_id": "J9"},
+        {"candidate_id": "d"},
+    ]
+
+    result = assign_interviews(candidates, [job("J1", 0), job("J2", 1, interviewer="Omar"), job("J3", 2)])
+
+    assignments = by_candidate(result)
+    assert assignments["a"] == ("J1", time_at(0))
+    assert assignments["b"] == ("J2", time_at(1))
+    assert assignments["d"] == ("J3", time_at(2))
+    assert result["unassigned"] == ["c"]
+
+
+def test_slot_listed_under_two_jobs_is_given_once():
+    candidates = [{"candidate_id": "a", "job_id": "J1"}, {"candidate_id": "b", "job_id": "J2"}]
+
+    result = assign_interviews(candidates, [job("J1", 0), job("J2", 0)])
+
+    assert len(result["assignments"]) == 1
+    assert result["stats"]["slots"] == 1
+
+
+def test_priority_order_survives_limited_edges():
+    # Every candidate's first slot is the same, so with one edge each the
+    # others starve and must get more edges in later rounds
+    candidates = [{"candidate_id": f"c{index}", "job_id": "J1", "priority": index / 10} for index in range(6)]
+    slots = job("J1", *range(4))
+
+    limited = assign_interviews(candidates, [slots], slots_per_candidate=1)
+    full = assign_interviews(candidates, [slots], slots_per_candidate=len(slots["interview_slots"]))
+
+    assert sorted(by_candidate(limited)) == ["c2", "c3", "c4", "c5"]
+    assert sorted(by_candidate(limited)) == sorted(by_candidate(full))
+    assert limited["stats"]["rounds"] > 1
+    assert limited["unassigned"] == ["c0", "c1"]
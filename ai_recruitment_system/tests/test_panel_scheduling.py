@@ -0,0 +1,90 @@
+import pytest
+
+from app.utils.availability import AvailabilityEngine
+from app.utils.panel_scheduling import find_panel_options
+from app.utils.slot_table import format_iso
+
+from .helpers import BOUNDARY, local, slot_at
+
+HOUR = 3600
+
+# Four hours around a calendar word boundary
+START, END = BOUNDARY - 2 * HOUR, BOUNDARY + 2 * HOUR
+
+
+@pytest.fixture
+def engine():
+    engine = AvailabilityEngine(duration_minutes=60)
+    for name in ("Lisa", "Omar", "Priya", "Chen"):
+        engine.add_availability(("interviewer", name), local(START), 4 * 60)
+    return engine
+
+
+def options(engine, panel, **kwargs):
+    result = find_panel_options(engine, {"duration_minutes": 60, "step_minutes": 30, **panel},
+                                local(START), local(END), **kwargs)
+    assert "error" not in result
+    return result["options"]
+
+
+def starts(found):
+    return [option["start"] for option in found]
+
+
+def test_whole_window_is_offered(engine):
+    found = options(engine, {"interviewers": ["Lisa", "Omar"]})
+
+    assert starts(found) == [format_iso(START + step * 1800) for step in range(7)]
+    assert found[0]["panel"] == ["Lisa", "Omar"]
+    assert found[0]["location"] == "Video call"
+
+
+def test_booked_member_is_respected(engine):
+    engine.book(slot_at(BOUNDARY - 30 * 60, "Omar", duration_minutes=60))
+
+    found = options(engine, {"interviewers": ["Lisa", "Omar"]})
+
+    # Omar is booked from 30 minutes before to 30 minutes after the boundary
+    assert starts(found) == [format_iso(BOUNDARY + offset * 60) for offset in (-120, -90, 30, 60)]
+    for option in found:
+        assert engine.is_free({**option, "interviewer": "Omar"})
+
+
+def test_booked_panel_member_blocks_panel(engine):
+    engine.book(slot_at(START, "Lisa", "Zoom", panel=["Lisa", "Omar"], duration_minutes=4 * 60))
+
+    assert options(engine, {"interviewers": ["Omar", "Priya"]}) == []
+
+
+def test_choice_group_replaces_booked_member(engine):
+    engine.book(slot_at(START, "Omar", duration_minutes=4 * 60))
+
+    found = options(engine, {"interviewers": ["Lisa"], "choose": [{"count": 1, "from": ["Omar", "Priya"]}]})
+
+    assert found
+    assert all(option["panel"] == ["Lisa", "Priya"] for option in found)
+
+
+def test_booked_room_is_skipped(engine):
+    engine.book(slot_at(START, "Chen", "Room A", duration_minutes=4 * 60))
+
+    found = options(engine, {"interviewers": ["Lisa"], "rooms": ["Room A", "Room B"]})
+
+    assert found and all(option["location"] == "Room B" for option in found)
+
+    engine.book(slot_at(START, "Priya", "Room B", duration_minutes=4 * 60))
+    assert options(engine, {"interviewers": ["Lisa"], "rooms": ["Room A", "Room B"]}) == []
+
+
+def test_options_book_cleanly(engine):
+    engine.book(slot_at(BOUNDARY, "Lisa", duration_minutes=30))
+
+    for option in options(engine, {"interviewers": ["Lisa", "Omar"], "rooms": ["Room A"]}, max_options=3):
+        assert engine.conflicts(option) == []
+
+
+def test_group_larger_than_members_is_an_error(engine):
+    result = find_panel_options(engine, {"choose": [{"count": 3, "from": ["Lisa", "Omar"]}]},
+                                local(START), local(END))
+
+    assert "error" in result
@@ -0,0 +1,88 @@
+import datetime
+import itertools
+
+from app.utils.recurrence import expand_rules, job_interview_slots
+
+# A Monday
+MONDAY = datetime.date(2030, 1, 7)
+
+RULE = {"interviewer": "Lisa", "location": "Zoom", "days": "weekdays", "start": "09:00", "end": "12:00",
+        "slot_minutes": 60}
+
+
+def test_weekday_rule_over_a_week():
+    slots = list(expand_rules([RULE], MONDAY, MONDAY + datetime.timedelta(days=6)))
+
+    assert len(slots) == 5 * 3
+    assert {slot["date"] for slot in slots} == {(MONDAY + datetime.timedelta(days=day)).isoformat() for day in range(5)}
+    assert [slot["time"] for slot in slots[:3]] == ["09:00", "10:00", "11:00"]
+    assert slots[0] == {"date": "2030-01-07", "time": "09:00", "interviewer": "Lisa", "duration_minutes": 60,
+                        "location": "Zoom"}
+
+
+def test_named_days_and_slot_length():
+    rule = {**RULE, "days": ["tue", "Thursday"], "slot_minutes": 45, "end": "11:00"}
+
+    slots = list(expand_rules([rule], MONDAY, MONDAY + datetime.timedelta(days=6)))
+
+    assert {slot["date"] for slot in slots} == {"2030-01-08", "2030-01-10"}
+    assert [slot["time"] for slot in slots if slot["date"] == "2030-01-08"] == ["09:00", "09:45"]
+
+
+def test_validity_and_exceptions():
+    rule = {**RULE, "valid_from": "2030-01-08", "valid_until": "2030-01-10", "except_dates": ["2030-01-09"]}
+
+    slots = list(expand_rules([rule], MONDAY, MONDAY + datetime.timedelta(days=13)))
+
+    assert sorted({slot["date"] for slot in slots}) == ["2030-01-08", "2030-01-10"]
+
+
+def test_rules_are_merged_in_time_order():
+    rules = [{**RULE, "start": "10:30", "end": "11:30"}, {**RULE, "interviewer": "Omar", "location": None}]
+
+    slots = list(expand_rules(rules, MONDAY, MONDAY))
+
+    assert [(slot["time"], slot["interviewer"]) for slot in slots] == [
+        ("09:00", "Omar"), ("10:00", "Omar"), ("10:30", "Lisa"), ("11:00", "Omar")
+    ]
+    assert "location" not in slots[0]
+
+
+def test_expansion_is_lazy():
+    # A rule valid forever expands only the days that are read
+    slots = expand_rules([{**RULE, "days": "daily"}], MONDAY, datetime.date.max - datetime.timedelta(days=1))
+
+    assert [slot["date"] for slot in itertools.islice(slots, 4)] == ["2030-01-07"] * 3 + ["2030-01-08"]
+
+
+def test_invalid_rules_are_skipped(capsys):
+    slots = list(expand_rules([{"days": "weekdays"}, {**RULE, "days": ["someday"]}, RULE], MONDAY, MONDAY))
+
+    assert len(slots) == 3
+    assert capsys.readouterr().out.count("Warning: Skipping invalid availability rule") == 2
+
+
+def test_job_slots_combine_rules_and_listed_slots():
+    job = {
+        "interview_availability": [RULE],
+        "interview_slots": [
+            {"date": "2030-01-07", "time": "08:00", "interviewer": "Omar"},
+            {"date": "2030-01-01", "time": "08:00", "interviewer": "Omar"},
+        ]
+    }
+
+    slots = job_interview_slots(job, start=datetime.datetime(2030, 1, 7, 7, 0), days=2)
+
+    assert [(slot["date"], slot["time"]) for slot in slots] == [
+        ("2030-01-07", "08:00"), ("2030-01-07", "09:00"), ("2030-01-07", "10:00"), ("2030-01-07", "11:00"),
+        ("2030-01-08", "09:00"), ("2030-01-08", "10:00"), ("2030-01-08", "11:00"),
+    ]
+
+
+def test_job_slots_stay_inside_the_window():
+    slots = job_interview_slots({"interview_availability": [RULE]}, start=datetime.datetime(2030, 1, 7, 10, 30), days=1)
+
+    # The window ends 24 hours later, at 10:30 the next day
+    assert [(slot["date"], slot["time"]) for slot in slots] == [
+        ("2030-01-07", "11:00"), ("2030-01-08", "09:00"), ("2030-01-08", "10:00")
+    ]